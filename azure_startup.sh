@@ -33,6 +33,11 @@ else:
     print('Superuser already exists')
 EOF
 
+# Start the Celery worker for the tasks settings_production queues
+if [ "$CELERY_TASK_ALWAYS_EAGER" != "True" ]; then
+    celery -A sundar_marbles worker --concurrency 2 --loglevel info &
+fi
+
 echo "=== STARTING APPLICATION ==="
 # Start gunicorn with explicit settings
 gunicorn sundar_marbles.wsgi:application --bind 0.0.0.0:8000 --env DJANGO_SETTINGS_MODULE=sundar_marbles.settings_production --timeout 600 --workers 1
@@ -1,15 +1,16 @@
 from rest_framework import serializers
+from sundar_marbles.timing import TimedSerializerMixin
 from .models import ContactMessage, ContactInfo, Newsletter
 
 
-class ContactMessageSerializer(serializers.ModelSerializer):
+class ContactMessageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ContactMessage
         fields = ['id', 'name', 'email', 'phone', 'subject', 'message', 'created_at']
         read_only_fields = ['id', 'created_at']
 
 
-class ContactInfoSerializer(serializers.ModelSerializer):
+class ContactInfoSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ContactInfo
         fields = [
@@ -19,7 +20,7 @@ class ContactInfoSerializer(serializers.ModelSerializer):
         ]
 
 
-class NewsletterSerializer(serializers.ModelSerializer):
+class NewsletterSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Newsletter
         fields = ['id', 'email', 'name', 'subscribed_at']
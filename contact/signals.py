@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from sundar_marbles.cache import invalidate_api_cache
+from .models import ContactInfo
+
+
+@receiver([post_save, post_delete], sender=ContactInfo)
+def invalidate_contact_cache(sender, **kwargs):
+    """Contact details are part of the cached bootstrap bundle"""
+    invalidate_api_cache()
@@ -0,0 +1,37 @@
+from smtplib import SMTPException
+
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .models import ContactMessage
+
+
+@shared_task(
+    autoretry_for=(SMTPException, OSError),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=5,
+)
+def send_contact_email(message_id):
+    """Email the office about a new contact form submission"""
+    contact_message = ContactMessage.objects.filter(pk=message_id).first()
+    if contact_message is None:
+        return
+
+    subject = f"New Contact Message: {contact_message.subject}"
+    message = f"""
+New contact message received:
+
+Name: {contact_message.name}
+Email: {contact_message.email}
+Phone: {contact_message.phone}
+Subject: {contact_message.subject}
+
+Message:
+{contact_message.message}
+
+Received at: {contact_message.created_at}
+        """
+    send_mail(subject, message, settings.EMAIL_HOST_USER, ['info@sundarmarbles.com'], fail_silently=False)
@@ -1,3 +1,37 @@
+from unittest import mock
+from smtplib import SMTPException
+
+from django.core import mail
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import ContactMessage
+from .tasks import send_contact_email
+
+
+class ContactMessageEmailTests(TestCase):
+    """Contact submissions are emailed through the task queue, not a thread"""
+
+    payload = {
+        'name': 'Ayesha',
+        'email': 'ayesha@example.com',
+        'phone': '03001234567',
+        'subject': 'Kitchen countertop quote',
+        'message': 'Please share prices for black granite.',
+    }
+
+    def test_email_is_sent_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(reverse('contact:message-create'), self.payload)
+            self.assertEqual(mail.outbox, [])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'New Contact Message: Kitchen countertop quote')
+        self.assertEqual(mail.outbox[0].to, ['info@sundarmarbles.com'])
 
-# Create your tests here.
+    def test_smtp_failures_are_retried(self):
+        message = ContactMessage.objects.create(**self.payload)
+        with mock.patch('contact.tasks.send_mail', side_effect=[SMTPException('busy'), 1]) as send:
+            send_contact_email.apply(args=[message.id])
+        self.assertEqual(send.call_count, 2)
@@ -1,21 +1,11 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from .models import ContactMessage, ContactInfo, Newsletter
 from .serializers import ContactMessageSerializer, ContactInfoSerializer, NewsletterSerializer
-import threading
-import requests
-
-
-def send_email_async(subject, message, from_email, recipient_list):
-    """Send email in a separate thread"""
-    try:
-        send_mail(subject, message, from_email, recipient_list, fail_silently=False)
-    except Exception as e:
-        print(f"Email sending failed: {e}")
+from .tasks import send_contact_email
 
 
 class ContactMessageCreateView(generics.CreateAPIView):
@@ -29,29 +19,8 @@ class ContactMessageCreateView(generics.CreateAPIView):
         # Save to database
         contact_message = serializer.save()
         
-        # Send email asynchronously (non-blocking)
-        subject = f"New Contact Message: {contact_message.subject}"
-        message = f"""
-New contact message received:
-
-Name: {contact_message.name}
-Email: {contact_message.email}
-Phone: {contact_message.phone}
-Subject: {contact_message.subject}
-
-Message:
-{contact_message.message}
-
-Received at: {contact_message.created_at}
-        """
-        
-        # Send email in background thread
-        email_thread = threading.Thread(
-            target=send_email_async,
-            args=(subject, message, settings.EMAIL_HOST_USER, ['info@sundarmarbles.com'])
-        )
-        email_thread.daemon = True
-        email_thread.start()
+        # Queue the notification email once the row is committed
+        transaction.on_commit(lambda: send_contact_email.delay(contact_message.id))
         
         # Return response immediately
         headers = self.get_success_headers(serializer.data)
@@ -63,8 +32,9 @@ Received at: {contact_message.created_at}
 
 
 class ContactInfoView(generics.ListAPIView):
-    queryset = ContactInfo.objects.filter(is_active=True)
+    queryset = ContactInfo.objects.filter(is_active=True).order_by('id')
     serializer_class = ContactInfoSerializer
+    query_budget = 2
 
 
 class NewsletterSubscribeView(generics.CreateAPIView):
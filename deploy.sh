@@ -9,5 +9,10 @@ python manage.py collectstatic --noinput
 # Run migrations
 python manage.py migrate --noinput
 
+# Start the Celery worker for the tasks settings_production queues
+if [ "$CELERY_TASK_ALWAYS_EAGER" != "True" ]; then
+    celery -A sundar_marbles worker --concurrency 2 --loglevel info &
+fi
+
 # Start gunicorn with production settings
 exec gunicorn sundar_marbles.wsgi:application --bind 0.0.0.0:8000 --workers 2 --timeout 300
@@ -1,21 +1,23 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from sundar_marbles.derivatives import derivative_url
 from .models import GalleryCategory, GalleryImage, GalleryTag, GalleryImageTag
 
 
+def preview_url(obj):
+    """Thumbnail rendition when available, so the changelist does not load originals"""
+    return derivative_url(obj.image_derivatives, obj.image.storage) or obj.image.url
+
+
 @admin.register(GalleryCategory)
 class GalleryCategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'is_active', 'order', 'image_count', 'created_at']
+    list_display = ['name', 'slug', 'is_active', 'order', 'active_image_count', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['order', 'name']
 
-    def image_count(self, obj):
-        return obj.images.count()
-    image_count.short_description = "Images"
-
 
 class GalleryImageTagInline(admin.TabularInline):
     model = GalleryImageTag
@@ -52,7 +54,7 @@ class GalleryImageAdmin(admin.ModelAdmin):
 
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;" />', obj.image.url)
+            return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;" />', preview_url(obj))
         return "No Image"
     image_preview.short_description = "Image Preview"
 
@@ -63,7 +65,3 @@ class GalleryTagAdmin(admin.ModelAdmin):
     search_fields = ['name']
     prepopulated_fields = {'slug': ('name',)}
     readonly_fields = ['created_at']
-
-    def usage_count(self, obj):
-        return obj.tagged_images.count()
-    usage_count.short_description = "Usage Count"
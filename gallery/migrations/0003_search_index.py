@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:56
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# GIN index on PostgreSQL, FTS5 shadow table on SQLite. The SQL is spelled out
+# here so later changes to sundar_marbles/search.py can't alter this migration.
+CREATE_INDEX = {
+    'postgresql': [
+        '''UPDATE "gallery_galleryimage" SET "search_vector" =
+            setweight(to_tsvector('english', coalesce("title", '')), 'A')
+            || setweight(to_tsvector('english', coalesce("project_location", '')), 'B')
+            || setweight(to_tsvector('english', coalesce("description", '')), 'C')''',
+        '''CREATE INDEX IF NOT EXISTS "gallery_galleryimage_search_gin"
+            ON "gallery_galleryimage" USING gin ("search_vector")''',
+    ],
+    'sqlite': [
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS "gallery_galleryimage_fts"
+            USING fts5(title, project_location, description, tokenize='porter unicode61')''',
+        '''INSERT INTO "gallery_galleryimage_fts" (rowid, title, project_location, description)
+            SELECT "id", coalesce("title", ''), coalesce("project_location", ''), coalesce("description", '')
+            FROM "gallery_galleryimage"''',
+    ],
+}
+DROP_INDEX = {
+    'postgresql': ['DROP INDEX IF EXISTS "gallery_galleryimage_search_gin"'],
+    'sqlite': ['DROP TABLE IF EXISTS "gallery_galleryimage_fts"'],
+}
+
+
+def execute(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0002_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='galleryimage',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(execute(CREATE_INDEX), execute(DROP_INDEX)),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='galleryimage',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'order', '-created_at', 'id'], name='gallery_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='galleryimage',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['category', 'order', '-created_at'], name='gallery_featured_idx'),
+        ),
+    ]
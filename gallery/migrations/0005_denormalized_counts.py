@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_counts(apps, schema_editor):
+    GalleryCategory = apps.get_model('gallery', 'GalleryCategory')
+    GalleryImage = apps.get_model('gallery', 'GalleryImage')
+    GalleryTag = apps.get_model('gallery', 'GalleryTag')
+    GalleryImageTag = apps.get_model('gallery', 'GalleryImageTag')
+
+    active_images = GalleryImage.objects.filter(category=OuterRef('pk'), is_active=True).order_by()
+    counts = active_images.values('category').annotate(rows=Count('pk')).values('rows')
+    GalleryCategory.objects.update(active_image_count=Coalesce(Subquery(counts), Value(0)))
+
+    uses = GalleryImageTag.objects.filter(tag=OuterRef('pk')).order_by()
+    counts = uses.values('tag').annotate(rows=Count('pk')).values('rows')
+    GalleryTag.objects.update(usage_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0004_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gallerycategory',
+            name='active_image_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Maintained by signals; repair with manage.py recount'),
+        ),
+        migrations.AddField(
+            model_name='gallerytag',
+            name='usage_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Maintained by signals; repair with manage.py recount'),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_denormalized_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='galleryimage',
+            name='image_blurhash',
+            field=models.CharField(blank=True, editable=False, help_text='BlurHash placeholder', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='image_bytes',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, help_text='Size of the original file', null=True),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, help_text='Dominant colour, #rrggbb', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Pixels, after EXIF rotation', null=True),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Pixels, after EXIF rotation', null=True),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.text import slugify
 
@@ -9,6 +10,7 @@ class GalleryCategory(models.Model):
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0, help_text="Display order")
+    active_image_count = models.PositiveIntegerField(default=0, editable=False, help_text="Maintained by signals; repair with manage.py recount")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -32,6 +34,12 @@ class GalleryImage(models.Model):
     description = models.TextField(blank=True)
     category = models.ForeignKey(GalleryCategory, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='gallery/', help_text="Gallery image")
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized renditions of image")
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Pixels, after EXIF rotation")
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Pixels, after EXIF rotation")
+    image_bytes = models.PositiveBigIntegerField(null=True, blank=True, editable=False, help_text="Size of the original file")
+    image_color = models.CharField(max_length=7, blank=True, editable=False, help_text="Dominant colour, #rrggbb")
+    image_blurhash = models.CharField(max_length=64, blank=True, editable=False, help_text="BlurHash placeholder")
     alt_text = models.CharField(max_length=200, blank=True)
     
     # Project details
@@ -51,10 +59,28 @@ class GalleryImage(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search (see sundar_marbles/search.py); only populated on PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_weights = {'title': 'A', 'project_location': 'B', 'description': 'C'}
+
     class Meta:
         verbose_name = "Gallery Image"
         verbose_name_plural = "Gallery Images"
         ordering = ['category', 'order', '-created_at']
+        # Public queries always filter is_active=True; within one category the
+        # rows are read in display order
+        indexes = [
+            models.Index(
+                fields=['category', 'order', '-created_at', 'id'],
+                condition=models.Q(is_active=True),
+                name='gallery_active_order_idx',
+            ),
+            models.Index(
+                fields=['category', 'order', '-created_at'],
+                condition=models.Q(is_active=True, is_featured=True),
+                name='gallery_featured_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.category.name}"
@@ -64,6 +90,7 @@ class GalleryTag(models.Model):
     """Tags for gallery images"""
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=50, unique=True, blank=True)
+    usage_count = models.PositiveIntegerField(default=0, editable=False, help_text="Maintained by signals; repair with manage.py recount")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
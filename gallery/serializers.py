@@ -1,42 +1,60 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import GalleryCategory, GalleryImage, GalleryTag
+from sundar_marbles.derivatives import image_srcset
+from sundar_marbles.fieldsets import SparseFieldsetSerializerMixin
+from sundar_marbles.timing import TimedSerializerMixin
+from .models import GalleryCategory, GalleryImage, GalleryImageTag, GalleryTag
 
 
-class GalleryCategorySerializer(serializers.ModelSerializer):
-    image_count = serializers.SerializerMethodField()
+class GalleryCategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    image_count = serializers.IntegerField(source='active_image_count', read_only=True)
 
     class Meta:
         model = GalleryCategory
         fields = ['id', 'name', 'slug', 'description', 'is_active', 'order', 'image_count']
 
-    def get_image_count(self, obj):
-        return obj.images.filter(is_active=True).count()
 
-
-class GalleryTagSerializer(serializers.ModelSerializer):
+class GalleryTagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = GalleryTag
         fields = ['id', 'name', 'slug']
 
 
-class GalleryImageSerializer(serializers.ModelSerializer):
+class GalleryImageSerializer(SparseFieldsetSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     tags = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+
+    field_sources = {
+        'image_srcset': ['image', 'image_derivatives'],
+        'tags': [
+            Prefetch('image_tags', queryset=GalleryImageTag.objects.select_related('tag').order_by('tag__name')),
+        ],
+    }
+    expandable_fields = {'category': GalleryCategorySerializer}
 
     class Meta:
         model = GalleryImage
         fields = [
             'id', 'title', 'description', 'category', 'category_name',
-            'image', 'alt_text', 'project_location', 'completion_date',
+            'image', 'image_srcset', 'image_width', 'image_height', 'image_bytes',
+            'image_color', 'image_blurhash', 'alt_text', 'project_location', 'completion_date',
             'is_active', 'is_featured', 'order', 'tags', 'created_at'
         ]
 
     def get_tags(self, obj):
-        tags = GalleryTag.objects.filter(tagged_images__image=obj)
+        # Views prefetch ``image_tags__tag``; fall back to a query for bare instances
+        if 'image_tags' in getattr(obj, '_prefetched_objects_cache', {}):
+            tags = [image_tag.tag for image_tag in obj.image_tags.all()]
+        else:
+            tags = GalleryTag.objects.filter(tagged_images__image=obj)
         return GalleryTagSerializer(tags, many=True).data
 
+    def get_image_srcset(self, obj):
+        return image_srcset(obj.image_derivatives, obj.image.storage, self.context.get('request'))
+
 
-class GalleryImageCreateSerializer(serializers.ModelSerializer):
+class GalleryImageCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = GalleryImage
         fields = [
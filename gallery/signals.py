@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from sundar_marbles.cache import invalidate_api_cache
+from sundar_marbles.counters import maintain_counter
+from sundar_marbles.derivatives import derivatives_outdated
+from sundar_marbles.search import remove_from_search_index, update_search_index
+from sundar_marbles.tasks import generate_image_derivatives
+from .models import GalleryCategory, GalleryImage, GalleryImageTag, GalleryTag
+
+maintain_counter(GalleryImage, 'category', 'active_image_count', active_field='is_active')
+maintain_counter(GalleryImageTag, 'tag', 'usage_count')
+
+
+@receiver([post_save, post_delete], sender=GalleryCategory)
+@receiver([post_save, post_delete], sender=GalleryImage)
+@receiver([post_save, post_delete], sender=GalleryImageTag)
+@receiver([post_save, post_delete], sender=GalleryTag)
+def invalidate_gallery_cache(sender, **kwargs):
+    """Admin edits must show up on the public API immediately"""
+    invalidate_api_cache()
+
+
+@receiver([post_save, post_delete], sender=GalleryImageTag)
+def touch_tagged_image(sender, instance, **kwargs):
+    """Tag links have no updated_at; bump the image so its ETag changes"""
+    GalleryImage.objects.filter(pk=instance.image_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=GalleryTag)
+def touch_images_with_tag(sender, instance, created, **kwargs):
+    """Renaming a tag changes every image that renders it"""
+    if not created:
+        GalleryImage.objects.filter(image_tags__tag=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=GalleryImage)
+def queue_image_derivatives(sender, instance, raw=False, **kwargs):
+    if not raw and derivatives_outdated(instance):
+        transaction.on_commit(
+            lambda: generate_image_derivatives.delay(instance._meta.label, instance.pk)
+        )
+
+
+@receiver(post_save, sender=GalleryImage)
+def index_for_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_search_index(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=GalleryImage)
+def unindex_for_search(sender, instance, **kwargs):
+    remove_from_search_index(sender, instance.pk)
@@ -1,3 +1,238 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from sundar_marbles.cache import get_api_cache
+from .models import GalleryCategory, GalleryImage, GalleryImageTag, GalleryTag
+
+
+class GalleryImageQueryTests(TestCase):
+    """Gallery image endpoints must not query tags once per image"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = GalleryCategory.objects.create(name='Floors')
+        cls.tags = [GalleryTag.objects.create(name=name) for name in ('Polished', 'Granite', 'Kitchen')]
+        for index in range(30):
+            image = GalleryImage.objects.create(
+                title=f'Project {index}',
+                category=cls.category,
+                image=f'gallery/{index}.jpg',
+                is_featured=True,
+            )
+            for tag in cls.tags[:index % 4]:
+                GalleryImageTag.objects.create(image=image, tag=tag)
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    def test_list_endpoints_use_fixed_queries(self):
+        for name in ('gallery:image-list', 'gallery:featured-images'):
+            with self.subTest(endpoint=name):
+                # COUNT, images joined to category, image tags joined to tag
+                with self.assertNumQueries(3):
+                    response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['count'], 30)
+
+    def test_search_vector_is_not_loaded(self):
+        image = GalleryImage.objects.first()
+        for url in (reverse('gallery:image-list'), reverse('gallery:image-detail', args=[image.id])):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertFalse(any('search_vector' in query['sql'] for query in queries))
+
+    def test_tags_are_sorted_by_name(self):
+        image = GalleryImage.objects.get(title='Project 3')
+        response = self.client.get(reverse('gallery:image-detail', args=[image.id]))
+        self.assertEqual([tag['name'] for tag in response.json()['tags']], ['Granite', 'Kitchen', 'Polished'])
+
+    def test_sparse_fieldset_skips_tags_unless_requested(self):
+        url = reverse('gallery:image-list')
+        # COUNT and images only
+        with self.assertNumQueries(2):
+            results = self.client.get(url + '?fields=id,title,image_srcset').json()['results']
+        self.assertEqual(set(results[0]), {'id', 'title', 'image_srcset'})
+
+        with self.assertNumQueries(3):
+            results = self.client.get(url + '?fields=id,category,tags&expand=category').json()['results']
+        self.assertEqual(results[0]['category']['name'], 'Floors')
+        self.assertTrue(any(result['tags'] for result in results))
+
+        image = GalleryImage.objects.get(title='Project 3')
+        result = self.client.get(reverse('gallery:image-detail', args=[image.id]) + '?fields=tags').json()
+        self.assertEqual([tag['name'] for tag in result['tags']], ['Granite', 'Kitchen', 'Polished'])
+
+        result = self.client.get(
+            reverse('gallery:image-detail', args=[image.id]) + '?fields=category&expand=category'
+        ).json()
+        self.assertEqual(result['category']['name'], 'Floors')
+
+
+class GalleryCategoryCountQueryTests(TestCase):
+    """Gallery category endpoints must not issue one COUNT query per category"""
+
+    def setUp(self):
+        get_api_cache().clear()
+        for index in range(5):
+            category = GalleryCategory.objects.create(name=f'Category {index}')
+            GalleryImage.objects.create(title=f'Image {index}', category=category, image='gallery/a.jpg')
+            GalleryImage.objects.create(
+                title=f'Hidden {index}', category=category, image='gallery/b.jpg', is_active=False
+            )
+
+    def test_categories_with_count_uses_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('gallery:categories-with-count'))
+        self.assertEqual({row['image_count'] for row in response.json()}, {1})
+
+    def test_category_list_uses_fixed_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('gallery:category-list'))
+        self.assertEqual({row['image_count'] for row in response.json()['results']}, {1})
+
+
+class GalleryCounterTests(TestCase):
+
+    def test_image_and_tag_counters(self):
+        category = GalleryCategory.objects.create(name='Floors')
+        tag = GalleryTag.objects.create(name='Polished')
+        image = GalleryImage.objects.create(title='Lobby', category=category, image='gallery/lobby.jpg')
+        link = GalleryImageTag.objects.create(image=image, tag=tag)
+        category.refresh_from_db()
+        tag.refresh_from_db()
+        self.assertEqual((category.active_image_count, tag.usage_count), (1, 1))
+
+        image.is_active = False
+        image.save()
+        link.delete()
+        category.refresh_from_db()
+        tag.refresh_from_db()
+        self.assertEqual((category.active_image_count, tag.usage_count), (0, 0))
+
+
+class GalleryAsyncViewTests(TestCase):
+
+    def test_async_list_matches_sync_view(self):
+        from .views import AsyncGalleryImageListView
+
+        category = GalleryCategory.objects.create(name='Floors')
+        tag = GalleryTag.objects.create(name='Polished')
+        for index in range(3):
+            image = GalleryImage.objects.create(title=f'Floor {index}', category=category, image='gallery/a.jpg')
+            GalleryImageTag.objects.create(image=image, tag=tag)
+
+        get_api_cache().clear()
+        expected = self.client.get(reverse('gallery:image-list')).json()
+        get_api_cache().clear()
+        request = RequestFactory().get(reverse('gallery:image-list'))
+        response = async_to_sync(AsyncGalleryImageListView.as_view())(request)
+        self.assertEqual(json.loads(response.content), expected)
+
+
+class GalleryResponseCacheTests(TestCase):
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    def test_tagging_an_image_invalidates(self):
+        category = GalleryCategory.objects.create(name='Stairs')
+        image = GalleryImage.objects.create(title='Spiral', category=category, image='gallery/spiral.jpg')
+        url = reverse('gallery:image-detail', args=[image.id])
+        self.assertEqual(self.client.get(url).json()['tags'], [])
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        GalleryImageTag.objects.create(image=image, tag=GalleryTag.objects.create(name='Marble'))
+        self.assertEqual([tag['name'] for tag in self.client.get(url).json()['tags']], ['Marble'])
+
+    def test_renaming_a_tag_changes_image_etag(self):
+        category = GalleryCategory.objects.create(name='Mosaic')
+        image = GalleryImage.objects.create(title='Medallion', category=category, image='gallery/medallion.jpg')
+        tag = GalleryTag.objects.create(name='Inlay')
+        GalleryImageTag.objects.create(image=image, tag=tag)
+        url = reverse('gallery:image-detail', args=[image.id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        tag.name = 'Water-jet Inlay'
+        tag.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tags'][0]['name'], 'Water-jet Inlay')
+
+
+class GalleryKeysetPaginationTests(TestCase):
+
+    def test_mixed_direction_ordering(self):
+        get_api_cache().clear()
+        categories = [GalleryCategory.objects.create(name=name) for name in ('Floors', 'Walls')]
+        for index in range(11):
+            GalleryImage.objects.create(
+                title=f'Project {index}',
+                category=categories[index % 2],
+                order=index % 3,
+                image=f'gallery/{index}.jpg',
+            )
+        self.assertEqual(self.walk_keyset_pages(), self.expected_ids())
+
+    def test_categories_follow_display_order_not_ids(self):
+        get_api_cache().clear()
+        # B gets the lower id but sorts after A in GalleryCategory.Meta.ordering
+        categories = [
+            GalleryCategory.objects.create(name='B', order=2),
+            GalleryCategory.objects.create(name='A', order=1),
+        ]
+        for index in range(12):
+            GalleryImage.objects.create(
+                title=f'Project {index}', category=categories[index // 6], image=f'gallery/{index}.jpg',
+            )
+        expected = self.expected_ids()
+        self.assertEqual(
+            set(GalleryImage.objects.filter(id__in=expected[:6]).values_list('category__name', flat=True)), {'A'}
+        )
+        self.assertEqual(self.walk_keyset_pages(), expected)
+        # Page-number pages keep the same grouping by category display order
+        first_page = self.client.get(reverse('gallery:image-list')).json()['results']
+        self.assertEqual({item['category_name'] for item in first_page[:6]}, {'A'})
+
+    def test_keyset_cursor_survives_sparse_fieldsets(self):
+        get_api_cache().clear()
+        categories = [
+            GalleryCategory.objects.create(name='B', order=2),
+            GalleryCategory.objects.create(name='A', order=1),
+        ]
+        for index in range(12):
+            GalleryImage.objects.create(
+                title=f'Project {index}', category=categories[index % 2], image=f'gallery/{index}.jpg',
+            )
+        self.assertEqual(self.walk_keyset_pages('&fields=id,title'), self.expected_ids())
+
+    def expected_ids(self):
+        ordering = ['category__order', 'category__name', 'category_id', 'order', '-created_at', 'id']
+        return list(GalleryImage.objects.order_by(*ordering).values_list('id', flat=True))
+
+    def walk_keyset_pages(self, extra=''):
+        seen = []
+        next_url = reverse('gallery:image-list') + '?pagination=keyset' + extra
+        while next_url:
+            data = self.client.get(next_url).json()
+            seen.extend(item['id'] for item in data['results'])
+            next_url = data['next']
+        return seen
+
+
+class GallerySearchTests(TestCase):
+
+    def test_search_matches_project_location(self):
+        get_api_cache().clear()
+        category = GalleryCategory.objects.create(name='Floors')
+        GalleryImage.objects.create(title='Lobby', project_location='Bahria Town, Lahore', category=category, image='gallery/a.jpg')
+        GalleryImage.objects.create(title='Lahore Villa', category=category, image='gallery/b.jpg')
+        GalleryImage.objects.create(title='Office', project_location='Karachi', category=category, image='gallery/c.jpg')
+        response = self.client.get(reverse('gallery:image-list'), {'search': 'lahore'})
+        self.assertEqual([item['title'] for item in response.json()['results']], ['Lahore Villa', 'Lobby'])
@@ -1,12 +1,22 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'gallery'
 
+if getattr(settings, 'ASYNC_CATALOG_VIEWS', False):
+    image_list = views.AsyncGalleryImageListView
+    featured_images = views.AsyncFeaturedGalleryImagesView
+    image_detail = views.AsyncGalleryImageDetailView
+else:
+    image_list = views.GalleryImageListView
+    featured_images = views.FeaturedGalleryImagesView
+    image_detail = views.GalleryImageDetailView
+
 urlpatterns = [
     path('categories/', views.GalleryCategoryListView.as_view(), name='category-list'),
     path('categories/with-count/', views.gallery_categories_with_count, name='categories-with-count'),
-    path('images/', views.GalleryImageListView.as_view(), name='image-list'),
-    path('images/featured/', views.FeaturedGalleryImagesView.as_view(), name='featured-images'),
-    path('images/<int:id>/', views.GalleryImageDetailView.as_view(), name='image-detail'),
+    path('images/', image_list.as_view(), name='image-list'),
+    path('images/featured/', featured_images.as_view(), name='featured-images'),
+    path('images/<int:id>/', image_detail.as_view(), name='image-detail'),
 ]
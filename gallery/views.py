@@ -2,46 +2,89 @@ from rest_framework import generics, filters
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import GalleryCategory, GalleryImage
+from django.utils.decorators import method_decorator
+from django.db.models import F, Prefetch
+from sundar_marbles.async_views import AsyncCatalogView
+from sundar_marbles.cache import cache_api_response
+from sundar_marbles.conditional import ConditionalGetMixin
+from sundar_marbles.fieldsets import SparseFieldsetMixin
+from sundar_marbles.queryguard import query_budget
+from sundar_marbles.search import FullTextSearchFilter
+from .models import GalleryCategory, GalleryImage, GalleryImageTag
 from .serializers import GalleryCategorySerializer, GalleryImageSerializer
 
 
+def categories_with_image_count():
+    """Active gallery categories with ``image_count`` read from the maintained counter"""
+    return GalleryCategory.objects.filter(is_active=True).annotate(
+        image_count=F('active_image_count')
+    ).order_by('order', 'name')
+
+
+def images_for_serialization(queryset):
+    """Load the category and tags that GalleryImageSerializer renders"""
+    # search_vector is only read by the database (sundar_marbles/search.py)
+    return queryset.defer('search_vector').select_related('category').prefetch_related(
+        Prefetch('image_tags', queryset=GalleryImageTag.objects.select_related('tag').order_by('tag__name'))
+    )
+
+
+@method_decorator(cache_api_response, name='dispatch')
 class GalleryCategoryListView(generics.ListAPIView):
-    queryset = GalleryCategory.objects.filter(is_active=True).order_by('order', 'name')
+    queryset = categories_with_image_count()
     serializer_class = GalleryCategorySerializer
+    query_budget = 2
 
 
-class GalleryImageListView(generics.ListAPIView):
-    queryset = GalleryImage.objects.filter(is_active=True)
+@method_decorator(cache_api_response, name='dispatch')
+class GalleryImageListView(SparseFieldsetMixin, ConditionalGetMixin, generics.ListAPIView):
+    queryset = images_for_serialization(GalleryImage.objects.filter(is_active=True))
     serializer_class = GalleryImageSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['category', 'is_featured']
-    search_fields = ['title', 'description', 'project_location']
     ordering_fields = ['title', 'completion_date', 'created_at', 'order']
     ordering = ['category', 'order', '-created_at']
+    # Used instead of ``ordering`` for ?pagination=keyset: the same order, with
+    # GalleryCategory.Meta.ordering spelled out so the cursor can carry it
+    keyset_ordering = ['category__order', 'category__name', 'category_id', 'order', '-created_at', 'id']
+    # Validators, page, tags; ?category= adds its lookup and a COUNT
+    query_budget = 5
 
 
-class GalleryImageDetailView(generics.RetrieveAPIView):
-    queryset = GalleryImage.objects.filter(is_active=True)
+@method_decorator(cache_api_response, name='dispatch')
+class GalleryImageDetailView(SparseFieldsetMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+    queryset = images_for_serialization(GalleryImage.objects.filter(is_active=True))
     serializer_class = GalleryImageSerializer
     lookup_field = 'id'
+    query_budget = 3
 
 
-class FeaturedGalleryImagesView(generics.ListAPIView):
-    queryset = GalleryImage.objects.filter(is_active=True, is_featured=True)
+@method_decorator(cache_api_response, name='dispatch')
+class FeaturedGalleryImagesView(SparseFieldsetMixin, ConditionalGetMixin, generics.ListAPIView):
+    queryset = images_for_serialization(GalleryImage.objects.filter(is_active=True, is_featured=True))
     serializer_class = GalleryImageSerializer
+    query_budget = 3
+
+
+@method_decorator(cache_api_response, name='get')
+class AsyncGalleryImageListView(AsyncCatalogView):
+    drf_view = GalleryImageListView
+
+
+@method_decorator(cache_api_response, name='get')
+class AsyncGalleryImageDetailView(AsyncCatalogView):
+    drf_view = GalleryImageDetailView
+
+
+@method_decorator(cache_api_response, name='get')
+class AsyncFeaturedGalleryImagesView(AsyncCatalogView):
+    drf_view = FeaturedGalleryImagesView
 
 
+@query_budget(1)
+@cache_api_response
 @api_view(['GET'])
 def gallery_categories_with_count(request):
     """Get all gallery categories with image count"""
-    categories = GalleryCategory.objects.filter(is_active=True).order_by('order', 'name')
-    data = []
-    for category in categories:
-        data.append({
-            'id': category.id,
-            'name': category.name,
-            'slug': category.slug,
-            'image_count': category.images.filter(is_active=True).count()
-        })
-    return Response(data)
+    categories = categories_with_image_count().values('id', 'name', 'slug', 'image_count')
+    return Response(list(categories))
@@ -1,13 +1,19 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from sundar_marbles.derivatives import derivative_url
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from .models import Category, Product, ProductImage
 
 
+def preview_url(obj):
+    """Thumbnail rendition when available, so the changelist does not load originals"""
+    return derivative_url(obj.image_derivatives, obj.image.storage) or obj.image.url
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'is_active', 'created_at']
+    list_display = ['name', 'slug', 'is_active', 'active_product_count', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
@@ -56,7 +62,7 @@ class ProductAdmin(admin.ModelAdmin):
     def image_preview(self, obj):
         if obj.image:
             try:
-                return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;" />', obj.image.url)
+                return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;" />', preview_url(obj))
             except Exception as e:
                 return f"Image error: {str(e)}"
         return "No Image"
@@ -105,7 +111,7 @@ class ProductImageAdmin(admin.ModelAdmin):
     def image_preview(self, obj):
         if obj.image:
             try:
-                return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;" />', obj.image.url)
+                return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;" />', preview_url(obj))
             except Exception as e:
                 return f"Image error: {str(e)}"
         return "No Image"
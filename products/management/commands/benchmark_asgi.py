@@ -0,0 +1,123 @@
+"""
+Management command to compare the sync (WSGI) and async (ASGI) catalog views under load
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SERVERS = {
+    'wsgi': ['sundar_marbles.wsgi:application'],
+    'asgi': ['sundar_marbles.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Start gunicorn with sync and with async catalog views at the same worker count and compare throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers for both servers')
+        parser.add_argument('--concurrency', type=int, default=32, help='Requests in flight at once')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per server')
+        parser.add_argument(
+            '--db-latency', type=float, default=30,
+            help='Milliseconds added to every SQL statement, simulating a remote database',
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Endpoint to request (repeatable); defaults to the product and gallery lists',
+        )
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/api/products/', '/api/gallery/images/']
+        base_url = f"http://127.0.0.1:{options['port']}"
+        urls = [base_url + path for path in paths]
+
+        results = {}
+        for mode in SERVERS:
+            self.stdout.write(f"Starting {mode} server with {options['workers']} workers...")
+            server = self.start_server(mode, options)
+            try:
+                self.wait_until_ready(server, urls[0])
+                self.run_load(urls, options['concurrency'], options['concurrency'])  # warm up
+                results[mode] = self.run_load(urls, options['requests'], options['concurrency'])
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+        self.stdout.write(
+            f"\n{options['requests']} requests, concurrency {options['concurrency']}, "
+            f"{options['db_latency']:g}ms per query"
+        )
+        self.stdout.write(f"{'server':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<8}{result['throughput']:>10.1f}{result['p50']:>10.1f}"
+                f"{result['p95']:>10.1f}{result['p99']:>10.1f}{result['errors']:>8}"
+            )
+        speedup = results['asgi']['throughput'] / results['wsgi']['throughput']
+        self.stdout.write(self.style.SUCCESS(f"\n✅ ASGI throughput is {speedup:.1f}x WSGI at equal worker count"))
+
+    def start_server(self, mode, options):
+        env = {
+            **os.environ,
+            'ASYNC_CATALOG_VIEWS': str(mode == 'asgi'),
+            # Measure the views, not the response cache
+            'API_CACHE_TIMEOUT': '0',
+            'BENCHMARK_DB_LATENCY_MS': str(options['db_latency']),
+        }
+        command = [
+            sys.executable, '-m', 'gunicorn', *SERVERS[mode],
+            '--workers', str(options['workers']),
+            '--bind', f"127.0.0.1:{options['port']}",
+            '--config', 'python:sundar_marbles.gunicorn_benchmark',
+            '--log-level', 'warning',
+        ]
+        return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+
+    def wait_until_ready(self, server, url, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn exited with status {server.returncode}')
+            try:
+                with urlopen(url, timeout=5):
+                    return
+            except (URLError, ConnectionError):
+                time.sleep(0.5)
+        raise CommandError(f'{url} did not answer within {timeout}s')
+
+    def run_load(self, urls, total, concurrency):
+        def fetch(url):
+            started = time.perf_counter()
+            try:
+                with urlopen(url, timeout=60) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (URLError, ConnectionError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(fetch, islice(cycle(urls), total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(duration * 1000 for duration, _ in samples)
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            'throughput': total / elapsed,
+            'p50': percentiles[49],
+            'p95': percentiles[94],
+            'p99': percentiles[98],
+            'errors': sum(1 for _, ok in samples if not ok),
+        }
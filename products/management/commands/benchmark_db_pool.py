@@ -0,0 +1,178 @@
+"""
+Management command to compare a new database connection per request with the connection pool.
+
+Starts gunicorn as startup.sh does (azure_wsgi, preloaded, on settings_production)
+twice against the PostgreSQL database in DATABASE_URL: once with
+DATABASE_POOL=False (every request connects and disconnects, as production did
+before pooling) and once with the pool, then sends the same requests to every
+public endpoint with the response cache off.
+
+Run it from the App Service region against a Neon branch to measure the real
+TLS handshake, or against a local PostgreSQL with the distance simulated:
+
+    export DATABASE_URL=postgresql://postgres@localhost/marble
+    python manage.py migrate && python manage.py generate_synthetic_catalog --scale small
+    python manage.py benchmark_db_pool --connect-latency 600 --db-latency 150
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from sundar_marbles.endpoints import public_endpoints
+
+MODES = {
+    'per-request': 'False',
+    'pool': 'True',
+}
+
+
+class Command(BaseCommand):
+    help = 'Start gunicorn with and without the database connection pool and compare request latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers for both servers')
+        parser.add_argument(
+            '--threads', type=int, default=1,
+            help='Threads per worker (more than 1 uses gthread workers, and as many pooled connections)',
+        )
+        parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight at once')
+        parser.add_argument('--requests', type=int, default=300, help='Requests per server')
+        parser.add_argument(
+            '--connect-latency', type=float, default=0,
+            help='Milliseconds added to every new database connection, simulating the handshake with Neon',
+        )
+        parser.add_argument(
+            '--db-latency', type=float, default=0,
+            help='Milliseconds added to every SQL statement, simulating the round trip to Neon',
+        )
+        parser.add_argument('--port', type=int, default=8767)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Connection pooling needs PostgreSQL; point DATABASE_URL at a PostgreSQL database')
+        if not os.environ.get('DATABASE_URL'):
+            raise CommandError('Set DATABASE_URL: settings_production reads the database from it')
+
+        base_url = f"http://127.0.0.1:{options['port']}"
+        urls = [
+            f'{base_url}{path}?{urlencode(params)}' if params else base_url + path
+            for _, path, params in public_endpoints()
+        ]
+        self.print_connect_cost(options)
+
+        results = {}
+        for mode, pooled in MODES.items():
+            self.stdout.write(f"Starting gunicorn ({mode} connections, {options['workers']} workers)...")
+            server = self.start_server(pooled, options)
+            try:
+                self.wait_until_ready(server, urls[0])
+                self.run_load(urls, options['concurrency'] * 2, options['concurrency'])  # warm up
+                results[mode] = self.run_load(urls, options['requests'], options['concurrency'])
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+        self.stdout.write(
+            f"\n{options['requests']} requests over {len(urls)} endpoints, concurrency {options['concurrency']}"
+        )
+        self.stdout.write(f"{'connections':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<14}{result['throughput']:>10.1f}{result['p50']:>10.1f}"
+                f"{result['p95']:>10.1f}{result['p99']:>10.1f}{result['errors']:>8}"
+            )
+        saved = results['per-request']['p50'] - results['pool']['p50']
+        speedup = results['pool']['throughput'] / results['per-request']['throughput']
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Pooling saves {saved:.1f}ms at p50 and serves {speedup:.1f}x the requests per second"
+        ))
+
+    def print_connect_cost(self, options):
+        """Show what one new connection costs compared with a query on an open one"""
+        connects, queries = [], []
+        for _ in range(5):
+            started = time.perf_counter()
+            with connection.Database.connect(**connection.get_connection_params()) as conn:
+                connects.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                conn.execute('SELECT 1')
+                queries.append((time.perf_counter() - started) * 1000)
+        simulated = ''
+        if options['connect_latency'] or options['db_latency']:
+            simulated = f" (+{options['connect_latency']:g}ms and +{options['db_latency']:g}ms simulated)"
+        self.stdout.write(
+            f"New connection {statistics.median(connects):.1f}ms, "
+            f"query on an open one {statistics.median(queries):.1f}ms{simulated}"
+        )
+
+    def start_server(self, pooled, options):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'sundar_marbles.settings_production',
+            'DATABASE_POOL': pooled,
+            'GUNICORN_THREADS': str(options['threads']),
+            # Measure the database, not the response cache
+            'API_CACHE_TIMEOUT': '0',
+            'APP_LOG_LEVEL': 'WARNING',
+            'BENCHMARK_CONNECT_LATENCY_MS': str(options['connect_latency']),
+            'BENCHMARK_DB_LATENCY_MS': str(options['db_latency']),
+        }
+        command = [
+            # The app and preloading startup.sh runs in production
+            sys.executable, '-m', 'gunicorn', 'azure_wsgi:application', '--preload',
+            '--workers', str(options['workers']),
+            '--threads', str(options['threads']),
+            '--bind', f"127.0.0.1:{options['port']}",
+            '--config', 'python:sundar_marbles.gunicorn_benchmark',
+            '--log-level', 'warning',
+        ]
+        return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+
+    def wait_until_ready(self, server, url, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn exited with status {server.returncode}')
+            try:
+                with urlopen(url, timeout=5):
+                    return
+            except (URLError, ConnectionError):
+                time.sleep(0.5)
+        raise CommandError(f'{url} did not answer within {timeout}s')
+
+    def run_load(self, urls, total, concurrency):
+        def fetch(url):
+            started = time.perf_counter()
+            try:
+                with urlopen(url, timeout=60) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (HTTPError, URLError, ConnectionError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(fetch, islice(cycle(urls), total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(duration * 1000 for duration, _ in samples)
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            'throughput': total / elapsed,
+            'p50': percentiles[49],
+            'p95': percentiles[94],
+            'p99': percentiles[98],
+            'errors': sum(1 for _, ok in samples if not ok),
+        }
@@ -0,0 +1,181 @@
+"""
+Management command to benchmark every public catalog endpoint in-process.
+
+Each endpoint from sundar_marbles/endpoints.py is requested through Django's
+test client (no server, no network): ``--warmup`` requests first, then
+``--iterations`` timed ones. A throwaway query parameter keeps the response
+cache out of the measurement unless ``--cached`` is given. Per endpoint the
+results hold latency percentiles, queries per request against the view's
+query budget (see queryguard.py) and the response size; ``--output`` writes
+them as JSON, ``--compare`` prints the change against an earlier file.
+
+Meant for an offline SQLite copy filled by generate_synthetic_catalog:
+
+    export DATABASE_URL=sqlite:///benchmark.sqlite3
+    python manage.py migrate && python manage.py generate_synthetic_catalog --scale large
+    python manage.py benchmark_endpoints --output before.json
+    git checkout my-branch
+    python manage.py benchmark_endpoints --output after.json --compare before.json --max-regression 20
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+import uuid
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from contact.models import ContactMessage
+from gallery.models import GalleryImage, GalleryTag
+from products.models import Category, Product
+from sundar_marbles.endpoints import public_endpoints, request_host
+from sundar_marbles.queryguard import collecting
+
+DATASET_MODELS = {
+    'categories': Category,
+    'products': Product,
+    'gallery_images': GalleryImage,
+    'tags': GalleryTag,
+    'contact_messages': ContactMessage,
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure latency percentiles and query counts of every public API endpoint and write them as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per endpoint first')
+        parser.add_argument(
+            '--max-seconds', type=float, default=30,
+            help='Stop timing an endpoint after this long (it still gets two requests)',
+        )
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints',
+            help='Only benchmark endpoints whose label contains this text (repeatable)',
+        )
+        parser.add_argument('--cached', action='store_true', help='Let the API response cache answer')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--compare', help='Earlier results file to compare against')
+        parser.add_argument(
+            '--max-regression', type=float,
+            help='With --compare: fail when a p50 grows by more than this percentage or a query count grows',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 2:
+            raise CommandError('--iterations must be at least 2')
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  Benchmarking against {connection.vendor}: latencies include its network round trips'
+            ))
+
+        client = Client(HTTP_HOST=request_host())
+        results = {'meta': self.describe_run(options), 'endpoints': {}}
+        for label, path, params in public_endpoints():
+            if options['endpoints'] and not any(text in label for text in options['endpoints']):
+                continue
+            results['endpoints'][label] = self.measure(client, path, params, options)
+            self.print_result(label, results['endpoints'][label])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Results written to {options['output']}"))
+        if options['compare']:
+            self.compare(results, options['compare'], options['max_regression'])
+
+    def describe_run(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'describe', '--always', '--dirty'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'iterations': options['iterations'],
+            'cached': options['cached'],
+            'rows': {name: model.objects.count() for name, model in DATASET_MODELS.items()},
+        }
+
+    def measure(self, client, path, params, options):
+        def get():
+            if options['cached']:
+                return client.get(path, params)
+            return client.get(path, {**params, '_benchmark': uuid.uuid4().hex})
+
+        for _ in range(options['warmup']):
+            get()
+
+        latencies = []
+        deadline = time.perf_counter() + options['max_seconds']
+        with collecting() as reports:
+            for _ in range(options['iterations']):
+                started = time.perf_counter()
+                response = get()
+                latencies.append((time.perf_counter() - started) * 1000)
+                if len(latencies) >= 2 and started > deadline:
+                    break
+
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        return {
+            'path': path,
+            'params': params,
+            'status': response.status_code,
+            'bytes': len(response.content),
+            'samples': len(latencies),
+            'queries': max(report['queries'] for report in reports),
+            'budget': reports[-1]['budget'],
+            'repeated_queries': len(reports[-1]['repeated']),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'p50_ms': round(percentiles[49], 3),
+            'p95_ms': round(percentiles[94], 3),
+            'p99_ms': round(percentiles[98], 3),
+            'max_ms': round(max(latencies), 3),
+        }
+
+    def print_result(self, label, result):
+        budget = '' if result['budget'] is None else f"/{result['budget']}"
+        self.stdout.write(
+            f"{label:<32} {result['status']:>4} {result['queries']:>3}{budget:<4} queries "
+            f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms"
+        )
+
+    def compare(self, results, path, max_regression):
+        try:
+            with open(path, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+        self.stdout.write(f"\nCompared with {path} ({baseline['meta'].get('commit') or 'unknown commit'}):")
+        regressions = []
+        for label, result in results['endpoints'].items():
+            before = baseline['endpoints'].get(label)
+            if before is None:
+                self.stdout.write(f"{label:<32} new endpoint")
+                continue
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+            self.stdout.write(
+                f"{label:<32} p50 {before['p50_ms']:>8.2f} -> {result['p50_ms']:>8.2f}ms ({change:+6.1f}%)  "
+                f"queries {before['queries']} -> {result['queries']}"
+            )
+            if max_regression is not None and change > max_regression:
+                regressions.append(f'{label}: p50 {change:+.1f}%')
+            if max_regression is not None and result['queries'] > before['queries']:
+                regressions.append(f"{label}: {before['queries']} -> {result['queries']} queries")
+
+        if regressions:
+            raise CommandError('Regressions: ' + '; '.join(regressions))
@@ -0,0 +1,141 @@
+"""
+Management command to compare ``serve_media`` with the ``static()`` view for local media
+"""
+import hashlib
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+VIEWS = {
+    'static()': '/static-serve/',
+    'serve_media': '/serve-media/',
+}
+# 'range' asks for the first 64 KiB; 'revalidate' sends the validators of a first response
+SCENARIOS = ['full', 'range', 'revalidate']
+
+
+class Command(BaseCommand):
+    help = 'Serve one media file through static() and serve_media under gunicorn and compare them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=2048, help='Size of the test file in KiB')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers')
+        parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight at once')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per view and scenario')
+        parser.add_argument('--port', type=int, default=8766)
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp()
+        try:
+            content = os.urandom(options['size'] * 1024)
+            name = f"benchmark/{hashlib.sha256(content).hexdigest()}.jpg"
+            os.makedirs(os.path.join(media_root, 'benchmark'))
+            with open(os.path.join(media_root, name), 'wb') as media:
+                media.write(content)
+
+            server = self.start_server(media_root, options)
+            try:
+                base_url = f"http://127.0.0.1:{options['port']}"
+                self.wait_until_ready(server, base_url + VIEWS['serve_media'] + name)
+                results = {
+                    (view, scenario): self.run_load(base_url + prefix + name, scenario, options)
+                    for view, prefix in VIEWS.items()
+                    for scenario in SCENARIOS
+                }
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        self.stdout.write(
+            f"\n{options['size']} KiB file, {options['requests']} requests, "
+            f"concurrency {options['concurrency']}, {options['workers']} workers"
+        )
+        self.stdout.write(
+            f"{'view':<13}{'scenario':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'MiB/s':>10}{'status':>8}"
+        )
+        for (view, scenario), result in results.items():
+            self.stdout.write(
+                f"{view:<13}{scenario:<12}{result['throughput']:>10.1f}{result['p50']:>10.1f}"
+                f"{result['p95']:>10.1f}{result['mib_per_second']:>10.1f}{result['status']:>8}"
+            )
+        speedup = results[('serve_media', 'full')]['throughput'] / results[('static()', 'full')]['throughput']
+        self.stdout.write(self.style.SUCCESS(f"\n✅ serve_media full-file throughput is {speedup:.1f}x static()"))
+
+    def start_server(self, media_root, options):
+        env = {
+            **os.environ,
+            'BENCHMARK_URLCONF': 'sundar_marbles.benchmark_urls',
+            'BENCHMARK_MEDIA_ROOT': media_root,
+        }
+        command = [
+            sys.executable, '-m', 'gunicorn', 'sundar_marbles.wsgi:application',
+            '--workers', str(options['workers']),
+            '--bind', f"127.0.0.1:{options['port']}",
+            '--config', 'python:sundar_marbles.gunicorn_benchmark',
+            '--log-level', 'warning',
+        ]
+        return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+
+    def wait_until_ready(self, server, url, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn exited with status {server.returncode}')
+            try:
+                with urlopen(url, timeout=5):
+                    return
+            except (URLError, ConnectionError):
+                time.sleep(0.5)
+        raise CommandError(f'{url} did not answer within {timeout}s')
+
+    def request_headers(self, url, scenario):
+        if scenario == 'range':
+            return {'Range': 'bytes=0-65535'}
+        if scenario == 'revalidate':
+            with urlopen(url, timeout=60) as response:
+                validators = {'If-None-Match': response.headers.get('ETag')}
+                if response.headers.get('Last-Modified'):
+                    validators['If-Modified-Since'] = response.headers['Last-Modified']
+            return {key: value for key, value in validators.items() if value}
+        return {}
+
+    def run_load(self, url, scenario, options):
+        headers = self.request_headers(url, scenario)
+
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                with urlopen(Request(url, headers=headers), timeout=60) as response:
+                    body = response.read()
+                    status = response.status
+            except HTTPError as e:
+                # urllib raises on 304
+                body, status = b'', e.code
+            return time.perf_counter() - started, len(body), status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            samples = list(pool.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(duration * 1000 for duration, _, _ in samples)
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            'throughput': len(samples) / elapsed,
+            'p50': percentiles[49],
+            'p95': percentiles[94],
+            'mib_per_second': sum(size for _, size, _ in samples) / elapsed / 2**20,
+            'status': ','.join(sorted({str(status) for _, _, status in samples})),
+        }
@@ -0,0 +1,113 @@
+"""
+Management command to EXPLAIN the SQL behind every public catalog endpoint
+"""
+import re
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from sundar_marbles.endpoints import public_endpoints, request_host
+
+# Postgres: "Seq Scan on products_product"
+POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+# SQLite: "SCAN products_product" (index and FTS scans say USING ... / VIRTUAL TABLE)
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+# A sort of every matching row, rather than reading them in index order
+# ("Incremental Sort" and "RIGHT PART OF ORDER BY" only finish an index's order)
+POSTGRES_SORT = re.compile(r'^(?:->\s+)?Sort\s+\(')
+SQLITE_SORT = re.compile(r'^USE TEMP B-TREE FOR ORDER BY$')
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the queries each public API endpoint executes and flag sequential scans and sorted pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Use EXPLAIN ANALYZE on PostgreSQL (executes the queries)',
+        )
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Print the full plan of every query, not only the flagged ones',
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan',
+            action='store_true',
+            help='Exit with an error if any query scans a whole table',
+        )
+        parser.add_argument(
+            '--fail-on-sort',
+            action='store_true',
+            help='Exit with an error if any page of a list is sorted instead of read in index order',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f'EXPLAIN parsing is not implemented for {connection.vendor}')
+
+        client = Client(HTTP_HOST=request_host())
+        flagged = sorted_pages = 0
+        for label, path, params in public_endpoints():
+            # A throwaway parameter keeps the response cache from answering
+            params = {**params, '_explain': uuid.uuid4().hex}
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(path, params)
+            self.stdout.write(f"\n{label}: GET {path} -> {response.status_code}, {len(context)} queries")
+
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                plan = self.explain(sql, options['analyze'])
+                scans = self.sequential_scans(plan)
+                if scans:
+                    flagged += 1
+                    self.stdout.write(self.style.WARNING(f"  ⚠️  full scan of {', '.join(scans)}: {sql[:160]}"))
+                # A list page (ORDER BY ... LIMIT) that sorts reads every matching row first
+                sorts = ' LIMIT ' in sql and self.sorts(plan)
+                if sorts:
+                    sorted_pages += 1
+                    self.stdout.write(self.style.WARNING(f"  ⚠️  sorts instead of reading an index in order: {sql[:160]}"))
+                if scans or sorts or options['plans']:
+                    for line in plan:
+                        self.stdout.write(f"      {line}")
+
+        if flagged:
+            message = f"{flagged} queries scan a whole table (expected on tiny tables; re-run on production-sized data)"
+            if options['fail_on_seq_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(f"\n⚠️  {message}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('\n✅ No sequential scans'))
+        if sorted_pages:
+            message = f"{sorted_pages} list pages are sorted instead of read in index order"
+            if options['fail_on_sort']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(f"⚠️  {message}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Every list page is read in index order'))
+
+    def explain(self, sql, analyze=False):
+        """Return the plan of ``sql`` as a list of text lines"""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f"EXPLAIN {'ANALYZE ' if analyze else ''}{sql}")
+                return [row[0] for row in cursor.fetchall()]
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def sequential_scans(self, plan):
+        if connection.vendor == 'postgresql':
+            return sorted({table for line in plan for table in POSTGRES_SEQ_SCAN.findall(line)})
+        return sorted({
+            match.group(1) for line in plan
+            if (match := SQLITE_FULL_SCAN.match(line.strip()))
+        })
+
+    def sorts(self, plan):
+        pattern = POSTGRES_SORT if connection.vendor == 'postgresql' else SQLITE_SORT
+        return any(pattern.match(line.strip()) for line in plan)
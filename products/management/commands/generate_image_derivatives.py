@@ -0,0 +1,36 @@
+"""
+Management command to (re)build responsive image derivatives for existing rows
+"""
+from django.core.management.base import BaseCommand
+from gallery.models import GalleryImage
+from products.models import Product, ProductImage
+from sundar_marbles.cache import invalidate_api_cache
+from sundar_marbles.derivatives import refresh_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail/medium/large WebP and JPEG renditions for product and gallery images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate renditions even if they are already up to date',
+        )
+
+    def handle(self, *args, **options):
+        for model in (Product, ProductImage, GalleryImage):
+            generated = 0
+            queryset = model.objects.exclude(image='')
+            for instance in queryset.iterator(chunk_size=100):
+                if options['force']:
+                    instance.image_derivatives = {}
+                try:
+                    if refresh_derivatives(instance):
+                        generated += 1
+                except OSError as e:
+                    self.stdout.write(self.style.WARNING(f"⚠️  {instance}: {e}"))
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {model._meta.verbose_name_plural}: generated renditions for {generated} of {queryset.count()}"
+            ))
+        invalidate_api_cache()
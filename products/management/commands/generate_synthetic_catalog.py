@@ -0,0 +1,256 @@
+"""
+Management command to fill the database with a deterministic synthetic catalog.
+
+Builds product categories, products with additional images, gallery
+categories, gallery images with tags and contact messages at a chosen scale,
+using bulk inserts. The same ``--seed`` and counts always produce the same
+rows (apart from timestamps), so benchmark results from different commits are
+comparable. Image fields point at content-addressed names with derivative
+and placeholder metadata filled in; no files are written.
+
+    DATABASE_URL=sqlite:///benchmark.sqlite3 python manage.py migrate
+    DATABASE_URL=sqlite:///benchmark.sqlite3 python manage.py generate_synthetic_catalog --scale large
+
+Synthetic rows are recognizable by their ``synthetic-`` slugs (and
+``@synthetic.example`` addresses); ``--replace`` deletes them first.
+"""
+import hashlib
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from contact.models import ContactMessage
+from gallery.models import GalleryCategory, GalleryImage, GalleryImageTag, GalleryTag
+from products.models import Category, Product, ProductImage
+from sundar_marbles.cache import invalidate_api_cache
+from sundar_marbles.counters import COUNTERS, recount_field
+from sundar_marbles.derivatives import FORMATS, RENDITIONS, derivative_name
+from sundar_marbles.search import update_search_index
+
+SCALES = {
+    'small': {
+        'categories': 5, 'products': 200, 'images_per_product': 2,
+        'gallery_categories': 5, 'gallery_images': 1_000, 'tags': 30, 'tags_per_image': 3,
+        'contact_messages': 200,
+    },
+    'medium': {
+        'categories': 10, 'products': 2_000, 'images_per_product': 2,
+        'gallery_categories': 10, 'gallery_images': 10_000, 'tags': 100, 'tags_per_image': 3,
+        'contact_messages': 2_000,
+    },
+    'large': {
+        'categories': 20, 'products': 10_000, 'images_per_product': 3,
+        'gallery_categories': 20, 'gallery_images': 100_000, 'tags': 300, 'tags_per_image': 4,
+        'contact_messages': 20_000,
+    },
+}
+
+STONES = [
+    'Carrara', 'Calacatta', 'Statuario', 'Emperador', 'Nero Marquina', 'Botticino', 'Crema Marfil',
+    'Travertine', 'Onyx', 'Verde Guatemala', 'Black Galaxy', 'Kashmir White', 'Tan Brown', 'Ziarat',
+    'Sunny Grey', 'Jet Black', 'Booti Seena', 'Taweera', 'Tropical Grey', 'Black Gold',
+]
+KINDS = ['Marble', 'Granite', 'Onyx', 'Limestone', 'Quartzite', 'Sandstone', 'Slate', 'Terrazzo']
+FINISHES = ['Polished', 'Honed', 'Brushed', 'Flamed', 'Leathered', 'Sandblasted']
+ORIGINS = ['Pakistan', 'Italy', 'India', 'China', 'Turkey', 'Greece', 'Spain', 'Brazil', 'Iran']
+THICKNESSES = ['12mm', '16mm', '18mm', '20mm', '25mm', '30mm']
+ROOMS = ['Kitchen', 'Lobby', 'Bathroom', 'Staircase', 'Facade', 'Patio', 'Office', 'Hotel', 'Villa']
+CITIES = ['Lahore', 'Karachi', 'Islamabad', 'Rawalpindi', 'Faisalabad', 'Multan', 'Peshawar', 'Quetta']
+WORDS = (
+    'premium natural stone slab with fine veining and a durable surface suited to floors walls '
+    'countertops and stairs cut to size and finished by hand in our workshop'
+).split()
+
+
+def synthetic_image(upload_to, key, rng):
+    """Content-addressed image name plus the derivative and placeholder fields of a processed image"""
+    name = f"{upload_to}{hashlib.sha256(key.encode()).hexdigest()}.jpg"
+    width, height = rng.choice([(1600, 1200), (1200, 1600), (2048, 1365), (1024, 1024)])
+    renditions = {}
+    for rendition, max_width in RENDITIONS.items():
+        entry = {'width': min(max_width, width), 'height': round(height * min(max_width, width) / width)}
+        for image_format in FORMATS:
+            entry[image_format] = derivative_name(name, rendition, image_format)
+        renditions[rendition] = entry
+    return {
+        'image': name,
+        'image_derivatives': {'source': name, 'renditions': renditions},
+        'image_width': width,
+        'image_height': height,
+        'image_bytes': rng.randint(150_000, 2_500_000),
+        'image_color': '#{:06x}'.format(rng.randrange(0x1000000)),
+        'image_blurhash': 'LEHV6nWB2yk8pyo0adR*.7kCMdnj',
+    }
+
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create a deterministic synthetic catalog (products, gallery, tags, messages) at a chosen scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small', help='Preset row counts')
+        for option in SCALES['small']:
+            parser.add_argument(f"--{option.replace('_', '-')}", type=int, help=f'Override the preset {option}')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; equal seeds give equal data')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk INSERT')
+        parser.add_argument(
+            '--replace', action='store_true',
+            help='Delete earlier synthetic rows first (row by row, so slow at large scales; prefer a fresh database)',
+        )
+
+    def handle(self, *args, **options):
+        counts = {option: options[option] if options[option] is not None else value
+                  for option, value in SCALES[options['scale']].items()}
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        existing = Category.objects.filter(slug__startswith='synthetic-').exists()
+        if existing and not options['replace']:
+            raise CommandError('Synthetic rows already exist; pass --replace to regenerate them')
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            if existing:
+                self.delete_synthetic()
+            created = {}
+            created['products'], created['product images'] = self.create_products(counts)
+            created['gallery images'], created['image tags'] = self.create_gallery(counts)
+            created['contact messages'] = self.create_messages(counts)
+
+            # Bulk inserts bypass the model signals
+            update_search_index(Product)
+            update_search_index(GalleryImage)
+            for model, foreign_key, counter_field, active_field in COUNTERS:
+                recount_field(model, foreign_key, counter_field, active_field)
+            invalidate_api_cache()
+
+        summary = ', '.join(f'{count} {label}' for label, count in created.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Created {summary} in {time.perf_counter() - started:.1f}s (scale {options['scale']}, "
+            f"seed {options['seed']})"
+        ))
+
+    def delete_synthetic(self):
+        self.stdout.write('🗑️  Deleting earlier synthetic rows...')
+        Category.objects.filter(slug__startswith='synthetic-').delete()
+        GalleryCategory.objects.filter(slug__startswith='synthetic-').delete()
+        GalleryTag.objects.filter(slug__startswith='synthetic-').delete()
+        ContactMessage.objects.filter(email__endswith='@synthetic.example').delete()
+
+    def bulk_create(self, model, rows):
+        return model.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def create_products(self, counts):
+        rng = self.rng
+        self.bulk_create(Category, [
+            Category(
+                name=f'Synthetic {KINDS[index % len(KINDS)]} {index + 1}',
+                slug=f'synthetic-category-{index + 1}',
+                description=sentence(rng),
+            )
+            for index in range(counts['categories'])
+        ])
+        categories = list(Category.objects.filter(slug__startswith='synthetic-').order_by('pk'))
+
+        products = []
+        for index in range(counts['products']):
+            category = categories[index % len(categories)]
+            products.append(Product(
+                name=f'{rng.choice(STONES)} {category.name.split()[1]} {index + 1}',
+                slug=f'synthetic-product-{index + 1}',
+                description=sentence(rng, 30),
+                category=category,
+                price=Decimal(rng.randrange(80_000, 2_500_000)) / 100,
+                origin=rng.choice(ORIGINS),
+                finish=rng.choice(FINISHES),
+                thickness=rng.choice(THICKNESSES),
+                is_active=rng.random() < 0.9,
+                is_featured=rng.random() < 0.15,
+                **synthetic_image('products/', f'product-{index}', rng),
+            ))
+        self.bulk_create(Product, products)
+
+        product_pks = Product.objects.filter(slug__startswith='synthetic-').order_by('pk').values_list('pk', flat=True)
+        images = [
+            ProductImage(
+                product_id=pk,
+                alt_text=f'View {order + 1}',
+                is_primary=order == 0,
+                order=order,
+                **synthetic_image('products/gallery/', f'product-{index}-{order}', rng),
+            )
+            for index, pk in enumerate(product_pks)
+            for order in range(counts['images_per_product'])
+        ]
+        self.bulk_create(ProductImage, images)
+        return len(products), len(images)
+
+    def create_gallery(self, counts):
+        rng = self.rng
+        self.bulk_create(GalleryCategory, [
+            GalleryCategory(
+                name=f'Synthetic {ROOMS[index % len(ROOMS)]} {index + 1}',
+                slug=f'synthetic-gallery-{index + 1}',
+                description=sentence(rng),
+                order=index,
+            )
+            for index in range(counts['gallery_categories'])
+        ])
+        categories = list(GalleryCategory.objects.filter(slug__startswith='synthetic-').order_by('order'))
+        self.bulk_create(GalleryTag, [
+            GalleryTag(name=f'Synthetic tag {index + 1}', slug=f'synthetic-tag-{index + 1}')
+            for index in range(counts['tags'])
+        ])
+        tag_pks = list(GalleryTag.objects.filter(slug__startswith='synthetic-').order_by('pk').values_list('pk', flat=True))
+
+        images = []
+        for index in range(counts['gallery_images']):
+            category = categories[index % len(categories)]
+            images.append(GalleryImage(
+                title=f'{rng.choice(STONES)} {rng.choice(ROOMS).lower()} {index + 1}',
+                description=sentence(rng, 20),
+                category=category,
+                project_location=rng.choice(CITIES),
+                completion_date=date(2015, 1, 1) + timedelta(days=rng.randrange(3650)),
+                is_active=rng.random() < 0.95,
+                is_featured=rng.random() < 0.1,
+                order=rng.randrange(100),
+                **synthetic_image('gallery/', f'gallery-{index}', rng),
+            ))
+        self.bulk_create(GalleryImage, images)
+
+        image_pks = GalleryImage.objects.filter(category__in=categories).order_by('pk').values_list('pk', flat=True)
+        tags_per_image = min(counts['tags_per_image'], len(tag_pks))
+        image_tags = [
+            GalleryImageTag(image_id=pk, tag_id=tag_pk)
+            for pk in image_pks
+            for tag_pk in rng.sample(tag_pks, tags_per_image)
+        ]
+        self.bulk_create(GalleryImageTag, image_tags)
+        return len(images), len(image_tags)
+
+    def create_messages(self, counts):
+        rng = self.rng
+        statuses = [value for value, _ in ContactMessage.STATUS_CHOICES]
+        priorities = [value for value, _ in ContactMessage.PRIORITY_CHOICES]
+        messages = [
+            ContactMessage(
+                name=f'Customer {index + 1}',
+                email=f'customer{index + 1}@synthetic.example',
+                phone=f'+92300{rng.randrange(10_000_000):07d}',
+                subject=f'Quote for {rng.choice(STONES)} {rng.choice(ROOMS).lower()}',
+                message=sentence(rng, 40),
+                status=rng.choice(statuses),
+                priority=rng.choice(priorities),
+            )
+            for index in range(counts['contact_messages'])
+        ]
+        self.bulk_create(ContactMessage, messages)
+        return len(messages)
@@ -0,0 +1,211 @@
+"""
+Management command to import products from a CSV or JSON manifest.
+
+Rows are matched to existing products by slug. New rows are bulk-created,
+changed rows bulk-updated and unchanged rows left alone, so the command can
+be re-run safely. Image files are stored under their content-addressed name
+(``products/<sha256><ext>``, see sundar_marbles/storage.py), which makes an
+unchanged image recognizable without downloading anything; changed images
+are uploaded concurrently before the database transaction starts.
+
+Manifest columns (CSV header or JSON keys; JSON may be a list or
+``{"products": [...]}``):
+
+    name, slug, category, price, description, origin, finish, thickness,
+    is_active, is_featured, image
+
+``category`` is a category name, created when missing. ``image`` is a file
+path relative to ``--images-dir`` (default: the manifest's directory).
+
+products/manifests/catalog.json holds the catalog that populate_data and the
+upload_* commands hard-code:
+
+    python manage.py import_catalog products/manifests/catalog.json \
+        --images-dir ../marble-tiles-site/src/assets/products
+"""
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from products.models import Category, Product
+from sundar_marbles.cache import invalidate_api_cache
+from sundar_marbles.counters import recount_field
+from sundar_marbles.search import update_search_index
+from sundar_marbles.uploads import content_named, describe_report, upload_files
+from sundar_marbles.tasks import generate_image_derivatives
+
+# Manifest columns copied onto Product as-is (after type conversion)
+PRODUCT_FIELDS = ['name', 'description', 'price', 'origin', 'finish', 'thickness', 'is_active', 'is_featured']
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+
+class Command(BaseCommand):
+    help = 'Create or update products from a CSV/JSON manifest using bulk writes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help='Path to a .csv or .json manifest')
+        parser.add_argument('--images-dir', help='Directory image paths are relative to')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk INSERT/UPDATE')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent image uploads (storage checks with --dry-run)')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing anything')
+
+    def handle(self, *args, **options):
+        rows = self.read_manifest(options['manifest'])
+        images_dir = options['images_dir'] or os.path.dirname(os.path.abspath(options['manifest']))
+        rows = [self.clean_row(row, number, images_dir) for number, row in enumerate(rows, start=1)]
+        slugs = [row['slug'] for row in rows]
+        if len(set(slugs)) != len(slugs):
+            raise CommandError('Manifest contains duplicate slugs')
+
+        categories = self.resolve_categories(rows, options['dry_run'])
+        existing = Product.objects.in_bulk(slugs, field_name='slug')
+        images = self.plan_images(rows, existing)
+
+        to_create, to_update, changed_fields = [], [], set()
+        for row in rows:
+            values = {field: row[field] for field in PRODUCT_FIELDS if field in row}
+            values['category_id'] = categories[row['category']].pk
+            if row['slug'] in images:
+                values['image'] = images[row['slug']][1]
+
+            product = existing.get(row['slug'])
+            if product is None:
+                to_create.append(Product(slug=row['slug'], **values))
+                continue
+            changed = {
+                field for field, value in values.items()
+                if getattr(product, field) != value
+            }
+            if changed:
+                for field in changed:
+                    setattr(product, field, values[field])
+                to_update.append(product)
+                changed_fields |= changed
+
+        unchanged = len(rows) - len(to_create) - len(to_update)
+        summary = f"📦 {len(to_create)} new, {len(to_update)} changed, {unchanged} unchanged"
+        if options['dry_run']:
+            missing = self.count_missing(images.values(), options['workers'])
+            self.stdout.write(f"{summary}; {missing} of {len(images)} changed images to upload")
+            self.stdout.write(self.style.WARNING('Dry run: nothing written'))
+            return
+        # upload_files() skips images that are already stored
+        self.stdout.write(f"{summary}; {len(images)} changed images")
+
+        report = self.upload_images(images.values(), options['workers'])
+
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            Product.objects.bulk_create(to_create, batch_size=batch_size)
+            if to_update:
+                now = timezone.now()
+                for product in to_update:
+                    # bulk_update() skips auto_now; ETags depend on updated_at
+                    product.updated_at = now
+                Product.objects.bulk_update(
+                    to_update, sorted(changed_fields | {'updated_at'}), batch_size=batch_size
+                )
+
+            # Bulk writes bypass the model signals
+            written = Product.objects.filter(slug__in=[product.slug for product in to_create + to_update])
+            written_pks = list(written.values_list('pk', flat=True))
+            update_search_index(Product, written_pks)
+            recount_field(Product, 'category', 'active_product_count', 'is_active')
+            invalidate_api_cache()
+            image_pks = list(written.filter(slug__in=images).values_list('pk', flat=True))
+
+            def queue_derivatives():
+                for pk in image_pks:
+                    generate_image_derivatives.delay(Product._meta.label, pk)
+            transaction.on_commit(queue_derivatives)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imported {len(rows)} rows: {len(to_create)} created, {len(to_update)} updated, "
+            f"{report['uploaded']} images uploaded, {report['skipped']} images already stored"
+        ))
+
+    def read_manifest(self, path):
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as manifest:
+                if path.lower().endswith('.csv'):
+                    return list(csv.DictReader(manifest))
+                data = json.load(manifest)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read manifest {path}: {e}')
+        return data['products'] if isinstance(data, dict) else data
+
+    def clean_row(self, row, number, images_dir):
+        row = {key: value.strip() if isinstance(value, str) else value for key, value in row.items()}
+        if not row.get('name') or not row.get('category'):
+            raise CommandError(f'Row {number}: name and category are required')
+        row['slug'] = row.get('slug') or slugify(row['name'])
+        try:
+            row['price'] = Decimal(str(row['price'])).quantize(Decimal('0.01'))
+        except (KeyError, InvalidOperation):
+            raise CommandError(f"Row {number}: invalid price {row.get('price')!r}")
+        for field in ('is_active', 'is_featured'):
+            if field in row and not isinstance(row[field], bool):
+                row[field] = str(row[field]).lower() in TRUE_VALUES
+        for field in ('description', 'origin', 'finish', 'thickness'):
+            if row.get(field) is None:
+                row.pop(field, None)
+        if row.get('image'):
+            path = os.path.join(images_dir, row['image'])
+            if not os.path.isfile(path):
+                raise CommandError(f'Row {number}: image not found: {path}')
+            row['image'] = path
+        return row
+
+    def resolve_categories(self, rows, dry_run):
+        """Map manifest category names to Category rows, creating missing ones"""
+        names = {row['category'] for row in rows}
+        categories = {category.name: category for category in Category.objects.filter(name__in=names)}
+        missing = [Category(name=name, slug=slugify(name)) for name in sorted(names - set(categories))]
+        if missing:
+            self.stdout.write(f"🏷️  {len(missing)} new categories: {', '.join(c.name for c in missing)}")
+            if not dry_run:
+                Category.objects.bulk_create(missing)
+                categories.update(
+                    (category.name, category)
+                    for category in Category.objects.filter(name__in=[c.name for c in missing])
+                )
+            else:
+                categories.update((category.name, category) for category in missing)
+        return categories
+
+    def plan_images(self, rows, existing):
+        """``{slug: (local path, stored name)}`` for rows whose image content changed"""
+        with_images = [row for row in rows if row.get('image')]
+        names = content_named([row['image'] for row in with_images], 'products')
+        images = {}
+        for row, (_, name) in zip(with_images, names):
+            product = existing.get(row['slug'])
+            if product is None or product.image.name != name:
+                images[row['slug']] = (row['image'], name)
+        return images
+
+    def upload_images(self, images, workers):
+        def progress(name, outcome):
+            if outcome == 'uploaded':
+                self.stdout.write(f"☁️  {name}")
+
+        report = upload_files(images, workers=workers, progress=progress)
+        if report['failed']:
+            raise CommandError('Image uploads failed: ' + '; '.join(
+                f'{name}: {error}' for name, error in report['failed'].items()
+            ))
+        self.stdout.write(f"📤 {describe_report(report)}")
+        return report
+
+    def count_missing(self, images, workers):
+        """How many of the ``(local path, stored name)`` pairs storage doesn't have yet"""
+        names = [name for _, name in images]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return sum(not stored for stored in pool.map(default_storage.exists, names))
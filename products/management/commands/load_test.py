@@ -0,0 +1,406 @@
+"""
+Management command to replay a weighted mix of frontend traffic against gunicorn.
+
+Starts the app under gunicorn against the local database once per worker
+setup (``--worker-class`` x ``--workers``), sends the same seeded request
+schedule to each at ``--rate`` requests per second and reports throughput,
+latency percentiles and error rate per endpoint. Arrivals are open-loop
+(Poisson): requests go out on schedule whether or not earlier ones have
+answered, and latency counts from the scheduled send time, so a saturated
+server shows up as growing latency instead of a quietly lower request rate.
+
+The server runs with DEBUG off and the response cache on, as in production;
+``--db-latency`` stands in for the round trip to Neon. Fill the database with
+generate_synthetic_catalog first:
+
+    export DATABASE_URL=sqlite:///benchmark.sqlite3
+    python manage.py migrate && python manage.py generate_synthetic_catalog --scale medium
+    python manage.py load_test --rate 40 --db-latency 30 \\
+        --worker-class sync --worker-class gthread --worker-class uvicorn --workers 2 --workers 4
+
+Contact form submissions create real ContactMessage rows (with
+``@synthetic.example`` addresses, removed by ``generate_synthetic_catalog
+--replace``); their notification emails go to the locmem backend.
+"""
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from gallery.models import GalleryCategory, GalleryImage
+from products.models import Category, Product
+
+# Share of traffic per endpoint, roughly what the frontend sends: page loads
+# start with bootstrap, then browse lists and open details
+TRAFFIC_MIX = {
+    'bootstrap': 10,
+    'products': 14,
+    'products by category': 12,
+    'product detail': 16,
+    'products search': 6,
+    'featured products': 4,
+    'gallery images': 12,
+    'gallery images by category': 8,
+    'gallery image detail': 8,
+    'gallery images search': 4,
+    'contact info': 4,
+    'contact form': 2,
+}
+
+SEARCH_TERMS = ['marble', 'granite', 'white', 'black', 'onyx', 'polished', 'kitchen', 'floor', 'lobby']
+
+WORKER_CLASSES = {
+    'sync': ['sundar_marbles.wsgi:application', '--worker-class', 'sync'],
+    'gthread': ['sundar_marbles.wsgi:application', '--worker-class', 'gthread'],
+    'uvicorn': ['sundar_marbles.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+# Enough distinct objects that detail requests hit a realistic mix of cached and uncached keys
+SAMPLE_SIZE = 500
+
+
+class TrafficSampler:
+    """Turn endpoint labels into concrete requests using objects from the database"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.product_slugs = self.sample(Product.objects.filter(is_active=True), 'slug')
+        self.category_ids = self.sample(Category.objects.filter(is_active=True), 'pk')
+        self.image_ids = self.sample(GalleryImage.objects.filter(is_active=True), 'pk')
+        self.gallery_category_ids = self.sample(GalleryCategory.objects.filter(is_active=True), 'pk')
+        self.builders = {
+            'bootstrap': lambda: self.get(reverse('bootstrap')),
+            'products': lambda: self.get(reverse('products:product-list'), page=self.page()),
+            'products by category': lambda: self.get(
+                reverse('products:product-list'), category=self.pick(self.category_ids)
+            ),
+            'product detail': lambda: self.get(
+                reverse('products:product-detail', args=[self.pick(self.product_slugs)])
+            ),
+            'products search': lambda: self.get(
+                reverse('products:product-list'), search=self.rng.choice(SEARCH_TERMS)
+            ),
+            'featured products': lambda: self.get(reverse('products:featured-products')),
+            'gallery images': lambda: self.get(reverse('gallery:image-list'), page=self.page()),
+            'gallery images by category': lambda: self.get(
+                reverse('gallery:image-list'), category=self.pick(self.gallery_category_ids)
+            ),
+            'gallery image detail': lambda: self.get(
+                reverse('gallery:image-detail', args=[self.pick(self.image_ids)])
+            ),
+            'gallery images search': lambda: self.get(
+                reverse('gallery:image-list'), search=self.rng.choice(SEARCH_TERMS)
+            ),
+            'contact info': lambda: self.get(reverse('contact:contact-info')),
+            'contact form': self.contact_form,
+        }
+        missing = [
+            label for label, pool in [
+                ('product detail', self.product_slugs), ('products by category', self.category_ids),
+                ('gallery image detail', self.image_ids), ('gallery images by category', self.gallery_category_ids),
+            ] if not pool
+        ]
+        if missing:
+            raise CommandError(
+                f"No data for {', '.join(missing)}; run generate_synthetic_catalog first "
+                f"or drop them with --mix '<label>=0'"
+            )
+
+    def sample(self, queryset, field):
+        values = list(queryset.order_by('pk').values_list(field, flat=True)[:SAMPLE_SIZE * 10])
+        return random.Random(0).sample(values, min(SAMPLE_SIZE, len(values)))
+
+    def pick(self, pool):
+        # Skewed towards the first objects: a few popular pages, a long tail of others
+        return pool[min(int(self.rng.paretovariate(1.2)) - 1, len(pool) - 1)]
+
+    def page(self):
+        # Most visitors never leave the first page
+        return self.rng.choice([None, None, None, None, 2, 2, 3])
+
+    def get(self, path, **params):
+        query = urlencode({name: value for name, value in params.items() if value is not None})
+        return 'GET', f'{path}?{query}' if query else path, None
+
+    def contact_form(self):
+        number = self.rng.randrange(10**6)
+        body = {
+            'name': f'Load Test {number}',
+            'email': f'load-test-{number}@synthetic.example',
+            'phone': f'+92300{number:07d}',
+            'subject': 'Quotation request',
+            'message': 'Please share prices and availability for 500 sq ft of polished marble.',
+        }
+        return 'POST', reverse('contact:message-create'), json.dumps(body).encode('utf-8')
+
+    def request(self, label):
+        return self.builders[label]()
+
+
+class Command(BaseCommand):
+    help = 'Replay a weighted request mix at a target rate against gunicorn and report latency per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--worker-class', action='append', dest='worker_classes', choices=sorted(WORKER_CLASSES),
+            help='Gunicorn worker class to test (repeatable, default sync)',
+        )
+        parser.add_argument(
+            '--workers', action='append', type=int, dest='worker_counts',
+            help='Gunicorn worker count to test (repeatable, default 2)',
+        )
+        parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker')
+        parser.add_argument('--max-requests', type=int, default=1000, help='Gunicorn --max-requests')
+        parser.add_argument('--timeout', type=int, default=300, help='Gunicorn --timeout')
+        parser.add_argument('--rate', type=float, default=20, help='Target requests per second')
+        parser.add_argument('--duration', type=float, default=60, help='Seconds of measured traffic')
+        parser.add_argument('--warmup', type=float, default=5, help='Seconds of unmeasured traffic first')
+        parser.add_argument(
+            '--mix', action='append', default=[], metavar='LABEL=WEIGHT',
+            help='Change the weight of one endpoint in the mix; 0 removes it (repeatable)',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the request schedule')
+        parser.add_argument(
+            '--concurrency', type=int, default=256,
+            help='Most requests in flight at once before the client itself starts queueing',
+        )
+        parser.add_argument(
+            '--db-latency', type=float, default=0,
+            help='Milliseconds added to every SQL statement, simulating a remote database',
+        )
+        parser.add_argument('--no-cache', action='store_true', help='Turn the API response cache off')
+        parser.add_argument(
+            '--allow-remote-database', action='store_true',
+            help='Run against a database that is not local (never point this at production)',
+        )
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--port', type=int, default=8766)
+
+    def handle(self, *args, **options):
+        self.check_database(options['allow_remote_database'])
+        mix = self.parse_mix(options['mix'])
+        sampler = TrafficSampler(random.Random(options['seed']))
+        warmup = self.build_schedule(sampler, mix, options['rate'], options['warmup'])
+        schedule = self.build_schedule(sampler, mix, options['rate'], options['duration'])
+
+        servers = [
+            (worker_class, workers)
+            for worker_class in options['worker_classes'] or ['sync']
+            for workers in options['worker_counts'] or [2]
+        ]
+        runs = []
+        for worker_class, workers in servers:
+            name = self.server_name(worker_class, workers, options['threads'])
+            self.stdout.write(f'\nStarting gunicorn: {name}...')
+            server = self.start_server(worker_class, workers, options)
+            try:
+                self.wait_until_ready(server, options['port'])
+                self.replay(warmup, options)
+                run = {
+                    'server': {'worker_class': worker_class, 'workers': workers, 'threads': options['threads']},
+                    **self.summarize(self.replay(schedule, options), options['duration']),
+                }
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            self.print_run(name, run, options['rate'])
+            runs.append(run)
+
+        if len(runs) > 1:
+            self.print_comparison(runs, options['threads'])
+        if options['output']:
+            results = {'meta': self.describe_run(options, mix), 'runs': runs}
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Results written to {options['output']}"))
+
+    def check_database(self, allow_remote):
+        host = connection.settings_dict.get('HOST') or ''
+        if connection.vendor == 'sqlite' or host in ('', 'localhost', '127.0.0.1', '::1') or allow_remote:
+            return
+        raise CommandError(
+            f'Refusing to load-test the database at {host}; point DATABASE_URL at a local copy '
+            f'(or pass --allow-remote-database)'
+        )
+
+    def parse_mix(self, overrides):
+        mix = dict(TRAFFIC_MIX)
+        for override in overrides:
+            label, _, weight = override.rpartition('=')
+            if label not in mix:
+                raise CommandError(f"Unknown endpoint '{label}'; choose from: {', '.join(TRAFFIC_MIX)}")
+            try:
+                mix[label] = float(weight)
+            except ValueError:
+                raise CommandError(f'Invalid weight in --mix {override}')
+        mix = {label: weight for label, weight in mix.items() if weight > 0}
+        if not mix:
+            raise CommandError('--mix removed every endpoint')
+        return mix
+
+    def build_schedule(self, sampler, mix, rate, duration):
+        """Return ``(offset seconds, label, method, path, body)`` for Poisson arrivals at ``rate``"""
+        labels, weights = list(mix), list(mix.values())
+        schedule = []
+        offset = sampler.rng.expovariate(rate)
+        while offset < duration:
+            label = sampler.rng.choices(labels, weights)[0]
+            schedule.append((offset, label, *sampler.request(label)))
+            offset += sampler.rng.expovariate(rate)
+        return schedule
+
+    def server_name(self, worker_class, workers, threads):
+        if worker_class == 'gthread':
+            return f'{workers} gthread workers x {threads} threads'
+        return f'{workers} {worker_class} workers'
+
+    def start_server(self, worker_class, workers, options):
+        env = {
+            **os.environ,
+            'DEBUG': 'False',
+            'ASYNC_CATALOG_VIEWS': str(worker_class == 'uvicorn'),
+            # Sizes the database pool under settings_production
+            'GUNICORN_THREADS': str(options['threads'] if worker_class == 'gthread' else 1),
+            'BENCHMARK_DB_LATENCY_MS': str(options['db_latency']),
+            'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+        }
+        if options['no_cache']:
+            env['API_CACHE_TIMEOUT'] = '0'
+        command = [
+            sys.executable, '-m', 'gunicorn', *WORKER_CLASSES[worker_class],
+            '--workers', str(workers),
+            *(['--threads', str(options['threads'])] if worker_class == 'gthread' else []),
+            '--timeout', str(options['timeout']),
+            '--max-requests', str(options['max_requests']),
+            '--max-requests-jitter', str(options['max_requests'] // 10),
+            '--preload',
+            '--bind', f"127.0.0.1:{options['port']}",
+            '--config', 'python:sundar_marbles.gunicorn_benchmark',
+            '--log-level', 'warning',
+        ]
+        return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+
+    def wait_until_ready(self, server, port, timeout=60):
+        url = f"http://127.0.0.1:{port}{reverse('contact:contact-info')}"
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn exited with status {server.returncode}')
+            try:
+                with urlopen(url, timeout=5):
+                    return
+            except (URLError, ConnectionError):
+                time.sleep(0.5)
+        raise CommandError(f'{url} did not answer within {timeout}s')
+
+    def replay(self, schedule, options):
+        """Send every scheduled request on time; return ``(label, latency ms, status)`` per request"""
+        base_url = f"http://127.0.0.1:{options['port']}"
+        samples = []
+        lock = threading.Lock()
+
+        def send(scheduled_at, label, method, path, body):
+            request = Request(base_url + path, data=body, method=method, headers={'Content-Type': 'application/json'})
+            try:
+                with urlopen(request, timeout=options['timeout']) as response:
+                    response.read()
+                    status = response.status
+            except HTTPError as e:
+                status = e.code
+            except (URLError, ConnectionError, TimeoutError):
+                status = None
+            with lock:
+                samples.append((label, (time.perf_counter() - scheduled_at) * 1000, status))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            for offset, label, method, path, body in schedule:
+                delay = started + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(send, started + offset, label, method, path, body)
+        return samples
+
+    def summarize(self, samples, duration):
+        by_label = defaultdict(list)
+        for label, latency, status in samples:
+            by_label[label].append((latency, status))
+        endpoints = {label: self.describe(by_label[label], duration) for label in sorted(by_label)}
+        total = self.describe([(latency, status) for _, latency, status in samples], duration)
+        return {'total': total, 'endpoints': endpoints}
+
+    def describe(self, samples, duration):
+        latencies = [latency for latency, _ in samples]
+        if len(latencies) > 1:
+            percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        else:
+            percentiles = latencies * 99
+        errors = sum(1 for _, status in samples if status is None or status >= 400)
+        return {
+            'requests': len(samples),
+            'throughput': round(len(samples) / duration, 2),
+            'p50_ms': round(percentiles[49], 2),
+            'p95_ms': round(percentiles[94], 2),
+            'p99_ms': round(percentiles[98], 2),
+            'errors': errors,
+            'error_rate': round(errors / len(samples), 4),
+        }
+
+    def print_run(self, name, run, rate):
+        self.stdout.write(
+            f"{'endpoint':<28}{'requests':>9}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+        )
+        for label, result in [*run['endpoints'].items(), ('total', run['total'])]:
+            self.stdout.write(
+                f"{label:<28}{result['requests']:>9}{result['throughput']:>8.1f}{result['p50_ms']:>10.1f}"
+                f"{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['error_rate']:>8.1%}"
+            )
+        if run['total']['p99_ms'] > 1000 or run['total']['errors']:
+            self.stdout.write(self.style.WARNING(f'⚠️  {name} is not keeping up with {rate:g} req/s'))
+
+    def print_comparison(self, runs, threads):
+        self.stdout.write(f"\n{'server':<32}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for run in runs:
+            server, total = run['server'], run['total']
+            name = self.server_name(server['worker_class'], server['workers'], threads)
+            self.stdout.write(
+                f"{name:<32}{total['throughput']:>8.1f}{total['p50_ms']:>10.1f}"
+                f"{total['p95_ms']:>10.1f}{total['p99_ms']:>10.1f}{total['error_rate']:>8.1%}"
+            )
+
+    def describe_run(self, options, mix):
+        try:
+            commit = subprocess.run(
+                ['git', 'describe', '--always', '--dirty'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'rate': options['rate'],
+            'duration': options['duration'],
+            'seed': options['seed'],
+            'db_latency_ms': options['db_latency'],
+            'cached': not options['no_cache'],
+            'max_requests': options['max_requests'],
+            'timeout': options['timeout'],
+            'mix': mix,
+        }
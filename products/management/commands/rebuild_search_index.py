@@ -0,0 +1,18 @@
+"""
+Management command to rebuild the full-text search index after bulk writes
+"""
+from django.core.management.base import BaseCommand
+from gallery.models import GalleryImage
+from products.models import Product
+from sundar_marbles.search import update_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for products and gallery images'
+
+    def handle(self, *args, **options):
+        for model in (Product, GalleryImage):
+            update_search_index(model)
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Indexed {model.objects.count()} {model._meta.verbose_name_plural}"
+            ))
@@ -0,0 +1,25 @@
+"""
+Management command to repair the denormalized category and tag counters
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from sundar_marbles.cache import invalidate_api_cache
+from sundar_marbles.counters import COUNTERS, recount_field
+
+
+class Command(BaseCommand):
+    help = 'Recompute active_product_count, active_image_count and usage_count from the actual rows'
+
+    def handle(self, *args, **options):
+        repaired = 0
+        with transaction.atomic():
+            for model, foreign_key, counter_field, active_field in COUNTERS:
+                parent = model._meta.get_field(foreign_key).related_model
+                drifted = recount_field(model, foreign_key, counter_field, active_field)
+                repaired += drifted
+                style = self.style.WARNING if drifted else self.style.SUCCESS
+                self.stdout.write(style(
+                    f"{'⚠️ ' if drifted else '✅'} {parent._meta.label}.{counter_field}: {drifted} rows repaired"
+                ))
+        if repaired:
+            invalidate_api_cache()
@@ -1,15 +1,22 @@
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-import io
+import os
+import shutil
+import tempfile
 from PIL import Image
 import requests
+from sundar_marbles.uploads import content_named, describe_report, upload_files
 
 
 class Command(BaseCommand):
     help = 'Test production Azure Blob Storage connectivity and fix any issues'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=4, help='Test images to upload concurrently')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent uploads')
+        parser.add_argument('--block-size', type=int, default=1024, help='Upload block size in KiB')
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('🔍 Testing Production Azure Blob Storage...'))
         
@@ -24,20 +31,31 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('❌ Azure configuration not found!'))
             return
         
+        temp_dir = tempfile.mkdtemp()
+        uploaded = []
         try:
-            # Test 1: Create a test image
-            self.stdout.write('\n🧪 Test 1: Creating test image...')
-            img = Image.new('RGB', (200, 200), color='blue')
-            img_io = io.BytesIO()
-            img.save(img_io, format='JPEG', quality=95)
-            img_io.seek(0)
+            # Test 1: Create test images
+            self.stdout.write(f"\n🧪 Test 1: Creating {options['files']} test images...")
+            paths = []
+            for index in range(options['files']):
+                # Noise keeps every image distinct and too large for a single block
+                img = Image.effect_noise((1024, 1024), 64).convert('RGB')
+                path = os.path.join(temp_dir, f'test_production_{index}.jpg')
+                img.save(path, format='JPEG', quality=95)
+                paths.append(path)
             
             # Test 2: Upload to Azure Blob Storage
-            self.stdout.write('📤 Test 2: Uploading to Azure Blob Storage...')
-            test_file = ContentFile(img_io.getvalue(), name='test_production.jpg')
-            file_path = default_storage.save('products/test_production.jpg', test_file)
+            self.stdout.write('📤 Test 2: Uploading to Azure Blob Storage in parallel blocks...')
+            named = content_named(paths, 'products')
+            report = upload_files(
+                named, workers=options['workers'], block_size=options['block_size'] * 1024,
+            )
+            uploaded = [name for _, name in named if name not in report['failed']]
+            if report['failed']:
+                raise RuntimeError('; '.join(f'{name}: {error}' for name, error in report['failed'].items()))
+            file_path = uploaded[0]
             
-            self.stdout.write(self.style.SUCCESS(f'✅ Upload successful: {file_path}'))
+            self.stdout.write(self.style.SUCCESS(f'✅ Upload successful: {describe_report(report)}'))
             
             # Test 3: Generate URL
             self.stdout.write('🔗 Test 3: Generating public URL...')
@@ -58,9 +76,11 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f'✅ File exists: {exists}'))
             
             # Test 6: Clean up
-            self.stdout.write('🧹 Test 6: Cleaning up test file...')
-            default_storage.delete(file_path)
-            self.stdout.write(self.style.SUCCESS('✅ Test file cleaned up'))
+            self.stdout.write('🧹 Test 6: Cleaning up test files...')
+            for name in uploaded:
+                default_storage.delete(name)
+            uploaded = []
+            self.stdout.write(self.style.SUCCESS('✅ Test files cleaned up'))
             
             # Success message
             self.stdout.write(self.style.SUCCESS('\n🎉 ALL TESTS PASSED!'))
@@ -100,3 +120,8 @@ class Command(BaseCommand):
             self.stdout.write('2. Ensure Azure Storage Account has proper permissions')
             self.stdout.write('3. Verify CORS settings in Azure Storage Account')
             self.stdout.write('4. Check if Azure Storage Account allows blob access')
+
+        finally:
+            for name in uploaded:
+                default_storage.delete(name)
+            shutil.rmtree(temp_dir, ignore_errors=True)
@@ -4,16 +4,19 @@ This should be run on the Azure production server
 """
 
 from django.core.management.base import BaseCommand
-from django.core.files.base import ContentFile
 from products.models import Category, Product
 from decimal import Decimal
-import requests
+from sundar_marbles.uploads import content_named, describe_report, upload_files
 import os
 
 
 class Command(BaseCommand):
     help = 'Upload all products with images to production database'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--images-dir', help='Directory with the product images to upload to Azure Blob Storage')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent image uploads')
+
     def handle(self, *args, **options):
         self.stdout.write("🚀 PRODUCTION UPLOAD STARTED")
         self.stdout.write("=" * 50)
@@ -30,7 +33,7 @@ class Command(BaseCommand):
         
         self.stdout.write(f"✅ Categories ready: {marble_category.name}, {granite_category.name}")
 
-        # Product data with direct image URLs (since we can't access local files on Azure)
+        # Product data; image files are read from --images-dir when the command can reach them
         products_data = [
             {
                 'name': 'Black Gold Marble',
@@ -40,8 +43,8 @@ class Command(BaseCommand):
                 'origin': 'Italy',
                 'finish': 'Polished',
                 'thickness': '18mm',
-                # We'll use a placeholder or default image since we can't upload local files directly
-                'image_url': None  # Will be handled manually in admin
+                # Uploaded from --images-dir when given, otherwise added later in admin
+                'image': 'black_gold.jpg'
             },
             {
                 'name': 'Star Black Marble',
@@ -51,7 +54,7 @@ class Command(BaseCommand):
                 'origin': 'India',
                 'finish': 'Polished',
                 'thickness': '18mm',
-                'image_url': None
+                'image': 'star_black.jpg'
             },
             {
                 'name': 'Jet Black Marble',
@@ -61,7 +64,7 @@ class Command(BaseCommand):
                 'origin': 'China',
                 'finish': 'Polished',
                 'thickness': '18mm',
-                'image_url': None
+                'image': 'jet_black.png'
             },
             {
                 'name': 'Sunny White Marble',
@@ -71,7 +74,7 @@ class Command(BaseCommand):
                 'origin': 'Greece',
                 'finish': 'Polished',
                 'thickness': '18mm',
-                'image_url': None
+                'image': 'sunny_white.jpg'
             },
             {
                 'name': 'Sunny Grey Marble',
@@ -81,7 +84,7 @@ class Command(BaseCommand):
                 'origin': 'Turkey',
                 'finish': 'Brushed',
                 'thickness': '20mm',
-                'image_url': None
+                'image': 'sunny_grey.jpg'
             },
             {
                 'name': 'Taweera Granite',
@@ -91,7 +94,7 @@ class Command(BaseCommand):
                 'origin': 'Pakistan',
                 'finish': 'Flamed',
                 'thickness': '25mm',
-                'image_url': None
+                'image': 'taweera.png'
             },
             {
                 'name': 'Booti Seena Granite',
@@ -101,7 +104,7 @@ class Command(BaseCommand):
                 'origin': 'Pakistan',
                 'finish': 'Honed',
                 'thickness': '20mm',
-                'image_url': None
+                'image': 'booti_seena.png'
             },
             {
                 'name': 'Tropical Grey Granite',
@@ -111,10 +114,12 @@ class Command(BaseCommand):
                 'origin': 'Brazil',
                 'finish': 'Honed',
                 'thickness': '20mm',
-                'image_url': None
+                'image': 'tropical_grey.png'
             }
         ]
 
+        images = self.upload_images(products_data, options) if options['images_dir'] else {}
+
         uploaded_count = 0
         
         for product_info in products_data:
@@ -124,7 +129,7 @@ class Command(BaseCommand):
                 continue
             
             try:
-                # Create the product without image first
+                # Create the product (with its uploaded image, if any)
                 product = Product.objects.create(
                     name=product_info['name'],
                     description=product_info['description'],
@@ -134,8 +139,9 @@ class Command(BaseCommand):
                     finish=product_info['finish'],
                     thickness=product_info['thickness'],
                     is_active=True,
-                    is_featured=True
-                    # Note: Image will be uploaded manually through admin panel
+                    is_featured=True,
+                    # Without --images-dir, images are uploaded manually through admin panel
+                    image=images.get(product_info['image'], '')
                 )
                 
                 uploaded_count += 1
@@ -157,3 +163,20 @@ class Command(BaseCommand):
         self.stdout.write(f"   2. Edit each product to upload images")
         self.stdout.write(f"   3. Images will automatically upload to Azure Blob Storage")
         self.stdout.write("=" * 60)
+
+    def upload_images(self, products_data, options):
+        """Upload every product image concurrently; returns ``{filename: stored name}``"""
+        paths = []
+        for product_info in products_data:
+            path = os.path.join(options['images_dir'], product_info['image'])
+            if os.path.exists(path):
+                paths.append(path)
+            else:
+                self.stdout.write(f"❌ Image file not found: {path}")
+
+        named = content_named(paths, 'products', workers=options['workers'])
+        report = upload_files(named, workers=options['workers'])
+        self.stdout.write(f"📤 {describe_report(report)}")
+        for name, error in report['failed'].items():
+            self.stdout.write(f"❌ Error uploading {name}: {error}")
+        return {os.path.basename(path): name for path, name in named if name not in report['failed']}
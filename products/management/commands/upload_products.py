@@ -1,14 +1,20 @@
 import os
-import requests
 from django.core.management.base import BaseCommand
-from django.core.files.base import ContentFile
 from products.models import Category, Product
 from decimal import Decimal
+from sundar_marbles.uploads import content_named, describe_report, upload_files
 
 
 class Command(BaseCommand):
     help = 'Upload product images from frontend assets to database with Azure Blob Storage'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assets-dir', default=r'f:\development\sundar_marbles\marble-tiles-site\src\assets\products',
+            help='Directory holding the frontend product images',
+        )
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent image uploads')
+
     def handle(self, *args, **options):
         # Create categories first
         marble_category, created = Category.objects.get_or_create(
@@ -99,10 +105,9 @@ class Command(BaseCommand):
         }
 
         # Base path to frontend assets
-        frontend_assets_path = r'f:\development\sundar_marbles\marble-tiles-site\src\assets\products'
-        
-        uploaded_count = 0
-        
+        frontend_assets_path = options['assets_dir']
+
+        pending = {}
         for filename, product_info in products_data.items():
             # Check if product already exists
             if Product.objects.filter(name=product_info['name']).exists():
@@ -115,15 +120,24 @@ class Command(BaseCommand):
             if not os.path.exists(image_path):
                 self.stdout.write(f"❌ Image file not found: {image_path}")
                 continue
+            pending[image_path] = product_info
+
+        # Push all images to Azure Blob Storage at once, before creating any product
+        images = dict(content_named(pending, 'products', workers=options['workers']))
+        report = upload_files(images.items(), workers=options['workers'])
+        self.stdout.write(f"📤 {describe_report(report)}")
+
+        uploaded_count = 0
+
+        for image_path, product_info in pending.items():
+            filename = os.path.basename(image_path)
+            if images[image_path] in report['failed']:
+                self.stdout.write(
+                    f"❌ Error uploading image for '{product_info['name']}': {report['failed'][images[image_path]]}"
+                )
+                continue
             
             try:
-                # Read the image file
-                with open(image_path, 'rb') as img_file:
-                    image_content = img_file.read()
-                
-                # Create Django file object
-                django_file = ContentFile(image_content, name=filename)
-                
                 # Create the product
                 product = Product.objects.create(
                     name=product_info['name'],
@@ -135,7 +149,7 @@ class Command(BaseCommand):
                     thickness=product_info['thickness'],
                     is_active=True,
                     is_featured=True,  # Make all uploaded products featured
-                    image=django_file  # This will automatically upload to Azure Blob Storage
+                    image=images[image_path]  # Already uploaded to Azure Blob Storage above
                 )
                 
                 uploaded_count += 1
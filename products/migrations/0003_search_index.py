@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:56
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# GIN index on PostgreSQL, FTS5 shadow table on SQLite. The SQL is spelled out
+# here so later changes to sundar_marbles/search.py can't alter this migration.
+CREATE_INDEX = {
+    'postgresql': [
+        '''UPDATE "products_product" SET "search_vector" =
+            setweight(to_tsvector('english', coalesce("name", '')), 'A')
+            || setweight(to_tsvector('english', coalesce("description", '')), 'B')''',
+        '''CREATE INDEX IF NOT EXISTS "products_product_search_gin"
+            ON "products_product" USING gin ("search_vector")''',
+    ],
+    'sqlite': [
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS "products_product_fts"
+            USING fts5(name, description, tokenize='porter unicode61')''',
+        '''INSERT INTO "products_product_fts" (rowid, name, description)
+            SELECT "id", coalesce("name", ''), coalesce("description", '')
+            FROM "products_product"''',
+    ],
+}
+DROP_INDEX = {
+    'postgresql': ['DROP INDEX IF EXISTS "products_product_search_gin"'],
+    'sqlite': ['DROP TABLE IF EXISTS "products_product_fts"'],
+}
+
+
+def execute(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(execute(CREATE_INDEX), execute(DROP_INDEX)),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_counts(apps, schema_editor):
+    Category = apps.get_model('products', 'Category')
+    Product = apps.get_model('products', 'Product')
+    active_products = Product.objects.filter(category=OuterRef('pk'), is_active=True).order_by()
+    counts = active_products.values('category').annotate(rows=Count('pk')).values('rows')
+    Category.objects.update(active_product_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='active_product_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Maintained by signals; repair with manage.py recount'),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
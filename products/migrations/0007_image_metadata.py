@@ -0,0 +1,63 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_media_blob_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_blurhash',
+            field=models.CharField(blank=True, editable=False, help_text='BlurHash placeholder', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_bytes',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, help_text='Size of the original file', null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, help_text='Dominant colour, #rrggbb', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Pixels, after EXIF rotation', null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Pixels, after EXIF rotation', null=True),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_blurhash',
+            field=models.CharField(blank=True, editable=False, help_text='BlurHash placeholder', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_bytes',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, help_text='Size of the original file', null=True),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, help_text='Dominant colour, #rrggbb', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Pixels, after EXIF rotation', null=True),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Pixels, after EXIF rotation', null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediablob',
+            name='name',
+            field=models.CharField(help_text='Storage name of the blob', max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='mediablob',
+            name='sha256',
+            field=models.CharField(db_index=True, max_length=64),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.utils.text import slugify
@@ -9,6 +10,7 @@ class Category(models.Model):
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
+    active_product_count = models.PositiveIntegerField(default=0, editable=False, help_text="Maintained by signals; repair with manage.py recount")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -33,6 +35,12 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products')
     image = models.ImageField(upload_to='products/', help_text="Product image")
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized renditions of image")
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Pixels, after EXIF rotation")
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Pixels, after EXIF rotation")
+    image_bytes = models.PositiveBigIntegerField(null=True, blank=True, editable=False, help_text="Size of the original file")
+    image_color = models.CharField(max_length=7, blank=True, editable=False, help_text="Dominant colour, #rrggbb")
+    image_blurhash = models.CharField(max_length=64, blank=True, editable=False, help_text="BlurHash placeholder")
     price = models.DecimalField(
         max_digits=10, 
         decimal_places=2, 
@@ -57,10 +65,32 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search (see sundar_marbles/search.py); only populated on PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_weights = {'name': 'A', 'description': 'B'}
+
     class Meta:
         verbose_name = "Product"
         verbose_name_plural = "Products"
         ordering = ['-created_at']
+        # Public queries always filter is_active=True and sort newest first
+        indexes = [
+            models.Index(
+                fields=['-created_at', 'id'],
+                condition=models.Q(is_active=True),
+                name='product_active_recent_idx',
+            ),
+            models.Index(
+                fields=['category', '-created_at'],
+                condition=models.Q(is_active=True),
+                name='product_active_cat_idx',
+            ),
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(is_active=True, is_featured=True),
+                name='product_featured_idx',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -75,11 +105,20 @@ class ProductImage(models.Model):
     """Additional images for products"""
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='additional_images')
     image = models.ImageField(upload_to='products/gallery/')
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized renditions of image")
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Pixels, after EXIF rotation")
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Pixels, after EXIF rotation")
+    image_bytes = models.PositiveBigIntegerField(null=True, blank=True, editable=False, help_text="Size of the original file")
+    image_color = models.CharField(max_length=7, blank=True, editable=False, help_text="Dominant colour, #rrggbb")
+    image_blurhash = models.CharField(max_length=64, blank=True, editable=False, help_text="BlurHash placeholder")
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Rendered inside the product's response; see sundar_marbles.conditional.touch_parents
+    etag_parent = 'product'
+
     class Meta:
         verbose_name = "Product Image"
         verbose_name_plural = "Product Images"
@@ -87,3 +126,19 @@ class ProductImage(models.Model):
 
     def __str__(self):
         return f"{self.product.name} - Image {self.id}"
+
+
+class MediaBlob(models.Model):
+    """Index of media stored by sundar_marbles.storage.ContentAddressedStorage"""
+    # The same bytes may be stored under several upload_to directories
+    sha256 = models.CharField(max_length=64, db_index=True)
+    name = models.CharField(max_length=255, unique=True, help_text="Storage name of the blob")
+    size = models.PositiveBigIntegerField(help_text="Size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Media Blob"
+        verbose_name_plural = "Media Blobs"
+
+    def __str__(self):
+        return self.name
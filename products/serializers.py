@@ -1,34 +1,54 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
+from sundar_marbles.derivatives import image_srcset
+from sundar_marbles.fieldsets import SparseFieldsetSerializerMixin
+from sundar_marbles.timing import TimedSerializerMixin
 from .models import Category, Product, ProductImage
 
 
-class CategorySerializer(serializers.ModelSerializer):
-    product_count = serializers.SerializerMethodField()
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    product_count = serializers.IntegerField(source='active_product_count', read_only=True)
 
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'description', 'is_active', 'product_count']
 
-    def get_product_count(self, obj):
-        return obj.products.filter(is_active=True).count()
 
+class ProductImageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    image_srcset = serializers.SerializerMethodField()
 
-class ProductImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'order']
+        fields = [
+            'id', 'image', 'image_srcset', 'image_width', 'image_height', 'image_bytes',
+            'image_color', 'image_blurhash', 'alt_text', 'is_primary', 'order'
+        ]
+
+    def get_image_srcset(self, obj):
+        return image_srcset(obj.image_derivatives, obj.image.storage, self.context.get('request'))
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     additional_images = ProductImageSerializer(many=True, read_only=True)
     image_url = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+
+    field_sources = {
+        'image_url': ['image'],
+        'image_srcset': ['image', 'image_derivatives'],
+        'additional_images': [
+            Prefetch('additional_images', queryset=ProductImage.objects.order_by('order', 'created_at')),
+        ],
+    }
+    expandable_fields = {'category': CategorySerializer}
 
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'slug', 'description', 'category', 'category_name',
-            'image', 'image_url', 'additional_images', 'price', 'origin', 'finish', 'thickness',
+            'image', 'image_url', 'image_srcset', 'image_width', 'image_height', 'image_bytes',
+            'image_color', 'image_blurhash', 'additional_images', 'price', 'origin', 'finish', 'thickness',
             'is_active', 'is_featured', 'created_at'
         ]
     
@@ -40,8 +60,11 @@ class ProductSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_image_srcset(self, obj):
+        return image_srcset(obj.image_derivatives, obj.image.storage, self.context.get('request'))
+
 
-class ProductCreateSerializer(serializers.ModelSerializer):
+class ProductCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = [
@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from sundar_marbles.cache import invalidate_api_cache
+from sundar_marbles.counters import maintain_counter
+from sundar_marbles.derivatives import derivatives_outdated
+from sundar_marbles.search import remove_from_search_index, update_search_index
+from sundar_marbles.tasks import generate_image_derivatives
+from .models import Category, Product, ProductImage
+
+maintain_counter(Product, 'category', 'active_product_count', active_field='is_active')
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductImage)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Admin edits must show up on the public API immediately"""
+    invalidate_api_cache()
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def touch_product(sender, instance, **kwargs):
+    """ProductImage has no updated_at; bump the product so its ETag changes"""
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ProductImage)
+def queue_image_derivatives(sender, instance, raw=False, **kwargs):
+    if not raw and derivatives_outdated(instance):
+        transaction.on_commit(
+            lambda: generate_image_derivatives.delay(instance._meta.label, instance.pk)
+        )
+
+
+@receiver(post_save, sender=Product)
+def index_for_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_search_index(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_for_search(sender, instance, **kwargs):
+    remove_from_search_index(sender, instance.pk)
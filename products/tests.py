@@ -1,3 +1,906 @@
-from django.test import TestCase
+import csv
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.pagination import PageNumberPagination
+
+from contact.models import ContactMessage
+from gallery.models import GalleryImageTag
+from sundar_marbles.cache import get_api_cache
+from sundar_marbles.storage import ContentAddressedStorage
+from .models import Category, MediaBlob, Product, ProductImage
+from .serializers import CategorySerializer
+
+
+def create_product(category, name, **kwargs):
+    defaults = {
+        'image': 'products/test.jpg',
+        'price': Decimal('1000.00'),
+    }
+    defaults.update(kwargs)
+    return Product.objects.create(name=name, category=category, **defaults)
+
+
+class CategoryCountQueryTests(TestCase):
+    """Category endpoints must not issue one COUNT query per category"""
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    def create_categories(self, count):
+        start = Category.objects.count()
+        for index in range(start, start + count):
+            category = Category.objects.create(name=f'Category {index}')
+            create_product(category, f'Product {index} A')
+            create_product(category, f'Product {index} B')
+            create_product(category, f'Product {index} C', is_active=False)
+
+    def test_categories_with_count_uses_fixed_queries(self):
+        url = reverse('products:categories-with-count')
+        for total in (3, 12):
+            self.create_categories(total - Category.objects.count())
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()), total)
+            self.assertTrue(all(item['product_count'] == 2 for item in response.json()))
+
+    def test_category_list_uses_fixed_queries(self):
+        url = reverse('products:category-list')
+        for total in (3, 12):
+            self.create_categories(total - Category.objects.count())
+            # One COUNT for pagination plus one annotated SELECT
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['count'], total)
+            self.assertTrue(all(item['product_count'] == 2 for item in response.json()['results']))
+
+    def test_inactive_categories_are_excluded(self):
+        self.create_categories(1)
+        Category.objects.create(name='Hidden', is_active=False)
+        response = self.client.get(reverse('products:categories-with-count'))
+        self.assertEqual([item['name'] for item in response.json()], ['Category 0'])
+
+
+class ProductQueryTests(TestCase):
+    """Product endpoints must cost a fixed number of queries per page"""
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Marble')
+        for index in range(200):
+            product = create_product(cls.category, f'Product {index}', is_featured=True)
+            ProductImage.objects.create(product=product, image=f'products/gallery/{index}-b.jpg', order=2)
+            ProductImage.objects.create(product=product, image=f'products/gallery/{index}-a.jpg', order=1)
+
+    def test_list_endpoints_use_three_queries_for_any_page_size(self):
+        for name in ('products:product-list', 'products:featured-products'):
+            for page_size in (8, 50, 200):
+                with self.subTest(endpoint=name, page_size=page_size):
+                    get_api_cache().clear()
+                    with mock.patch.object(PageNumberPagination, 'page_size', page_size):
+                        # COUNT, products joined to category, additional images
+                        with self.assertNumQueries(3):
+                            response = self.client.get(reverse(name))
+                    self.assertEqual(response.status_code, 200)
+                    results = response.json()['results']
+                    self.assertEqual(len(results), page_size)
+                    self.assertEqual(results[0]['category_name'], 'Marble')
+                    self.assertEqual([image['order'] for image in results[0]['additional_images']], [1, 2])
+
+    def test_search_vector_is_not_loaded(self):
+        for url in (reverse('products:product-list'), reverse('products:product-detail', args=['product-0'])):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertFalse(any('search_vector' in query['sql'] for query in queries))
+
+    def test_sparse_fieldset_trims_payload_and_queries(self):
+        url = reverse('products:product-list') + '?fields=id,name,slug,image_url,price'
+        # COUNT and one narrow SELECT: no category join, no additional images
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('description', queries[1]['sql'])
+        self.assertNotIn('products_category', queries[1]['sql'])
+        card = response.json()['results'][0]
+        self.assertEqual(list(card), ['id', 'name', 'slug', 'image_url', 'price'])
+        self.assertTrue(card['image_url'].endswith('/media/products/test.jpg'))
+
+        response = self.client.get(reverse('products:product-detail', args=['product-0']) + '?fields=id,category_name')
+        self.assertEqual(response.json(), {'id': Product.objects.get(slug='product-0').id, 'category_name': 'Marble'})
+
+    def test_expand_nests_related_objects(self):
+        url = reverse('products:product-list') + '?fields=id,category,additional_images&expand=category'
+        # COUNT, products joined to category, additional images
+        with self.assertNumQueries(3):
+            results = self.client.get(url).json()['results']
+        self.assertEqual(results[0]['category'], CategorySerializer(Category.objects.get(pk=self.category.pk)).data)
+        self.assertEqual([image['order'] for image in results[0]['additional_images']], [1, 2])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('products:product-list') + '?fields=id,cost&expand=price')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'fields', 'expand'})
+
+    def test_detail_uses_three_queries(self):
+        # ETag aggregate, product joined to category, additional images
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('products:product-detail', args=['product-0']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['additional_images']), 2)
+
+
+class ResponseCacheTests(TestCase):
+    """Public GET responses are cached until a catalog model changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Granite')
+        cls.product = create_product(cls.category, 'Jet Black')
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    def test_repeated_request_is_served_without_queries(self):
+        url = reverse('products:product-list')
+        first = self.client.get(url, {'category': self.category.id, 'ordering': 'name'})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'ordering': 'name', 'category': self.category.id})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+    def test_query_params_are_part_of_the_key(self):
+        url = reverse('products:product-list')
+        self.client.get(url)
+        response = self.client.get(url, {'search': 'nothing-matches'})
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_saving_a_model_invalidates(self):
+        url = reverse('products:product-detail', args=[self.product.slug])
+        self.client.get(url)
+        self.product.price = Decimal('4321.00')
+        self.product.save()
+        self.assertEqual(self.client.get(url).json()['price'], '4321.00')
+
+        ProductImage.objects.create(product=self.product, image='products/gallery/extra.jpg')
+        self.assertEqual(len(self.client.get(url).json()['additional_images']), 1)
+
+    def test_deleting_a_category_invalidates(self):
+        url = reverse('products:categories-with-count')
+        self.assertEqual(len(self.client.get(url).json()), 1)
+        self.category.delete()
+        self.assertEqual(self.client.get(url).json(), [])
+
+    def test_errors_are_not_cached(self):
+        url = reverse('products:product-detail', args=['missing'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        create_product(self.category, 'Missing')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class ConditionalGetTests(TestCase):
+    """List and detail views answer revalidation with 304 and no serialization"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Onyx')
+        cls.product = create_product(cls.category, 'Honey Onyx')
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    def test_list_returns_validators_and_304(self):
+        url = reverse('products:product-list')
+        response = self.client.get(url)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+
+        get_api_cache().clear()
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+
+        not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_cached_response_answers_304_without_queries(self):
+        url = reverse('products:product-detail', args=[self.product.slug])
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_with_catalog(self):
+        url = reverse('products:product-detail', args=[self.product.slug])
+        etag = self.client.get(url)['ETag']
+
+        ProductImage.objects.create(product=self.product, image='products/gallery/new.jpg')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        list_url = reverse('products:product-list')
+        etag = self.client.get(list_url)['ETag']
+        create_product(self.category, 'White Onyx', is_active=False)
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.product.delete()
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_detail_is_still_404(self):
+        url = reverse('products:product-detail', args=['missing'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
+
+
+def make_upload(name, size=(1000, 500), image_format='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, (120, 90, 60)).save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ImageDerivativeTests(TestCase):
+    """Saving an image renders WebP and JPEG renditions next to the original"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        get_api_cache().clear()
+        self.category = Category.objects.create(name='Marble')
+
+    def test_renditions_are_stored_and_exposed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product(self.category, 'Sunny White', image=make_upload('sunny_white.jpg'))
+        product.refresh_from_db()
+        renditions = product.image_derivatives['renditions']
+        self.assertEqual(product.image_derivatives['source'], product.image.name)
+        self.assertEqual(
+            {name: entry['width'] for name, entry in renditions.items()},
+            {'thumbnail': 320, 'medium': 768, 'large': 1000},
+        )
+        self.assertEqual(renditions['thumbnail']['height'], 160)
+        self.assertRegex(product.image.name, r'^products/[0-9a-f]{64}\.jpg$')
+        self.assertRegex(renditions['medium']['webp'], r'^products/[0-9a-f]{64}\.webp$')
+        for entry in renditions.values():
+            for image_format in ('webp', 'jpeg'):
+                self.assertTrue(default_storage.exists(entry[image_format]))
+        with default_storage.open(renditions['thumbnail']['webp']) as stored:
+            self.assertEqual(Image.open(stored).format, 'WEBP')
+
+        data = self.client.get(reverse('products:product-detail', args=[product.slug])).json()
+        self.assertEqual(
+            data['image_srcset']['webp'],
+            ', '.join(
+                f"http://testserver/media/{renditions[name]['webp']} {width}w"
+                for name, width in [('thumbnail', 320), ('medium', 768), ('large', 1000)]
+            ),
+        )
+
+    def test_rendering_after_the_response_moves_the_etag(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            product = create_product(self.category, 'Ziarat', image=make_upload('ziarat.jpg'))
+        url = reverse('products:product-detail', args=[product.slug])
+        before = self.client.get(url)
+        self.assertEqual(before.json()['image_srcset'], {})
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=before['ETag']).status_code, 200)
+
+        # ProductImage has no updated_at; rendering it moves the product's ETag
+        with self.captureOnCommitCallbacks() as callbacks:
+            ProductImage.objects.create(product=product, image=make_upload('ziarat_side.jpg'))
+        before = self.client.get(url)
+        for callback in callbacks:
+            callback()
+        after = self.client.get(url, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.json()['additional_images'][0]['image_width'], 1000)
+
+    def test_small_images_are_not_upscaled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(
+                product=create_product(self.category, 'Tiny'),
+                image=make_upload('tiny.png', size=(200, 100), image_format='PNG'),
+            )
+        image.refresh_from_db()
+        renditions = image.image_derivatives['renditions']
+        self.assertEqual({entry['width'] for entry in renditions.values()}, {200})
+        self.assertEqual(renditions['large']['jpeg'], renditions['thumbnail']['jpeg'])
+
+    def test_unchanged_image_is_not_regenerated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product(self.category, 'Jet Black', image=make_upload('jet_black.jpg'))
+        product.refresh_from_db()
+        with mock.patch('sundar_marbles.tasks.generate_image_derivatives.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                product.price = Decimal('10.00')
+                product.save()
+        delay.assert_not_called()
+
+    def test_unreadable_image_is_skipped(self):
+        with self.assertLogs('sundar_marbles.tasks', 'WARNING'):
+            with self.captureOnCommitCallbacks(execute=True):
+                product = create_product(
+                    self.category, 'Broken', image=SimpleUploadedFile('broken.jpg', b'not an image'),
+                )
+        product.refresh_from_db()
+        self.assertEqual(product.image_derivatives, {})
+
+    def test_missing_file_leaves_no_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product(self.category, 'Ghost')
+        product.refresh_from_db()
+        self.assertEqual(product.image_derivatives, {})
+        data = self.client.get(reverse('products:product-detail', args=[product.slug])).json()
+        self.assertEqual(data['image_srcset'], {})
+
+    def test_layout_and_placeholder_metadata(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product(self.category, 'Sunny Grey', image=make_upload('sunny_grey.jpg'))
+        product.refresh_from_db()
+        self.assertEqual((product.image_width, product.image_height), (1000, 500))
+        self.assertEqual(product.image_bytes, default_storage.size(product.image.name))
+        self.assertRegex(product.image_color, r'^#[0-9a-f]{6}$')
+        red, green, blue = (int(product.image_color[index:index + 2], 16) for index in (1, 3, 5))
+        for channel, expected in zip((red, green, blue), (120, 90, 60)):
+            self.assertAlmostEqual(channel, expected, delta=4)
+        # 4x3 components: size flag 'L', 28 characters
+        self.assertEqual((product.image_blurhash[0], len(product.image_blurhash)), ('L', 28))
+
+        data = self.client.get(reverse('products:product-detail', args=[product.slug])).json()
+        self.assertEqual(
+            {field: data[field] for field in ('image_width', 'image_height', 'image_color', 'image_blurhash')},
+            {
+                'image_width': 1000, 'image_height': 500,
+                'image_color': product.image_color, 'image_blurhash': product.image_blurhash,
+            },
+        )
+
+    def test_backfill_fills_rows_without_metadata(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product(self.category, 'Booti Seena', image=make_upload('booti.jpg', size=(300, 200)))
+            create_product(self.category, 'No File')
+            ProductImage.objects.create(product=product, image=make_upload('booti_side.jpg'))
+        product.refresh_from_db()
+        expected = (product.image_width, product.image_color, product.image_blurhash)
+        cleared = {'image_width': None, 'image_height': None, 'image_bytes': None, 'image_color': '', 'image_blurhash': ''}
+        Product.objects.update(**cleared)
+        ProductImage.objects.update(**cleared)
+        url = reverse('products:product-detail', args=[product.slug])
+        etag = self.client.get(url)['ETag']
+
+        out = StringIO()
+        call_command('backfill_image_metadata', '--workers', '2', stdout=out)
+        product.refresh_from_db()
+        self.assertEqual((product.image_width, product.image_color, product.image_blurhash), expected)
+        self.assertIn('Products: filled 1, failed 1', out.getvalue())
+        self.assertIn('Product Images: filled 1, failed 0', out.getvalue())
+        # Cached responses with the old nulls must not be revalidated
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(url)['ETag']
+        ProductImage.objects.update(**cleared)
+        call_command('backfill_image_metadata', stdout=StringIO())
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class KeysetPaginationTests(TestCase):
+    """?pagination=keyset walks the list without OFFSET or COUNT"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Granite')
+        for index in range(20):
+            create_product(category, f'Slab {index:02d}')
+        # Identical timestamps force the id tie-breaker
+        Product.objects.filter(name__in=['Slab 03', 'Slab 04', 'Slab 05']).update(
+            created_at=Product.objects.get(name='Slab 04').created_at
+        )
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    def test_pages_cover_every_row_once_in_order(self):
+        url = reverse('products:product-list')
+        expected = [
+            product.id for product in Product.objects.order_by('-created_at', 'id')
+        ]
+        seen = []
+        response = self.client.get(url, {'pagination': 'keyset'})
+        while True:
+            data = response.json()
+            self.assertNotIn('count', data)
+            seen.extend(item['id'] for item in data['results'])
+            if data['next'] is None:
+                break
+            # Page rows, then prefetched additional images; no COUNT
+            with self.assertNumQueries(2):
+                response = self.client.get(data['next'])
+        self.assertEqual(seen, expected)
+
+    def test_page_number_contract_is_unchanged(self):
+        data = self.client.get(reverse('products:product-list'), {'page': 2}).json()
+        self.assertEqual(data['count'], 20)
+        self.assertEqual(len(data['results']), 8)
+        self.assertIn('previous', data)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse('products:product-list'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_keyset_rejects_other_orderings(self):
+        url = reverse('products:product-list')
+        for params in ({'ordering': 'price'}, {'search': 'slab'}, {'ordering': 'price', 'search': 'slab'}):
+            with self.subTest(params=params):
+                response = self.client.get(url, {'pagination': 'keyset', **params})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(len(response.json()['pagination']), len(params))
+        # The page-number contract still takes both
+        self.assertEqual(self.client.get(url, {'ordering': 'price', 'search': 'slab'}).status_code, 200)
+
+
+class FullTextSearchTests(TestCase):
+    """?search= is ranked full-text search (FTS5 on SQLite)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Marble')
+        cls.in_description = create_product(category, 'Ziarat White', description='Pairs well with black granite borders')
+        cls.in_name = create_product(category, 'Black Galaxy', description='Speckled stone')
+        cls.unrelated = create_product(category, 'Sunny Grey', description='Polished finish')
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    def search(self, term, **params):
+        response = self.client.get(reverse('products:product-list'), {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()['results']]
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual(self.search('black'), ['Black Galaxy', 'Ziarat White'])
+
+    def test_explicit_ordering_overrides_rank(self):
+        self.assertEqual(self.search('black', ordering='-name'), ['Ziarat White', 'Black Galaxy'])
+
+    def test_words_are_stemmed_and_combined(self):
+        self.assertEqual(self.search('polishing'), ['Sunny Grey'])
+        self.assertEqual(self.search('black speckled'), ['Black Galaxy'])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.unrelated.name = 'Sunny Black'
+        self.unrelated.save()
+        self.assertIn('Sunny Black', self.search('black'))
+        self.in_name.delete()
+        self.assertNotIn('Black Galaxy', self.search('black'))
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('black" OR "grey'), [])
+        self.assertEqual(self.search('***'), [])
+
+
+class CatalogIndexTests(TestCase):
+    """Public product queries should be served by the partial indexes"""
+
+    def setUp(self):
+        get_api_cache().clear()
+        category = Category.objects.create(name='Marble')
+        for index in range(3):
+            create_product(category, f'Product {index}', is_featured=index == 0)
+
+    def test_explain_endpoints_reports_index_usage(self):
+        out = StringIO()
+        call_command('explain_endpoints', '--plans', stdout=out)
+        output = out.getvalue()
+        self.assertIn('products: GET /api/products/ -> 200', output)
+        self.assertIn('product_active_recent_idx', output)
+        self.assertIn('product_featured_idx', output)
+
+    def test_pages_are_read_in_index_order(self):
+        if connection.vendor == 'postgresql':
+            # On a few rows PostgreSQL rightly prefers scanning and sorting;
+            # price that out so the plan shows whether an index fits the order
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+        out = StringIO()
+        call_command('explain_endpoints', stdout=out)
+        # One block per endpoint: its header line and the indented findings under it
+        blocks = out.getvalue().split('\n\n')[1:]
+        endpoints = ('products:', 'products keyset:', 'featured products:')
+        checked = [block for block in blocks if block.startswith(endpoints)]
+        self.assertEqual(len(checked), 3)
+        for block in checked:
+            self.assertNotIn('sorts instead of reading an index', block)
+
+
+class CategoryCounterTests(TestCase):
+    """Category.active_product_count follows product writes without recounting"""
+
+    def setUp(self):
+        self.marble = Category.objects.create(name='Marble')
+        self.granite = Category.objects.create(name='Granite')
+
+    def assertCounts(self, marble, granite):
+        self.marble.refresh_from_db()
+        self.granite.refresh_from_db()
+        self.assertEqual((self.marble.active_product_count, self.granite.active_product_count), (marble, granite))
+
+    def test_create_deactivate_move_and_delete(self):
+        product = create_product(self.marble, 'Carrara')
+        create_product(self.marble, 'Hidden', is_active=False)
+        self.assertCounts(1, 0)
+
+        product.is_active = False
+        product.save()
+        self.assertCounts(0, 0)
+
+        product.is_active = True
+        product.category = self.granite
+        product.save()
+        self.assertCounts(0, 1)
+
+        product.price = Decimal('5.00')
+        product.save(update_fields=['price'])
+        self.assertCounts(0, 1)
+
+        product.delete()
+        self.assertCounts(0, 0)
+
+    def test_recount_repairs_drift(self):
+        create_product(self.marble, 'Carrara')
+        Category.objects.filter(pk=self.marble.pk).update(active_product_count=7)
+        Product.objects.update(category=self.granite)
+
+        out = StringIO()
+        call_command('recount', stdout=out)
+        self.assertCounts(0, 1)
+        self.assertIn('products.Category.active_product_count: 2 rows repaired', out.getvalue())
+
+
+class AsyncViewTests(TestCase):
+    """The async views return exactly what the sync DRF views return"""
+
+    def setUp(self):
+        get_api_cache().clear()
+        self.factory = RequestFactory()
+        self.marble = Category.objects.create(name='Marble')
+        self.granite = Category.objects.create(name='Granite')
+        for index in range(12):
+            product = create_product(
+                self.marble if index % 2 else self.granite, f'Product {index}', is_featured=index % 3 == 0
+            )
+            ProductImage.objects.create(product=product, image='products/extra.jpg', order=1)
+
+    def call_async(self, view_class, params=None, headers=None, **kwargs):
+        get_api_cache().clear()
+        request = self.factory.get('/api/products/', params or {}, headers=headers)
+        response = async_to_sync(view_class.as_view())(request, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        return response
+
+    def call_sync(self, url, params=None, headers=None):
+        get_api_cache().clear()
+        return self.client.get(url, params or {}, headers=headers)
+
+    def test_list_matches_sync_view(self):
+        from .views import AsyncProductListView
+
+        url = reverse('products:product-list')
+        for params in [{}, {'page': 2}, {'category': self.marble.pk}, {'is_featured': 'true'},
+                       {'ordering': 'name'}, {'pagination': 'keyset'}]:
+            with self.subTest(params=params):
+                with CaptureQueriesContext(connection) as sync_queries:
+                    expected = self.call_sync(url, params)
+                with CaptureQueriesContext(connection) as async_queries:
+                    response = self.call_async(AsyncProductListView, params)
+                # The sync view validates ?category= twice (validators and page)
+                self.assertLessEqual(len(async_queries), len(sync_queries))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.content), expected.json())
+                self.assertEqual(response.get('ETag'), expected.get('ETag'))
+
+    def test_detail_and_conditional_get(self):
+        from .views import AsyncProductDetailView
+
+        product = Product.objects.first()
+        expected = self.call_sync(reverse('products:product-detail', args=[product.slug]))
+        response = self.call_async(AsyncProductDetailView, slug=product.slug)
+        self.assertEqual(json.loads(response.content), expected.json())
+
+        response = self.call_async(
+            AsyncProductDetailView, headers={'if-none-match': expected['ETag']}, slug=product.slug
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.call_async(AsyncProductDetailView, slug='missing').status_code, 404)
+
+    def test_invalid_page_is_404(self):
+        from .views import AsyncProductListView
+
+        self.assertEqual(self.call_async(AsyncProductListView, {'page': 99}).status_code, 404)
+
+
+class ProductExportTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='Marble')
+        for index in range(5):
+            product = create_product(category, f'Product {index}')
+            ProductImage.objects.create(product=product, image='products/extra.jpg')
+        create_product(category, 'Hidden', is_active=False)
+        self.url = reverse('products:product-export')
+
+    def test_ndjson_streams_in_batches(self):
+        with mock.patch('products.views.EXPORT_CHUNK_SIZE', 2):
+            response = self.client.get(self.url)
+            self.assertTrue(response.streaming)
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+            with CaptureQueriesContext(connection) as queries:
+                body = b''.join(response.streaming_content).decode('utf-8')
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['name'] for row in rows], [f'Product {index}' for index in range(5)])
+        self.assertEqual(len(rows[0]['additional_images']), 1)
+        # One product query and one image prefetch per batch of two
+        prefetches = [query for query in queries.captured_queries if 'products_productimage' in query['sql']]
+        self.assertEqual(len(prefetches), 3)
+
+    def test_json_array_and_gzip(self):
+        response = self.client.get(self.url, {'format': 'json'}, headers={'accept-encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(len(json.loads(body)), 5)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+
+
+class ImportCatalogTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.source_dir = tempfile.mkdtemp()
+        for path in (self.media_root, self.source_dir):
+            self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.write_image('black_gold.jpg', (10, 10, 10))
+        self.write_image('taweera.png', (200, 150, 100))
+        self.manifest = os.path.join(self.source_dir, 'catalog.csv')
+        self.write_manifest([
+            ['Black Gold Marble', 'Marble', '12000', 'black_gold.jpg', 'true'],
+            ['Taweera Granite', 'Granite', '9200', 'taweera.png', 'false'],
+        ])
+
+    def write_image(self, name, color):
+        Image.new('RGB', (40, 20), color).save(os.path.join(self.source_dir, name))
+
+    def write_manifest(self, rows):
+        with open(self.manifest, 'w', newline='') as manifest:
+            writer = csv.writer(manifest)
+            writer.writerow(['name', 'category', 'price', 'image', 'is_featured'])
+            writer.writerows(rows)
+
+    def run_import(self):
+        out = StringIO()
+        call_command('import_catalog', self.manifest, stdout=out)
+        return out.getvalue()
+
+    def test_import_is_idempotent_and_diffs_by_slug(self):
+        output = self.run_import()
+        self.assertIn('2 created, 0 updated, 2 images uploaded', output)
+        marble = Category.objects.get(name='Marble')
+        product = Product.objects.get(slug='black-gold-marble')
+        self.assertEqual((product.category, product.price, product.is_featured), (marble, Decimal('12000.00'), True))
+        self.assertTrue(default_storage.exists(product.image.name))
+        self.assertTrue(MediaBlob.objects.filter(name=product.image.name).exists())
+        self.assertEqual(marble.active_product_count, 1)
+        first_image = product.image.name
+
+        output = self.run_import()
+        self.assertIn('0 new, 0 changed, 2 unchanged; 0 changed images', output)
+
+        self.write_image('taweera.png', (0, 90, 200))
+        self.write_manifest([
+            ['Black Gold Marble', 'Marble', '12500', 'black_gold.jpg', 'true'],
+            ['Taweera Granite', 'Granite', '9200', 'taweera.png', 'false'],
+        ])
+        output = self.run_import()
+        self.assertIn('0 created, 2 updated, 1 images uploaded', output)
+        product.refresh_from_db()
+        self.assertEqual((product.price, product.image.name), (Decimal('12500.00'), first_image))
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        out = StringIO()
+        call_command('import_catalog', self.manifest, '--dry-run', stdout=out)
+        self.assertIn('2 new, 0 changed, 0 unchanged; 2 of 2 changed images to upload', out.getvalue())
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(Category.objects.exists())
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_images_already_stored_are_counted_from_the_upload_report(self):
+        self.run_import()
+        # A new product whose image content is already stored under another product
+        self.write_manifest([
+            ['Black Gold Marble', 'Marble', '12000', 'black_gold.jpg', 'true'],
+            ['Taweera Granite', 'Granite', '9200', 'taweera.png', 'false'],
+            ['Black Gold Tile', 'Marble', '800', 'black_gold.jpg', 'false'],
+        ])
+        out = StringIO()
+        call_command('import_catalog', self.manifest, '--dry-run', stdout=out)
+        self.assertIn('1 new, 0 changed, 2 unchanged; 0 of 1 changed images to upload', out.getvalue())
+
+        with mock.patch.object(default_storage, 'exists', wraps=default_storage.exists) as exists:
+            output = self.run_import()
+        self.assertIn('1 created, 0 updated, 0 images uploaded, 1 images already stored', output)
+        # No serial pre-pass: only upload_files() looks at storage
+        self.assertLessEqual(exists.call_count, 1)
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Media is named by content hash and identical bytes are stored once"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.storage = ContentAddressedStorage()
+
+    def test_identical_content_is_uploaded_once(self):
+        digest = hashlib.sha256(b'slab').hexdigest()
+        with mock.patch.object(self.storage.backend, 'save', wraps=self.storage.backend.save) as backend_save:
+            first = self.storage.save('products/slab.JPG', ContentFile(b'slab'))
+            second = self.storage.save('products/copy.jpg', ContentFile(b'slab'))
+        self.assertEqual(first, f'products/{digest}.jpg')
+        self.assertEqual(second, first)
+        self.assertEqual(backend_save.call_count, 1)
+        self.assertEqual(list(MediaBlob.objects.values_list('sha256', 'name', 'size')), [(digest, first, 4)])
+        with self.storage.open(first) as stored:
+            self.assertEqual(stored.read(), b'slab')
+
+    def test_blobs_already_in_the_backend_are_indexed_without_upload(self):
+        name = self.storage.save('gallery/a.png', ContentFile(b'tile'))
+        MediaBlob.objects.all().delete()
+        with mock.patch.object(self.storage.backend, 'save') as backend_save:
+            self.assertEqual(self.storage.save('gallery/b.png', ContentFile(b'tile')), name)
+        backend_save.assert_not_called()
+        self.assertTrue(MediaBlob.objects.filter(name=name).exists())
+
+    def test_blob_missing_from_the_backend_is_uploaded_again(self):
+        name = self.storage.save('products/slab.jpg', ContentFile(b'slab'))
+        # Removed out of band: the index row survives, the bytes don't
+        self.storage.backend.delete(name)
+        self.assertTrue(MediaBlob.objects.filter(name=name).exists())
+        self.assertEqual(self.storage.save('products/again.jpg', ContentFile(b'slab')), name)
+        with self.storage.open(name) as stored:
+            self.assertEqual(stored.read(), b'slab')
+
+    def test_same_bytes_stay_under_each_upload_to(self):
+        product = self.storage.save('products/slab.jpg', ContentFile(b'slab'))
+        gallery = self.storage.save('gallery/slab.jpg', ContentFile(b'slab'))
+        self.assertTrue(product.startswith('products/'))
+        self.assertTrue(gallery.startswith('gallery/'))
+        self.assertTrue(self.storage.exists(gallery))
+        self.assertEqual(MediaBlob.objects.filter(name__in=[product, gallery]).count(), 2)
+
+    def test_different_content_never_clobbers(self):
+        first = self.storage.save('products/slab.jpg', ContentFile(b'one'))
+        second = self.storage.save('products/slab.jpg', ContentFile(b'two'))
+        self.assertNotEqual(first, second)
+        with self.storage.open(first) as stored:
+            self.assertEqual(stored.read(), b'one')
+
+    def test_delete_drops_the_index_entry(self):
+        name = self.storage.save('products/slab.jpg', ContentFile(b'slab'))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_delete_keeps_blobs_rows_still_use(self):
+        category = Category.objects.create(name='Marble')
+        name = self.storage.save('products/slab.jpg', ContentFile(b'slab'))
+        product = create_product(category, 'Carrara', image=name)
+        derivative = self.storage.save('products/derivatives/slab-sm.webp', ContentFile(b'small'))
+        Product.objects.filter(pk=product.pk).update(
+            image='products/other.jpg', image_derivatives={'renditions': {'sm': {'webp': derivative}}},
+        )
+        create_product(category, 'Copy', image=name)
+
+        for shared in (name, derivative):
+            self.storage.delete(shared)
+            self.assertTrue(self.storage.exists(shared))
+            self.assertTrue(MediaBlob.objects.filter(name=shared).exists())
+
+        Product.objects.all().delete()
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+
+    def test_default_storage_is_content_addressed(self):
+        name = default_storage.save('products/upload.jpg', ContentFile(b'upload'))
+        self.assertEqual(name, f"products/{hashlib.sha256(b'upload').hexdigest()}.jpg")
+
+
+class SyntheticCatalogTests(TestCase):
+    """generate_synthetic_catalog is deterministic and benchmark_endpoints profiles its data"""
+
+    def generate(self, *args):
+        call_command(
+            'generate_synthetic_catalog', '--categories', '3', '--products', '24', '--gallery-categories', '2',
+            '--gallery-images', '30', '--tags', '6', '--contact-messages', '5', *args, stdout=StringIO(),
+        )
+
+    def snapshot(self):
+        return (
+            list(Product.objects.order_by('slug').values_list('slug', 'name', 'price', 'image', 'category__slug')),
+            list(GalleryImageTag.objects.order_by('image__title', 'tag__slug').values_list('image__title', 'tag__slug')),
+        )
+
+    def test_same_seed_same_rows_and_counters(self):
+        self.generate()
+        first = self.snapshot()
+        self.assertEqual((len(first[0]), len(first[1])), (24, 90))
+        self.assertEqual(ContactMessage.objects.count(), 5)
+        self.assertEqual(ProductImage.objects.count(), 48)
+        for category in Category.objects.all():
+            self.assertEqual(category.active_product_count, category.products.filter(is_active=True).count())
+
+        with self.assertRaises(CommandError):
+            self.generate()
+        self.generate('--replace')
+        self.assertEqual(self.snapshot(), first)
+        self.generate('--replace', '--seed', '1')
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_benchmark_writes_comparable_results(self):
+        self.generate()
+        output = os.path.join(tempfile.mkdtemp(), 'results.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(output))
+        call_command('benchmark_endpoints', '--iterations', '3', '--warmup', '0', '--output', output, stdout=StringIO())
+        with open(output) as results_file:
+            results = json.load(results_file)
+        self.assertEqual(results['meta']['rows']['products'], 24)
+        products = results['endpoints']['products']
+        self.assertEqual((products['status'], products['budget']), (200, 5))
+        self.assertLessEqual(products['queries'], products['budget'])
+        self.assertLessEqual(products['p50_ms'], products['p99_ms'])
+
+        # A query more than the baseline is a regression
+        results['endpoints']['products']['queries'] -= 1
+        with open(output, 'w') as results_file:
+            json.dump(results, results_file)
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, 'products: 2 -> 3 queries'):
+            call_command(
+                'benchmark_endpoints', '--iterations', '2', '--warmup', '0', '--compare', output,
+                '--max-regression', '1000', stdout=out,
+            )
@@ -1,13 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'products'
 
+if getattr(settings, 'ASYNC_CATALOG_VIEWS', False):
+    product_list = views.AsyncProductListView
+    featured_products = views.AsyncFeaturedProductsView
+    product_detail = views.AsyncProductDetailView
+else:
+    product_list = views.ProductListView
+    featured_products = views.FeaturedProductsView
+    product_detail = views.ProductDetailView
+
 urlpatterns = [
     path('categories/', views.CategoryListView.as_view(), name='category-list'),
     path('categories/with-count/', views.product_categories_with_count, name='categories-with-count'),
     path('debug/storage/', views.debug_storage, name='debug-storage'),
-    path('', views.ProductListView.as_view(), name='product-list'),
-    path('featured/', views.FeaturedProductsView.as_view(), name='featured-products'),
-    path('<slug:slug>/', views.ProductDetailView.as_view(), name='product-detail'),
+    path('', product_list.as_view(), name='product-list'),
+    path('featured/', featured_products.as_view(), name='featured-products'),
+    path('export/', views.export_products, name='product-export'),
+    path('<slug:slug>/', product_detail.as_view(), name='product-detail'),
 ]
@@ -1,53 +1,177 @@
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
 from rest_framework import generics, filters
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
+from rest_framework.utils.encoders import JSONEncoder
 from django_filters.rest_framework import DjangoFilterBackend
-from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.http import JsonResponse, StreamingHttpResponse
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from django.views.decorators.http import require_GET
 from django.core.files.storage import default_storage
-from .models import Category, Product
+from sundar_marbles.async_views import AsyncCatalogView
+from sundar_marbles.cache import cache_api_response
+from sundar_marbles.conditional import ConditionalGetMixin
+from sundar_marbles.fieldsets import SparseFieldsetMixin
+from sundar_marbles.queryguard import query_budget
+from sundar_marbles.search import FullTextSearchFilter
+from .models import Category, Product, ProductImage
 from .serializers import CategorySerializer, ProductSerializer, ProductCreateSerializer
 
 
+def categories_with_product_count():
+    """Active categories with ``product_count`` read from the maintained counter"""
+    return Category.objects.filter(is_active=True).annotate(
+        product_count=F('active_product_count')
+    ).order_by('name')
+
+
+def products_for_serialization(queryset):
+    """Load the category and ordered additional images that ProductSerializer renders"""
+    # search_vector is only read by the database (sundar_marbles/search.py)
+    return queryset.defer('search_vector').select_related('category').prefetch_related(
+        Prefetch('additional_images', queryset=ProductImage.objects.order_by('order', 'created_at'))
+    )
+
+
+@method_decorator(cache_api_response, name='dispatch')
 class CategoryListView(generics.ListAPIView):
-    queryset = Category.objects.filter(is_active=True)
+    queryset = categories_with_product_count()
     serializer_class = CategorySerializer
+    query_budget = 2
 
 
-class ProductListView(generics.ListAPIView):
-    queryset = Product.objects.filter(is_active=True)
+@method_decorator(cache_api_response, name='dispatch')
+class ProductListView(SparseFieldsetMixin, ConditionalGetMixin, generics.ListAPIView):
+    queryset = products_for_serialization(Product.objects.filter(is_active=True))
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['category', 'is_featured']
-    search_fields = ['name', 'description']
     ordering_fields = ['name', 'price', 'created_at']
     ordering = ['-created_at']
+    # Used instead of ``ordering`` for ?pagination=keyset
+    keyset_ordering = ['-created_at', 'id']
+    # Validators, page, additional images; ?category= adds its lookup and a COUNT
+    query_budget = 5
 
 
-class ProductDetailView(generics.RetrieveAPIView):
-    queryset = Product.objects.filter(is_active=True)
+@method_decorator(cache_api_response, name='dispatch')
+class ProductDetailView(SparseFieldsetMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+    queryset = products_for_serialization(Product.objects.filter(is_active=True))
     serializer_class = ProductSerializer
     lookup_field = 'slug'
+    query_budget = 3
 
 
-class FeaturedProductsView(generics.ListAPIView):
-    queryset = Product.objects.filter(is_active=True, is_featured=True)
+@method_decorator(cache_api_response, name='dispatch')
+class FeaturedProductsView(SparseFieldsetMixin, ConditionalGetMixin, generics.ListAPIView):
+    queryset = products_for_serialization(Product.objects.filter(is_active=True, is_featured=True))
     serializer_class = ProductSerializer
+    query_budget = 3
+
 
+@method_decorator(cache_api_response, name='get')
+class AsyncProductListView(AsyncCatalogView):
+    drf_view = ProductListView
 
+
+@method_decorator(cache_api_response, name='get')
+class AsyncProductDetailView(AsyncCatalogView):
+    drf_view = ProductDetailView
+
+
+@method_decorator(cache_api_response, name='get')
+class AsyncFeaturedProductsView(AsyncCatalogView):
+    drf_view = FeaturedProductsView
+
+
+@query_budget(1)
+@cache_api_response
 @api_view(['GET'])
 def product_categories_with_count(request):
     """Get all categories with product count"""
-    categories = Category.objects.filter(is_active=True)
-    data = []
-    for category in categories:
-        data.append({
-            'id': category.id,
-            'name': category.name,
-            'slug': category.slug,
-            'product_count': category.products.filter(is_active=True).count()
-        })
-    return Response(data)
+    categories = categories_with_product_count().values('id', 'name', 'slug', 'product_count')
+    return Response(list(categories))
+
+
+EXPORT_CHUNK_SIZE = 500
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'json': 'application/json; charset=utf-8',
+}
+
+
+def product_export_chunks(request, export_format):
+    """Yield the active catalog as encoded NDJSON lines or JSON array pieces, a batch at a time"""
+    queryset = products_for_serialization(Product.objects.filter(is_active=True)).order_by('id')
+    context = {'request': request}
+    # PgBouncer (Neon's pooler) only keeps a server-side cursor alive inside a transaction
+    with transaction.atomic():
+        rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        separator = ''
+        if export_format == 'json':
+            yield b'['
+        while batch := list(islice(rows, EXPORT_CHUNK_SIZE)):
+            items = [
+                json.dumps(item, cls=JSONEncoder, ensure_ascii=False)
+                for item in ProductSerializer(batch, many=True, context=context).data
+            ]
+            if export_format == 'json':
+                yield (separator + ','.join(items)).encode('utf-8')
+                separator = ','
+            else:
+                yield ''.join(item + '\n' for item in items).encode('utf-8')
+        if export_format == 'json':
+            yield b']'
+
+
+async def iterate_in_thread(iterator):
+    """Serve a sync iterator from an async response without buffering it first.
+
+    Every step runs in the request's thread-sensitive thread, so the export's
+    transaction and cursor stay on one database connection.
+    """
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(iterator, None)) is not None:
+        yield chunk
+
+
+@require_GET
+def export_products(request):
+    """Stream every active product as NDJSON, or as a JSON array with ``?format=json``.
+
+    Memory stays flat however large the catalog is: rows come from a
+    server-side cursor and leave as soon as each batch is serialized. Clients
+    sending ``Accept-Encoding: gzip`` get the stream gzip-compressed.
+    """
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_CONTENT_TYPES:
+        return JsonResponse(
+            {'error': f"format must be one of: {', '.join(EXPORT_CONTENT_TYPES)}"}, status=400
+        )
+
+    chunks = product_export_chunks(request, export_format)
+    gzipped = bool(re_accepts_gzip.search(request.headers.get('Accept-Encoding', '')))
+    if gzipped:
+        chunks = compress_sequence(chunks)
+    if isinstance(request, ASGIRequest):
+        # Django would otherwise read a sync iterator to the end before sending
+        chunks = iterate_in_thread(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=EXPORT_CONTENT_TYPES[export_format])
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    return response
 
 
 @api_view(['GET'])
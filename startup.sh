@@ -67,13 +67,45 @@ else:
     print("❌ Admin user not found in database")
 PYTHON_SCRIPT
 
+# Start the Celery worker for the queued tasks (Redis when REDIS_URL is set,
+# otherwise the filesystem broker on this host) unless they run inline
+if [ "$CELERY_TASK_ALWAYS_EAGER" != "True" ]; then
+    echo "Starting Celery worker..."
+    celery -A sundar_marbles worker --concurrency 2 --loglevel info &
+fi
+
+# GUNICORN_WORKERS overrides the worker count and GUNICORN_THREADS (WSGI only)
+# the threads per worker; compare settings locally with `python manage.py
+# load_test` before changing them. Each worker's database pool is sized from
+# these (sundar_marbles/db_pool.py), so the settings need GUNICORN_THREADS too.
+GUNICORN_WORKERS="${GUNICORN_WORKERS:-2}"
+export GUNICORN_THREADS="${GUNICORN_THREADS:-1}"
+
+# ASYNC_CATALOG_VIEWS=True serves the catalog from the async views under an
+# ASGI worker, so a slow database round trip no longer blocks a whole worker
+if [ "$ASYNC_CATALOG_VIEWS" = "True" ]; then
+    echo "Starting Django application with gunicorn (ASGI)..."
+    exec gunicorn sundar_marbles.asgi:application \
+        --worker-class uvicorn.workers.UvicornWorker \
+        --bind 0.0.0.0:8000 \
+        --workers "$GUNICORN_WORKERS" \
+        --timeout 300 \
+        --max-requests 1000 \
+        --max-requests-jitter 100 \
+        --preload \
+        --config python:sundar_marbles.gunicorn_config \
+        --log-level info
+fi
+
 # Start the application with gunicorn
 echo "Starting Django application with gunicorn..."
 exec gunicorn azure_wsgi:application \
     --bind 0.0.0.0:8000 \
-    --workers 2 \
+    --workers "$GUNICORN_WORKERS" \
+    --threads "$GUNICORN_THREADS" \
     --timeout 300 \
     --max-requests 1000 \
     --max-requests-jitter 100 \
     --preload \
+    --config python:sundar_marbles.gunicorn_config \
     --log-level info
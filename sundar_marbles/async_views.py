@@ -0,0 +1,80 @@
+"""
+Async (ASGI) read path for the catalog API.
+
+``AsyncCatalogView`` answers GET requests on behalf of a DRF generic view
+(``drf_view``). The DRF class still supplies the queryset, filter backends,
+serializer, lookup and pagination, so both paths return identical responses;
+only the database round trips change, going through ``aaggregate()``,
+``acount()``, ``aget()`` and ``aiterator()``. Under an ASGI worker a slow query
+parks one coroutine instead of blocking a whole worker process.
+
+``filter_queryset`` runs through ``sync_to_async`` because django-filter may
+look up a ``?category=`` row while validating. Serialization stays
+synchronous; the querysets are prefetched so it never touches the database.
+"""
+
+from asgiref.sync import sync_to_async
+from django.views import View
+from rest_framework.exceptions import NotFound
+from rest_framework.mixins import RetrieveModelMixin
+from rest_framework.response import Response
+
+from .conditional import ConditionalGetMixin
+
+
+class AsyncCatalogView(View):
+    """Serve ``drf_view`` (a ListAPIView or RetrieveAPIView subclass) asynchronously"""
+
+    drf_view = None
+    http_method_names = ['get']
+
+    async def get(self, request, *args, **kwargs):
+        view = self.drf_view()
+        view.args, view.kwargs = args, kwargs
+        view.request = drf_request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        try:
+            response = await self.respond(view, drf_request)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        return view.finalize_response(drf_request, response, *args, **kwargs)
+
+    async def respond(self, view, request):
+        queryset = await sync_to_async(self.prepare)(view, request)
+
+        validators = None
+        if isinstance(view, ConditionalGetMixin) and not view.skips_validators(request):
+            validators = await view.aget_validators(queryset)
+            response = view.not_modified_response(request, validators)
+            if response is not None:
+                return view.add_validators(response, validators)
+
+        if isinstance(view, RetrieveModelMixin):
+            response = await self.retrieve(view, queryset)
+        else:
+            response = await self.list(view, queryset)
+        return view.add_validators(response, validators) if validators else response
+
+    def prepare(self, view, request):
+        view.initial(request)
+        return view.filter_queryset(view.get_queryset())
+
+    async def list(self, view, queryset):
+        known_count = getattr(view, 'known_count', None)
+        if known_count is not None:
+            queryset.known_count = known_count
+        if view.paginator is not None:
+            page = await view.paginator.apaginate_queryset(queryset, view.request, view=view)
+            if page is not None:
+                return view.get_paginated_response(view.get_serializer(page, many=True).data)
+        rows = [row async for row in queryset.aiterator(chunk_size=100)]
+        return Response(view.get_serializer(rows, many=True).data)
+
+    async def retrieve(self, view, queryset):
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        try:
+            instance = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError):
+            raise NotFound()
+        view.check_object_permissions(view.request, instance)
+        return Response(view.get_serializer(instance).data)
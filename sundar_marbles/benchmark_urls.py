@@ -0,0 +1,14 @@
+"""
+URLconf used by ``manage.py benchmark_media``: the same MEDIA_ROOT behind the
+view ``static()`` installs and behind ``serve_media``.
+"""
+from django.conf import settings
+from django.urls import re_path
+from django.views.static import serve
+
+from .media import serve_media
+
+urlpatterns = [
+    re_path(r'^static-serve/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+    re_path(r'^serve-media/(?P<path>.*)$', serve_media),
+]
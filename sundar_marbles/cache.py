@@ -0,0 +1,137 @@
+"""
+Response cache for the public catalog API.
+
+Rendered GET responses are stored in the cache named by ``API_CACHE_ALIAS``
+under a key built from the absolute URL (scheme, host and path) plus the
+normalized query string. Every key embeds a generation number, and
+``invalidate_api_cache`` bumps it, which orphans all cached responses at once.
+That works the same on locmem and Redis without needing pattern deletes.
+"""
+
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+GENERATION_KEY = 'api-cache:generation'
+
+
+def get_api_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def _new_generation():
+    # Seed from the clock so an evicted generation never reuses an old number
+    return time.time_ns() // 1000
+
+
+def _current_generation(cache):
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, _new_generation(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def _bump_generation():
+    cache = get_api_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, _new_generation(), timeout=None)
+
+
+def invalidate_api_cache():
+    """Drop every cached API response, now and again once the transaction commits"""
+    _bump_generation()
+    # A request running between the save and the commit may cache stale rows
+    transaction.on_commit(_bump_generation)
+
+
+def response_cache_key(request, cache=None):
+    """Cache key for a request: generation + absolute path + sorted query params"""
+    cache = cache or get_api_cache()
+    params = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+    )
+    identity = f"{request.build_absolute_uri(request.path)}?{urlencode(params)}"
+    digest = hashlib.sha256(identity.encode('utf-8')).hexdigest()
+    return f"api-cache:{_current_generation(cache)}:{digest}"
+
+
+def cached_response(request, cache, key):
+    """Rebuild the response stored under ``key``, or None on a miss"""
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    status, content, headers = cached
+    response = HttpResponse(content, status=status)
+    for header, value in headers:
+        response[header] = value
+    # Revalidation against a cached body still answers 304
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified')),
+        response=response,
+    )
+
+
+def store_response(cache, key, response):
+    if response.status_code == 200 and not response.streaming:
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        cache.set(
+            key,
+            (response.status_code, response.content, list(response.items())),
+            getattr(settings, 'API_CACHE_TIMEOUT', 60),
+        )
+    return response
+
+
+def cache_api_response(view_func):
+    """Serve successful GET responses of ``view_func`` from the API cache.
+
+    Works on function views and, through ``method_decorator(..., name='dispatch')``,
+    on class-based views. Async views are wrapped with an async wrapper
+    (decorate their ``get`` handler, since ``View.dispatch`` is sync).
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return await view_func(request, *args, **kwargs)
+
+            cache = get_api_cache()
+            key = await sync_to_async(response_cache_key)(request, cache)
+            response = await sync_to_async(cached_response)(request, cache, key)
+            if response is not None:
+                return response
+            response = await view_func(request, *args, **kwargs)
+            return await sync_to_async(store_response)(cache, key, response)
+
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view_func(request, *args, **kwargs)
+
+        cache = get_api_cache()
+        key = response_cache_key(request, cache)
+        response = cached_response(request, cache, key)
+        if response is not None:
+            return response
+        return store_response(cache, key, view_func(request, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,19 @@
+"""
+Celery application for background work (contact email, image derivatives).
+Bulk storage uploads run in the management commands through
+sundar_marbles/uploads.py, which retries each block itself.
+
+Start a worker with:
+
+    celery -A sundar_marbles worker --loglevel=info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sundar_marbles.settings')
+
+app = Celery('sundar_marbles')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
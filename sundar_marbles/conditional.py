@@ -0,0 +1,114 @@
+"""
+Conditional GET support for the catalog API.
+
+Validators come from one aggregate over the view's filtered queryset: the
+row count plus the newest timestamp of every path in ``last_modified_fields``.
+Requests carrying a matching ``If-None-Match`` or ``If-Modified-Since`` get a
+304 before anything is serialized. ``AsyncCatalogView`` drives the same
+steps with ``aget_validators``.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.mixins import RetrieveModelMixin
+
+
+class ConditionalGetMixin:
+    """Add ETag / Last-Modified validators to a generic list or detail view"""
+
+    last_modified_fields = ('updated_at', 'category__updated_at')
+
+    def get_validator_queryset(self, queryset=None):
+        if queryset is None:
+            queryset = self.filter_queryset(self.get_queryset())
+        if isinstance(self, RetrieveModelMixin):
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset.prefetch_related(None).order_by()
+
+    def validator_aggregates(self):
+        aggregates = {'row_count': Count('pk')}
+        for index, field in enumerate(self.last_modified_fields):
+            aggregates[f'modified_{index}'] = Max(field)
+        return aggregates
+
+    def validators_from(self, values):
+        """Turn the validator aggregate into ``(row_count, etag, last_modified_timestamp)``"""
+        row_count = values.pop('row_count')
+        timestamps = [value for value in values.values() if value is not None]
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+
+        fingerprint = ':'.join([str(row_count)] + [value.isoformat() for value in timestamps])
+        etag = 'W/"%s"' % hashlib.md5(fingerprint.encode('utf-8')).hexdigest()
+        return row_count, etag, last_modified
+
+    def get_validators(self):
+        """Return ``(row_count, etag, last_modified_timestamp)``"""
+        return self.validators_from(self.get_validator_queryset().aggregate(**self.validator_aggregates()))
+
+    async def aget_validators(self, queryset):
+        """``get_validators`` for async views, given the already filtered queryset"""
+        queryset = self.get_validator_queryset(queryset)
+        return self.validators_from(await queryset.aaggregate(**self.validator_aggregates()))
+
+    def skips_validators(self, request):
+        is_keyset_request = getattr(self.paginator, 'is_keyset_request', None)
+        # Keyset pages exist to avoid scanning the whole result set
+        return bool(is_keyset_request and is_keyset_request(request, self))
+
+    def not_modified_response(self, request, validators):
+        """A 304 when the request's preconditions match ``validators``, else None"""
+        row_count, etag, last_modified = validators
+        # The paginator reuses this count instead of running its own COUNT(*)
+        self.known_count = row_count
+        if self.is_missing(validators):
+            return None
+        return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    def is_missing(self, validators):
+        # Let a missing detail object fall through to the normal 404
+        return validators[0] == 0 and isinstance(self, RetrieveModelMixin)
+
+    def add_validators(self, response, validators):
+        _, etag, last_modified = validators
+        if response.status_code in (200, 304) and not self.is_missing(validators):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Clients may keep the body but must revalidate before reusing it
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        if self.skips_validators(request):
+            return super().get(request, *args, **kwargs)
+
+        validators = self.get_validators()
+        response = self.not_modified_response(request, validators)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.add_validators(response, validators)
+
+    def paginate_queryset(self, queryset):
+        known_count = getattr(self, 'known_count', None)
+        if known_count is not None:
+            queryset.known_count = known_count
+        return super().paginate_queryset(queryset)
+
+
+def touch_parents(model, pks, now):
+    """Bump ``updated_at`` on the rows that ``model.etag_parent`` points to.
+
+    For models without an ``updated_at`` of their own (ProductImage) whose rows
+    are rendered inside the parent's response, so writes that skip ``save()``
+    still move the parent's ETag.
+    """
+    parent = getattr(model, 'etag_parent', None)
+    if parent is None:
+        return
+    field = model._meta.get_field(parent)
+    parent_ids = model.objects.filter(pk__in=pks).values(field.attname)
+    field.related_model.objects.filter(pk__in=parent_ids).update(updated_at=now)
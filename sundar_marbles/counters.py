@@ -0,0 +1,99 @@
+"""
+Denormalized row counters kept current from model signals.
+
+``maintain_counter(Product, 'category', 'active_product_count', 'is_active')``
+keeps ``Category.active_product_count`` equal to the number of active products
+pointing at each category. Every create, delete, move to another parent and
+``is_active`` flip applies a +1/-1 ``F()`` update to the affected parent rows,
+so concurrent writers never lose increments.
+
+``QuerySet.update()``, ``bulk_create()``, raw SQL and ``loaddata`` bypass the
+signals; run ``manage.py recount`` afterwards to repair any drift.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_save
+
+# Every counter registered with maintain_counter, for the recount command
+COUNTERS = []
+
+
+def counted_rows(model, foreign_key, active_field=None):
+    """Per-parent row counts of ``model`` as a subquery usable on the parent"""
+    attname = model._meta.get_field(foreign_key).attname
+    rows = model._default_manager.filter(**{attname: OuterRef('pk')})
+    if active_field:
+        rows = rows.filter(**{active_field: True})
+    counts = rows.order_by().values(attname).annotate(rows=Count('pk')).values('rows')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def recount_field(model, foreign_key, counter_field, active_field=None):
+    """Rewrite ``counter_field`` on every parent row that drifted; return how many did"""
+    parent = model._meta.get_field(foreign_key).related_model
+    drifted = parent._default_manager.annotate(
+        actual_rows=counted_rows(model, foreign_key, active_field)
+    ).exclude(**{counter_field: F('actual_rows')})
+    pks = list(drifted.values_list('pk', flat=True))
+    if pks:
+        parent._default_manager.filter(pk__in=pks).update(
+            **{counter_field: counted_rows(model, foreign_key, active_field)}
+        )
+    return len(pks)
+
+
+def maintain_counter(model, foreign_key, counter_field, active_field=None):
+    """Keep ``<parent>.<counter_field>`` equal to the (active) ``model`` rows per parent"""
+    field = model._meta.get_field(foreign_key)
+    parent = field.related_model
+    attname = field.attname
+    tracked_fields = {field.name, attname} | ({active_field} if active_field else set())
+    columns = [attname] + ([active_field] if active_field else [])
+    state_key = f'_counter_previous_{counter_field}'
+
+    def counted_parent(values):
+        """The parent pk a row with ``values`` counts towards, if any"""
+        if active_field and not values[active_field]:
+            return None
+        return values[attname]
+
+    def current_parent(instance):
+        return counted_parent({column: getattr(instance, column) for column in columns})
+
+    def adjust(parent_pk, delta):
+        if parent_pk is not None:
+            parent._default_manager.filter(pk=parent_pk).update(
+                **{counter_field: F(counter_field) + delta}
+            )
+
+    def remember_previous(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or instance._state.adding or instance.pk is None:
+            return
+        if update_fields is not None and not tracked_fields & set(update_fields):
+            return
+        stored = sender._default_manager.filter(pk=instance.pk).values(*columns).first()
+        instance.__dict__[state_key] = counted_parent(stored) if stored else None
+
+    def count_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+        if raw:
+            return
+        if not created and state_key not in instance.__dict__:
+            # Saved without touching the tracked fields
+            return
+        previous = instance.__dict__.pop(state_key, None)
+        current = current_parent(instance)
+        if previous != current:
+            adjust(previous, -1)
+            adjust(current, 1)
+
+    def count_deleted(sender, instance, **kwargs):
+        adjust(current_parent(instance), -1)
+
+    dispatch_uid = f'{model._meta.label}.{counter_field}'
+    pre_save.connect(remember_previous, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    post_save.connect(count_saved, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    post_delete.connect(count_deleted, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    counter = (model, foreign_key, counter_field, active_field)
+    if counter not in COUNTERS:
+        COUNTERS.append(counter)
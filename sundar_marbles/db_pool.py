@@ -0,0 +1,122 @@
+"""
+PostgreSQL connection pooling for the gunicorn workers.
+
+With ``DATABASE_POOL`` on, settings_production puts ``pool_options()`` into
+``DATABASES['default']['OPTIONS']['pool']`` and Django 5.2 keeps one
+psycopg_pool.ConnectionPool per worker process: closing the connection at the
+end of a request hands it back to the pool instead of ending its TLS session
+with Neon, and the next request skips the handshake.
+
+A worker never runs more queries at once than it serves requests, so the pool
+is sized to the worker model:
+
+    sync        1 connection
+    gthread     one per thread (GUNICORN_THREADS), all opened at boot
+    uvicorn     async views run each request's queries in a thread of their
+                own, so up to ASGI_POOL_SIZE, 2 of them opened at boot
+
+The hooks in gunicorn_config.py open the pool when a worker boots, check
+idle connections every ``DATABASE_POOL_CHECK_INTERVAL`` seconds and close
+the pool when the worker exits. A pool the ``--preload`` master opened while
+importing the app is closed before forking: forked workers would otherwise
+inherit it without its maintenance threads, sharing its sockets.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ASGI_POOL_SIZE = 8
+ASGI_POOL_MIN_SIZE = 2
+
+
+def pool_options(threads=1, asgi=False, max_size=None):
+    """``OPTIONS['pool']`` for one worker process serving ``threads`` requests at once (or ASGI)"""
+    if max_size is None:
+        max_size = ASGI_POOL_SIZE if asgi else max(1, threads)
+    return {
+        'min_size': min(ASGI_POOL_MIN_SIZE, max_size) if asgi else max_size,
+        'max_size': max_size,
+        # Wait this long for a free connection before the request fails
+        'timeout': 10,
+        # Azure drops outbound connections idle for 4 minutes; extra connections
+        # beyond min_size are closed before that, the rest are kept alive by
+        # TCP keepalives and the periodic check
+        'max_idle': 180,
+        'max_lifetime': 1800,
+    }
+
+
+def keepalive_options():
+    """libpq TCP keepalive parameters that stop idle pooled connections from being dropped silently"""
+    return {'keepalives': 1, 'keepalives_idle': 60, 'keepalives_interval': 10, 'keepalives_count': 3}
+
+
+def database_pools(initialized_only=False):
+    """``(alias, pool)`` for every database configured with a pool"""
+    from django.db import connections
+
+    for conn in connections.all(initialized_only=initialized_only):
+        pool = getattr(conn, 'pool', None)
+        if pool is not None:
+            yield conn.alias, pool
+
+
+def prewarm_pools(timeout=30):
+    """Open every configured pool and wait for its ``min_size`` connections.
+
+    A database that is unreachable at boot is logged, not raised: the worker
+    still starts and the pool keeps reconnecting in the background.
+    """
+    pools = list(database_pools())
+    if not pools:
+        return
+    from psycopg_pool import PoolTimeout
+
+    for alias, pool in pools:
+        try:
+            pool.open(wait=True, timeout=timeout)
+        except PoolTimeout:
+            logger.warning('Database pool %s could not open %d connections within %ss', alias, pool.min_size, timeout)
+        else:
+            logger.info('Database pool %s ready with %d connections', alias, pool.get_stats()['pool_size'])
+
+
+def start_health_checks(interval):
+    """Check idle pooled connections every ``interval`` seconds, replacing broken ones.
+
+    Runs in a daemon thread per worker until the pools are closed; returns the
+    thread, or None when there is nothing to check.
+    """
+    pools = list(database_pools())
+    if not interval or not pools:
+        return None
+
+    def check():
+        while True:
+            time.sleep(interval)
+            for alias, pool in pools:
+                if pool.closed:
+                    return
+                try:
+                    pool.check()
+                except Exception:
+                    logger.exception('Health check of database pool %s failed', alias)
+
+    thread = threading.Thread(target=check, name='database-pool-check', daemon=True)
+    thread.start()
+    return thread
+
+
+def close_pools():
+    """Close the pools this process opened.
+
+    Gunicorn also calls ``worker_exit`` in the master for workers that died,
+    where nothing has been opened and this does nothing.
+    """
+    from django.db import connections
+
+    for alias, _ in list(database_pools(initialized_only=True)):
+        connections[alias].close_pool()
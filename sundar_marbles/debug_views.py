@@ -1,46 +1,45 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import Http404, JsonResponse
 from django.db import connection
 from django.contrib.auth import get_user_model
+from django.test import Client
+import time
 import traceback
+import uuid
 
+from .endpoints import public_endpoints, request_host
+from .queryguard import RECENT_REPORTS, collecting
 
-def debug_database(request):
-    """Debug endpoint to test database connectivity"""
-    result = {
-        'database_connection': False,
-        'tables_exist': False,
-        'users_count': 0,
-        'superuser_exists': False,
-        'errors': []
-    }
-    
+
+def database_diagnostics(request):
+    """
+    Database round trip, a query profile of every public endpoint and the
+    query guard's recent reports (see queryguard.py). Staff only outside DEBUG.
+    """
+    if not (settings.DEBUG or request.user.is_staff):
+        raise Http404
+
+    result = {'database': {'vendor': connection.vendor, 'connected': False}, 'endpoints': [], 'errors': []}
     try:
-        # Test basic database connection
+        started = time.perf_counter()
         with connection.cursor() as cursor:
             cursor.execute('SELECT 1')
-            result['database_connection'] = True
-            
-        # Test if Django tables exist
-        cursor.execute("SELECT EXISTS(SELECT * FROM information_schema.tables WHERE table_name='auth_user')")
-        result['tables_exist'] = cursor.fetchone()[0]
-        
-        if result['tables_exist']:
-            # Count users
-            User = get_user_model()
-            result['users_count'] = User.objects.count()
-            result['superuser_exists'] = User.objects.filter(is_superuser=True).exists()
-            
-            # List all users
-            users = list(User.objects.values('username', 'email', 'is_superuser', 'is_staff'))
-            result['users'] = users
-            
+        result['database'].update(connected=True, round_trip_ms=round((time.perf_counter() - started) * 1000, 1))
+
+        client = Client(HTTP_HOST=request_host())
+        with collecting() as reports:
+            for label, path, params in public_endpoints():
+                # A throwaway parameter keeps the response cache from answering
+                response = client.get(path, {**params, '_diagnostics': uuid.uuid4().hex})
+                result['endpoints'].append({'label': label, 'status': response.status_code, **reports[-1]})
     except Exception as e:
         result['errors'].append({
             'error': str(e),
             'traceback': traceback.format_exc()
         })
-    
-    return JsonResponse(result, indent=2)
+
+    result['recent_reports'] = list(RECENT_REPORTS)
+    return JsonResponse(result, json_dumps_params={'indent': 2})
 
 
 def force_create_superuser(request):
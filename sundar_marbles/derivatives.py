@@ -0,0 +1,172 @@
+"""
+Responsive image derivatives.
+
+Every saved product and gallery image gets thumbnail, medium and large
+renditions in WebP and JPEG, stored through the image's storage next to the
+original (``products/slab.jpg`` -> ``products/slab_medium.webp``). The stored
+names are recorded on the model's ``image_derivatives`` JSON field, so
+serializers can build ``srcset`` strings without touching storage:
+
+    {
+        "source": "products/slab.jpg",
+        "renditions": {
+            "thumbnail": {"width": 320, "height": 240,
+                          "webp": "products/slab_thumbnail.webp",
+                          "jpeg": "products/slab_thumbnail.jpg"},
+            ...
+        }
+    }
+
+The same pass fills the layout/placeholder fields described in placeholders.py.
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .conditional import touch_parents
+from .placeholders import EMPTY_METADATA, image_metadata
+
+logger = logging.getLogger(__name__)
+
+# Rendition name -> maximum width in pixels. Images are never upscaled.
+RENDITIONS = {
+    'thumbnail': 320,
+    'medium': 768,
+    'large': 1600,
+}
+
+# Output extension -> (Pillow format, save options)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+FILE_EXTENSIONS = {
+    'webp': 'webp',
+    'jpeg': 'jpg',
+}
+
+
+def derivative_name(source_name, rendition, image_format):
+    root, _ = os.path.splitext(source_name)
+    return f"{root}_{rendition}.{FILE_EXTENSIONS[image_format]}"
+
+
+def open_rgb(field_file):
+    with field_file.storage.open(field_file.name, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        # JPEG has no alpha channel; flatten transparent areas onto white
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def generate_derivatives(field_file, image=None):
+    """Render and store every rendition of ``field_file``; return the derivatives map"""
+    storage = field_file.storage
+    if image is None:
+        image = open_rgb(field_file)
+
+    renditions = {}
+    previous = None
+    for rendition, max_width in RENDITIONS.items():
+        width = min(max_width, image.width)
+        if previous is not None and previous['width'] == width:
+            # Source is narrower than this rendition; reuse the smaller files
+            renditions[rendition] = dict(previous)
+            continue
+
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        entry = {'width': width, 'height': height}
+        for image_format, (pillow_format, options) in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pillow_format, **options)
+            name = derivative_name(field_file.name, rendition, image_format)
+            if storage.exists(name):
+                storage.delete(name)
+            entry[image_format] = storage.save(name, ContentFile(buffer.getvalue()))
+        renditions[rendition] = entry
+        previous = entry
+
+    return {'source': field_file.name, 'renditions': renditions}
+
+
+def derivatives_outdated(instance, field_name='image'):
+    """True when ``image_derivatives`` does not describe the current image"""
+    field_file = getattr(instance, field_name)
+    current = instance.image_derivatives or {}
+    if field_file:
+        return current.get('source') != field_file.name
+    return bool(current)
+
+
+def refresh_derivatives(instance, field_name='image'):
+    """Regenerate ``instance.image_derivatives`` if its image changed since the last run.
+
+    Returns True when the stored derivatives were replaced. Storage and decoding
+    errors propagate so the caller (usually a Celery task) can retry or give up.
+    """
+    if not derivatives_outdated(instance, field_name):
+        return False
+    field_file = getattr(instance, field_name)
+
+    derivatives, metadata = {}, dict(EMPTY_METADATA)
+    if field_file:
+        if not field_file.storage.exists(field_file.name):
+            logger.info("Skipping derivatives for missing file %s", field_file.name)
+            return False
+        image = open_rgb(field_file)
+        derivatives = generate_derivatives(field_file, image)
+        metadata = image_metadata(field_file, image)
+
+    # update() avoids re-sending post_save (and queueing this task again). The
+    # response body changed, so updated_at still moves for the ETag.
+    changes = {'image_derivatives': derivatives, **metadata}
+    now = timezone.now()
+    model = type(instance)
+    if hasattr(model, 'updated_at'):
+        changes['updated_at'] = now
+    model.objects.filter(pk=instance.pk).update(**changes)
+    touch_parents(model, [instance.pk], now)
+    for field, value in changes.items():
+        setattr(instance, field, value)
+    return True
+
+
+def derivative_url(derivatives, storage, rendition='thumbnail', image_format='jpeg'):
+    entry = (derivatives or {}).get('renditions', {}).get(rendition)
+    if not entry:
+        return None
+    return storage.url(entry[image_format])
+
+
+def image_srcset(derivatives, storage, request=None):
+    """Map each output format to a ``srcset`` string, e.g. ``{"webp": "a.webp 320w, b.webp 768w"}``"""
+    renditions = (derivatives or {}).get('renditions', {})
+    srcset = {}
+    for image_format in FORMATS:
+        candidates = []
+        seen_widths = set()
+        # jsonb (PostgreSQL) does not keep the order renditions were stored in
+        for entry in sorted(renditions.values(), key=lambda entry: entry['width']):
+            if entry['width'] in seen_widths:
+                continue
+            seen_widths.add(entry['width'])
+            url = storage.url(entry[image_format])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            candidates.append(f"{url} {entry['width']}w")
+        if candidates:
+            srcset[image_format] = ', '.join(candidates)
+    return srcset
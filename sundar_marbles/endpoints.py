@@ -0,0 +1,59 @@
+"""
+Public catalog GET endpoints with sample arguments drawn from the current data.
+
+Shared by the diagnostics management commands so they all exercise the same
+requests the frontend makes.
+"""
+
+from django.conf import settings
+from django.urls import reverse
+
+
+def public_endpoints():
+    """Return ``(label, path, params)`` for every public catalog GET endpoint"""
+    from gallery.models import GalleryCategory, GalleryImage
+    from products.models import Category, Product
+
+    category = Category.objects.filter(is_active=True).first()
+    product = Product.objects.filter(is_active=True).first()
+    gallery_category = GalleryCategory.objects.filter(is_active=True).first()
+    gallery_image = GalleryImage.objects.filter(is_active=True).first()
+
+    product_list = reverse('products:product-list')
+    image_list = reverse('gallery:image-list')
+
+    endpoints = [
+        ('product categories', reverse('products:category-list'), {}),
+        ('product categories with count', reverse('products:categories-with-count'), {}),
+        ('products', product_list, {}),
+        ('featured products filter', product_list, {'is_featured': 'true'}),
+        ('products search', product_list, {'search': 'marble'}),
+        ('products keyset', product_list, {'pagination': 'keyset'}),
+        ('featured products', reverse('products:featured-products'), {}),
+        ('gallery categories', reverse('gallery:category-list'), {}),
+        ('gallery categories with count', reverse('gallery:categories-with-count'), {}),
+        ('gallery images', image_list, {}),
+        ('gallery images search', image_list, {'search': 'floor'}),
+        ('gallery images keyset', image_list, {'pagination': 'keyset'}),
+        ('featured gallery images', reverse('gallery:featured-images'), {}),
+        ('contact info', reverse('contact:contact-info'), {}),
+        ('bootstrap', reverse('bootstrap'), {}),
+    ]
+    if category:
+        endpoints.append(('products by category', product_list, {'category': category.pk}))
+    if product:
+        endpoints.append(('product detail', reverse('products:product-detail', args=[product.slug]), {}))
+    if gallery_category:
+        endpoints.append(('gallery images by category', image_list, {'category': gallery_category.pk}))
+    if gallery_image:
+        endpoints.append(('gallery image detail', reverse('gallery:image-detail', args=[gallery_image.pk]), {}))
+    return endpoints
+
+
+def request_host():
+    """A host name that passes ``ALLOWED_HOSTS`` for in-process requests"""
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip('.')
+        if host and host != '*':
+            return host
+    return 'localhost'
@@ -0,0 +1,108 @@
+"""
+Sparse fieldsets and expansion for the catalog API.
+
+    /api/products/?fields=id,name,slug,image_url,price
+    /api/gallery/images/?fields=id,title,image_srcset&expand=category
+
+``?fields=`` limits the response to the listed top-level fields; ``?expand=``
+renders a related object in place of its id. The queryset follows the
+fieldset: it loads only the columns the requested fields read (``only()``),
+joins only the relations they traverse and runs only the prefetches they
+render, so a card list skips the additional-image and tag queries entirely.
+Without either parameter responses are unchanged.
+"""
+
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+
+
+def parse_list(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Render only ``context['fields']`` (when set) and nest the
+    ``expandable_fields`` named in ``context['expand']``.
+
+    ``field_sources`` lists the ORM paths a field reads when its ``source``
+    does not say (method fields, reverse relations); ``Prefetch`` objects in
+    the list are prefetched rather than loaded as columns.
+    """
+
+    field_sources = {}
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested:
+            fields = {name: field for name, field in fields.items() if name in requested}
+        for name in self.context.get('expand', ()):
+            if name in fields:
+                fields[name] = self.expandable_fields[name](read_only=True)
+        return fields
+
+    @classmethod
+    def queryset_for(cls, queryset, fields=None, expand=(), always_load=()):
+        """``queryset`` reduced to the columns, joins and prefetches that ``fields``/``expand`` render"""
+        declared = cls().fields
+        columns = {queryset.model._meta.pk.name, *always_load}
+        joins = {path.rsplit('__', 1)[0] for path in always_load if '__' in path}
+        prefetches = []
+        for name in fields or declared:
+            if name in expand:
+                nested = cls.expandable_fields[name]().fields.values()
+                columns.update(f"{name}__{field.source.replace('.', '__')}" for field in nested)
+                joins.add(name)
+                continue
+            for path in cls.field_sources.get(name, [declared[name].source.replace('.', '__')]):
+                if isinstance(path, Prefetch):
+                    prefetches.append(path)
+                    continue
+                columns.add(path)
+                if '__' in path:
+                    joins.add(path.rsplit('__', 1)[0])
+        queryset = queryset.select_related(None).prefetch_related(None).only(*columns)
+        if joins:
+            # select_related() without arguments would follow every relation
+            queryset = queryset.select_related(*joins)
+        return queryset.prefetch_related(*prefetches)
+
+
+class SparseFieldsetMixin:
+    """Read ``?fields=``/``?expand=`` for a generic view's serializer and trim its queryset to match"""
+
+    def get_fieldset(self):
+        """``(fields, expand)``; ``fields`` is None when the response is not limited"""
+        if not hasattr(self, '_fieldset'):
+            serializer_class = self.get_serializer_class()
+            fields = parse_list(self.request.query_params.get('fields'))
+            expand = parse_list(self.request.query_params.get('expand'))
+
+            errors = {}
+            known = serializer_class().fields
+            unknown = [name for name in fields if name not in known]
+            if unknown:
+                errors['fields'] = [f"Unknown field '{name}'." for name in unknown]
+            unexpandable = [name for name in expand if name not in serializer_class.expandable_fields]
+            if unexpandable:
+                errors['expand'] = [f"Field '{name}' cannot be expanded." for name in unexpandable]
+            if errors:
+                raise ValidationError(errors)
+            self._fieldset = (set(fields) or None, set(expand))
+        return self._fieldset
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = self.get_fieldset()
+        if fields is None and not expand:
+            return queryset
+        # Keyset cursors are built from the last row's ordering columns
+        always_load = [name.lstrip('-') for name in getattr(self, 'keyset_ordering', ())]
+        return self.get_serializer_class().queryset_for(queryset, fields, expand, always_load)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['expand'] = self.get_fieldset()
+        return context
@@ -0,0 +1,60 @@
+"""
+Gunicorn hooks used by the benchmark management commands.
+
+``BENCHMARK_DB_LATENCY_MS`` adds a fixed delay to every SQL statement a worker
+runs, standing in for the round trip to a remote database (Neon) when the
+benchmark runs against a local one. ``BENCHMARK_CONNECT_LATENCY_MS`` does the
+same for every new PostgreSQL connection (the TLS handshake and login).
+``BENCHMARK_URLCONF`` and ``BENCHMARK_MEDIA_ROOT`` swap in a benchmark-only
+URLconf and media directory. The production hooks (gunicorn_config.py) run
+afterwards, so pools are prewarmed as they would be in production.
+"""
+
+import os
+import time
+
+from sundar_marbles import gunicorn_config
+
+pre_fork = gunicorn_config.pre_fork
+worker_exit = gunicorn_config.worker_exit
+
+
+def post_worker_init(worker):
+    from django.conf import settings
+
+    if os.environ.get('BENCHMARK_MEDIA_ROOT'):
+        settings.MEDIA_ROOT = os.environ['BENCHMARK_MEDIA_ROOT']
+    if os.environ.get('BENCHMARK_URLCONF'):
+        settings.ROOT_URLCONF = os.environ['BENCHMARK_URLCONF']
+
+    latency = float(os.environ.get('BENCHMARK_DB_LATENCY_MS') or 0) / 1000
+    if latency:
+        from django.db.backends.signals import connection_created
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_delay(sender, connection, **kwargs):
+            # Sent again whenever the same wrapper reconnects
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        connection_created.connect(add_delay, weak=False)
+
+    connect_latency = float(os.environ.get('BENCHMARK_CONNECT_LATENCY_MS') or 0) / 1000
+    if connect_latency:
+        import psycopg
+
+        connect = psycopg.Connection.connect.__func__
+
+        @classmethod
+        def slow_connect(cls, *args, **kwargs):
+            time.sleep(connect_latency)
+            return connect(cls, *args, **kwargs)
+
+        # Django connects through psycopg.connect, the pool through Connection.connect
+        psycopg.Connection.connect = slow_connect
+        psycopg.connect = psycopg.Connection.connect
+
+    gunicorn_config.post_worker_init(worker)
@@ -0,0 +1,38 @@
+"""
+Gunicorn hooks for production (``--config python:sundar_marbles.gunicorn_config`` in startup.sh).
+
+Each worker opens its database connection pool as soon as it boots, so its
+first requests don't wait for connections to Neon, checks idle connections
+in the background and closes the pool when it exits. Anything the
+``--preload`` master opened while importing the app (azure_wsgi checks the
+database) is closed before forking. See db_pool.py.
+"""
+
+
+def pre_fork(server, worker):
+    from django.apps import apps
+
+    if not apps.ready:
+        # The app is not loaded in the master without --preload
+        return
+    from django.db import connections
+
+    from sundar_marbles.db_pool import close_pools
+
+    connections.close_all()
+    close_pools()
+
+
+def post_worker_init(worker):
+    from django.conf import settings
+
+    from sundar_marbles.db_pool import prewarm_pools, start_health_checks
+
+    prewarm_pools()
+    start_health_checks(getattr(settings, 'DATABASE_POOL_CHECK_INTERVAL', 0))
+
+
+def worker_exit(server, worker):
+    from sundar_marbles.db_pool import close_pools
+
+    close_pools()
@@ -0,0 +1,145 @@
+"""
+Production serving of media kept on local disk (no Azure credentials).
+
+``django.conf.urls.static.static()`` only routes MEDIA_URL when DEBUG is on,
+and ``django.views.static.serve`` knows neither byte ranges nor caching.
+``serve_media`` answers:
+
+* conditional requests (``If-None-Match`` / ``If-Modified-Since``) with 304,
+* single ``Range: bytes=`` requests with 206, honouring ``If-Range``,
+* content-addressed names (see storage.py) with
+  ``Cache-Control: public, max-age=31536000, immutable``; other names with
+  a short max-age, since they may be overwritten in place.
+
+Bodies are ``FileResponse`` objects over the open file, so gunicorn hands them
+to ``sendfile()`` (ranges included: it starts at the file offset and stops at
+Content-Length) instead of copying them through Python.
+"""
+
+import os
+import re
+import stat
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .storage import is_content_addressed
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MUTABLE_CACHE_CONTROL = 'public, max-age=3600'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """``length`` bytes of an open file from its current offset, still exposing ``fileno()`` for sendfile"""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    ``(start, length)`` for a single byte range, or None to send the whole file.
+    Raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        # Malformed or multi-range requests may be answered with the full file
+        return None
+    first, last = match.groups()
+    if not first:
+        suffix = int(last)
+        if not suffix:
+            raise ValueError(header)
+        start = max(size - suffix, 0)
+        return start, size - start
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+def if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def file_response(request, full_path, size, etag, last_modified):
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    source = open(full_path, 'rb')
+    if byte_range is None:
+        return FileResponse(source)
+    start, length = byte_range
+    source.seek(start)
+    response = FileResponse(FileRange(source, length), status=206)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stats = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Media file not found')
+    if not stat.S_ISREG(stats.st_mode):
+        raise Http404('Media file not found')
+
+    etag = f'"{stats.st_size:x}-{stats.st_mtime_ns:x}"'
+    last_modified = int(stats.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = file_response(request, full_path, stats.st_size, etag, last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if is_content_addressed(path) else MUTABLE_CACHE_CONTROL
+    return response
+
+
+def media_urlpatterns():
+    """Route MEDIA_URL to ``serve_media`` unless media lives on another host (Azure)"""
+    if urlsplit(settings.MEDIA_URL).netloc:
+        return []
+    prefix = re.escape(settings.MEDIA_URL.lstrip('/'))
+    return [re_path(rf'^{prefix}(?P<path>.*)$', serve_media, name='media')]
@@ -0,0 +1,175 @@
+"""
+Pagination classes for the catalog API.
+
+``CatalogPagination`` keeps the page-number contract by default
+(``?page=3`` -> ``count``/``next``/``previous``/``results``). Views that
+declare a ``keyset_ordering`` also accept ``?pagination=keyset``, which
+switches to keyset pages: no OFFSET and no COUNT(*). The response then
+only has ``next`` (carrying an opaque ``cursor``) and ``results``. Keyset
+pages always follow ``keyset_ordering``, so ``?ordering=`` and ``?search=``
+are rejected with a 400 in that mode.
+Async views call ``apaginate_queryset``, which fetches the same page with
+``aiterator()``.
+"""
+
+import base64
+import json
+
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KnownCountPaginator(Paginator):
+    """Paginator that trusts a row count already computed during the request.
+
+    Views set ``known_count`` on the queryset (see ``ConditionalGetMixin``) so the
+    page does not cost a second ``COUNT(*)`` round trip.
+    """
+
+    @cached_property
+    def count(self):
+        known_count = getattr(self.object_list, 'known_count', None)
+        if known_count is not None:
+            return known_count
+        return super().count
+
+
+class CatalogPagination(PageNumberPagination):
+    django_paginator_class = KnownCountPaginator
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    # Params that reorder the list, which a cursor over keyset_ordering can't follow
+    keyset_conflicting_params = (api_settings.ORDERING_PARAM, api_settings.SEARCH_PARAM)
+
+    def is_keyset_request(self, request, view):
+        if not getattr(view, 'keyset_ordering', None):
+            return False
+        params = request.query_params
+        return params.get(self.mode_query_param) == 'keyset' or self.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.is_keyset_request(request, view)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_keyset(queryset, request, view.keyset_ordering)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views: the page is fetched with ``aiterator()``"""
+        self.request = request
+        self.keyset = self.is_keyset_request(request, view)
+        if self.keyset:
+            queryset, page_size = self.keyset_queryset(queryset, request, view.keyset_ordering)
+            rows = [row async for row in queryset[:page_size + 1].aiterator(chunk_size=page_size + 1)]
+            return self.keyset_page(rows, page_size)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        if getattr(queryset, 'known_count', None) is None:
+            queryset.known_count = await queryset.acount()
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [
+            row async for row in self.page.object_list.aiterator(chunk_size=page_size)
+        ]
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_keyset_link(),
+            'results': data,
+        })
+
+    # Keyset mode
+
+    def paginate_keyset(self, queryset, request, ordering):
+        queryset, page_size = self.keyset_queryset(queryset, request, ordering)
+        return self.keyset_page(list(queryset[:page_size + 1]), page_size)
+
+    def keyset_queryset(self, queryset, request, ordering):
+        """The ordered queryset positioned after the cursor, and the page size"""
+        self.request = request
+        conflicting = [name for name in self.keyset_conflicting_params if request.query_params.get(name)]
+        if conflicting:
+            raise ValidationError({
+                self.mode_query_param: [
+                    f"Keyset pages can't be combined with ?{name}=; use ?page= instead." for name in conflicting
+                ],
+            })
+        self.ordering = [
+            (*self.resolve_ordering(queryset.model, name.lstrip('-')), name.startswith('-'))
+            for name in ordering
+        ]
+        queryset = queryset.order_by(*ordering)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after_position(position))
+        return queryset, self.get_page_size(request)
+
+    def keyset_page(self, rows, page_size):
+        """Trim the ``page_size + 1`` fetched ``rows`` to a page and remember the next cursor"""
+        self.next_position = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            self.next_position = []
+            for _, field, relations, _ in self.ordering:
+                instance = last
+                for relation in relations:
+                    instance = getattr(instance, relation)
+                self.next_position.append(field.value_to_string(instance))
+        return rows
+
+    def resolve_ordering(self, model, name):
+        """``(lookup, field, relations)`` for an ordering name such as ``category__order``"""
+        *relations, column = name.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        field = model._meta.get_field(column)
+        return '__'.join([*relations, field.attname]), field, relations
+
+    def after_position(self, position):
+        """Rows strictly after ``position`` in the (mixed direction) ordering"""
+        condition = Q()
+        equal_so_far = {}
+        for (lookup, _, _, descending), value in zip(self.ordering, position):
+            comparison = 'lt' if descending else 'gt'
+            condition |= Q(**equal_so_far, **{f'{lookup}__{comparison}': value})
+            equal_so_far[lookup] = value
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(raw, list) or len(raw) != len(self.ordering):
+                raise ValueError
+            return [field.to_python(value) for (_, field, _, _), value in zip(self.ordering, raw)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    def get_next_keyset_link(self):
+        if self.next_position is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
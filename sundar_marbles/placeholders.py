@@ -0,0 +1,118 @@
+"""
+Layout and placeholder metadata for product and gallery images.
+
+Computed once per image version by the derivatives task (derivatives.py),
+from the same decoded image as the renditions, and stored on the model so the
+API can send it with every image URL:
+
+    image_width, image_height   pixels after EXIF rotation, to reserve layout space
+    image_bytes                 size of the original file
+    image_color                 dominant colour as '#rrggbb', for a solid placeholder
+    image_blurhash              BlurHash (https://blurha.sh) string, ~28 characters
+
+Rows saved before these fields existed are filled by
+``manage.py backfill_image_metadata``.
+"""
+
+import math
+
+from PIL import Image
+
+METADATA_FIELDS = ('image_width', 'image_height', 'image_bytes', 'image_color', 'image_blurhash')
+EMPTY_METADATA = {
+    'image_width': None,
+    'image_height': None,
+    'image_bytes': None,
+    'image_color': '',
+    'image_blurhash': '',
+}
+
+BLURHASH_COMPONENTS = (4, 3)
+BLURHASH_SAMPLE_SIZE = 32
+BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+
+def image_metadata(field_file, image):
+    """Metadata for ``field_file`` given its decoded RGB ``image``"""
+    return {
+        'image_width': image.width,
+        'image_height': image.height,
+        'image_bytes': field_file.size,
+        'image_color': dominant_color(image),
+        'image_blurhash': blurhash(image),
+    }
+
+
+def dominant_color(image):
+    """Most common colour of a 5-colour median-cut palette, as ``#rrggbb``"""
+    palette_image = image.resize((64, 64)).quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+    _, index = max(palette_image.getcolors())
+    red, green, blue = palette_image.getpalette()[index * 3:index * 3 + 3]
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def _encode83(value, length):
+    return ''.join(BASE83[(value // 83 ** (length - position)) % 83] for position in range(1, length + 1))
+
+
+def _srgb_to_linear(value):
+    value /= 255
+    return value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value):
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value, exponent):
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def blurhash(image, components=BLURHASH_COMPONENTS):
+    """Encode ``image`` as a BlurHash; it is downsampled first, which does not change the result visibly"""
+    x_components, y_components = components
+    sample = image.resize((BLURHASH_SAMPLE_SIZE, BLURHASH_SAMPLE_SIZE), Image.BILINEAR)
+    width, height = sample.size
+    to_linear = [_srgb_to_linear(value) for value in range(256)]
+    pixels = [tuple(to_linear[channel] for channel in pixel) for pixel in sample.getdata()]
+
+    factors = []
+    for j in range(y_components):
+        cos_y = [math.cos(math.pi * j * y / height) for y in range(height)]
+        for i in range(x_components):
+            cos_x = [math.cos(math.pi * i * x / width) for x in range(width)]
+            normalisation = 1 if i == 0 and j == 0 else 2
+            red = green = blue = 0.0
+            for y in range(height):
+                row = pixels[y * width:(y + 1) * width]
+                for x, (r, g, b) in enumerate(row):
+                    basis = cos_x[x] * cos_y[y]
+                    red += basis * r
+                    green += basis * g
+                    blue += basis * b
+            scale = normalisation / (width * height)
+            factors.append((red * scale, green * scale, blue * scale))
+
+    dc, ac = factors[0], factors[1:]
+    encoded = _encode83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        actual_maximum = max(abs(value) for factor in ac for value in factor)
+        quantised_maximum = max(0, min(82, int(math.floor(actual_maximum * 166 - 0.5))))
+        maximum = (quantised_maximum + 1) / 166
+        encoded += _encode83(quantised_maximum, 1)
+    else:
+        maximum = 1
+        encoded += _encode83(0, 1)
+
+    encoded += _encode83(
+        (_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4
+    )
+    for factor in ac:
+        red, green, blue = (
+            max(0, min(18, int(math.floor(_sign_pow(value / maximum, 0.5) * 9 + 9.5)))) for value in factor
+        )
+        encoded += _encode83(red * 19 * 19 + green * 19 + blue, 2)
+    return encoded
@@ -0,0 +1,161 @@
+"""
+Query guardrails for the API.
+
+``QueryGuardMiddleware`` records the SQL of each API request, normalized into
+fingerprints (literals and parameters become ``?``, ``IN`` lists ``(...)``),
+and flags two problems:
+
+* an N+1: one fingerprint repeated ``QUERY_REPEAT_THRESHOLD`` times or more,
+  the signature of a query run once per row,
+* a view running more queries than its budget. Class-based views declare
+  ``query_budget = 3``; function views use ``@query_budget(3)``.
+
+What happens next depends on ``QUERY_GUARD``:
+
+    raise   raise QueryGuardError (DEBUG and tests; the test client re-raises it)
+    log     log a JSON report on the ``sundar_marbles.queryguard`` logger for
+            a ``QUERY_GUARD_SAMPLE_RATE`` share of requests (production)
+    off     do nothing
+
+Logged reports are also kept in memory per process and shown, with a fresh
+query profile of every public endpoint, by the ``debug/database/`` view.
+Transaction control statements (savepoints) are not counted.
+"""
+
+import json
+import logging
+import random
+import re
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?")
+PARAMETER_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE_RE = re.compile(r'\s+')
+TRANSACTION_RE = re.compile(r'\s*(?:SAVEPOINT|RELEASE|ROLLBACK|BEGIN|COMMIT)\b', re.IGNORECASE)
+
+RECENT_REPORTS = deque(maxlen=50)
+
+_collector = ContextVar('query_guard_collector', default=None)
+
+
+class QueryGuardError(Exception):
+    pass
+
+
+def fingerprint(sql):
+    """``sql`` with its values replaced, so the same query with other arguments compares equal"""
+    sql = LITERAL_RE.sub('?', sql)
+    sql = PARAMETER_LIST_RE.sub('(...)', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def query_budget(limit):
+    """Declare the most queries a function view may run"""
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+    return decorator
+
+
+def budget_for(view_func):
+    """The declared budget of a resolved view function, or None"""
+    if hasattr(view_func, 'query_budget'):
+        return view_func.query_budget
+    view_class = getattr(view_func, 'view_class', None)
+    # An AsyncCatalogView answers with the budget of the DRF view it serves
+    view_class = getattr(view_class, 'drf_view', None) or view_class
+    return getattr(view_class, 'query_budget', None)
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that counts queries per fingerprint"""
+
+    def __init__(self):
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if not TRANSACTION_RE.match(sql):
+            self.fingerprints[fingerprint(sql)] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self):
+        return sum(self.fingerprints.values())
+
+    def report(self, request, budget=None):
+        threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', 3)
+        match = request.resolver_match
+        return {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'queries': self.count,
+            'budget': budget,
+            'over_budget': budget is not None and self.count > budget,
+            'repeated': [
+                {'fingerprint': sql, 'count': count}
+                for sql, count in self.fingerprints.most_common()
+                if count >= threshold
+            ],
+        }
+
+
+def has_problems(report):
+    return report['over_budget'] or bool(report['repeated'])
+
+
+def describe(report):
+    problems = []
+    if report['over_budget']:
+        problems.append(f"{report['queries']} queries, budget {report['budget']}")
+    for repeated in report['repeated']:
+        problems.append(f"N+1: {repeated['count']} x {repeated['fingerprint']}")
+    return f"{report['method']} {report['path']} ({report['view']}): " + '; '.join(problems)
+
+
+@contextmanager
+def collecting():
+    """Collect the reports of every guarded request made inside the block, without raising or logging"""
+    reports = []
+    token = _collector.set(reports)
+    try:
+        yield reports
+    finally:
+        _collector.reset(token)
+
+
+class QueryGuardMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = getattr(settings, 'QUERY_GUARD', 'off')
+        collector = _collector.get()
+        prefixes = tuple(getattr(settings, 'QUERY_GUARD_PATHS', ('/api/',)))
+        if (mode == 'off' and collector is None) or not request.path.startswith(prefixes):
+            return self.get_response(request)
+        if mode == 'log' and collector is None:
+            if random.random() >= getattr(settings, 'QUERY_GUARD_SAMPLE_RATE', 1.0):
+                return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        report = recorder.report(request, budget_for(match.func) if match else None)
+        if collector is not None:
+            collector.append(report)
+        elif has_problems(report):
+            if mode == 'raise':
+                raise QueryGuardError(describe(report))
+            RECENT_REPORTS.append(report)
+            logger.warning(json.dumps(report))
+        return response
@@ -0,0 +1,138 @@
+"""
+Full-text search for products and gallery images.
+
+Searchable models declare ``search_weights`` (field name -> weight 'A'..'D').
+
+PostgreSQL
+    A stored, GIN-indexed ``search_vector`` tsvector column, matched with a
+    ``websearch`` query and ordered by ``SearchRank``.
+SQLite
+    An FTS5 shadow table per model (``<db_table>_fts``, rowid = primary key),
+    matched with ``MATCH`` and ordered by ``bm25()``, so tests run offline.
+
+Both are kept current from post_save/post_delete through
+``update_search_index`` and ``remove_from_search_index``; bulk writes must
+call ``update_search_index`` themselves.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, router
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+SEARCH_CONFIG = 'english'
+
+# bm25() column weights standing in for Postgres' A-D weights
+BM25_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+
+
+def fts_table(model):
+    return f"{model._meta.db_table}_fts"
+
+
+def search_vector(model):
+    vector = None
+    for field, weight in model.search_weights.items():
+        part = SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def _connection(model):
+    return connections[router.db_for_write(model)]
+
+
+def update_search_index(model, pks=None):
+    """Refresh indexed text for ``pks`` (or every row) of ``model``"""
+    connection = _connection(model)
+    queryset = model._default_manager.using(connection.alias)
+    if pks is not None:
+        queryset = queryset.filter(pk__in=list(pks))
+
+    if connection.vendor == 'postgresql':
+        queryset.update(search_vector=search_vector(model))
+    elif connection.vendor == 'sqlite':
+        fields = list(model.search_weights)
+        rows = list(queryset.values_list('pk', *fields))
+        table = fts_table(model)
+        with connection.cursor() as cursor:
+            if pks is None:
+                cursor.execute(f'DELETE FROM "{table}"')
+            else:
+                cursor.executemany(f'DELETE FROM "{table}" WHERE rowid = %s', [(pk,) for pk in pks])
+            placeholders = ', '.join(['%s'] * (len(fields) + 1))
+            cursor.executemany(
+                f'INSERT INTO "{table}" (rowid, {", ".join(fields)}) VALUES ({placeholders})',
+                [tuple('' if value is None else value for value in row) for row in rows],
+            )
+
+
+def remove_from_search_index(model, pk):
+    connection = _connection(model)
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{fts_table(model)}" WHERE rowid = %s', [pk])
+
+
+def _fts5_query(term):
+    # Quote every word so user input cannot inject FTS5 operators
+    words = re.findall(r'\w+', term)
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def ranked_search(queryset, term):
+    """Filter ``queryset`` to rows matching ``term`` annotated with ``search_rank``"""
+    model = queryset.model
+    connection = connections[queryset.db]
+
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(term, search_type='websearch', config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        )
+
+    if connection.vendor == 'sqlite':
+        match = _fts5_query(term)
+        if not match:
+            return queryset.none()
+        table = fts_table(model)
+        weights = ', '.join(str(BM25_WEIGHTS[weight]) for weight in model.search_weights.values())
+        pk_column = f'"{model._meta.db_table}"."{model._meta.pk.column}"'
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM "{table}" WHERE "{table}" MATCH %s', [match])
+        ).annotate(
+            # bm25() is lower-is-better; negate it so both vendors sort rank descending
+            search_rank=RawSQL(
+                f'SELECT -bm25("{table}", {weights}) FROM "{table}" '
+                f'WHERE "{table}" MATCH %s AND rowid = {pk_column}',
+                [match],
+            )
+        )
+
+    # Other backends: unranked substring match over the searchable fields
+    condition = Q()
+    for field in model.search_weights:
+        condition |= Q(**{f'{field}__icontains': term})
+    return queryset.filter(condition)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """``?search=`` backed by ``ranked_search``.
+
+    List it after ``OrderingFilter``: unless the client passed ``?ordering=``,
+    results are ordered by rank with the view's ordering as tie-breaker.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        if not term:
+            return queryset
+        queryset = ranked_search(queryset, term)
+        if 'search_rank' not in queryset.query.annotations:
+            return queryset
+        if filters.OrderingFilter.ordering_param in request.query_params:
+            return queryset
+        return queryset.order_by('-search_rank', *queryset.query.order_by)
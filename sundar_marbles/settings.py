@@ -59,6 +59,8 @@ except Exception:
     pass
 
 MIDDLEWARE = [
+    'sundar_marbles.timing.RequestTimingMiddleware',
+    'sundar_marbles.queryguard.QueryGuardMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -232,11 +234,93 @@ except Exception as e:
     MEDIA_ROOT = BASE_DIR / 'media'
     print(f"[WARNING] Using local media storage: {MEDIA_URL}")
 
+# Content-addressed media (sundar_marbles/storage.py): uploads are stored as
+# <upload_to>/<sha256><ext>, identical bytes are never uploaded twice and a name
+# never changes content, so blob URLs can be cached forever
+CONTENT_ADDRESSED_MEDIA = config('CONTENT_ADDRESSED_MEDIA', default=True, cast=bool)
+if CONTENT_ADDRESSED_MEDIA:
+    STORAGES["default"] = {
+        "BACKEND": "sundar_marbles.storage.ContentAddressedStorage",
+        "OPTIONS": {"backend": STORAGES["default"]["BACKEND"]},
+    }
+    AZURE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+    # Hashed names never need overwriting, and AzureStorage.exists() always
+    # answers False while overwriting is on
+    AZURE_OVERWRITE_FILES = False
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache configuration
+# Redis when REDIS_URL is set, otherwise a per-process locmem cache. The locmem
+# cache is not shared between gunicorn workers, so invalidation only reaches the
+# worker that handled the save; keep its timeout short.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'sundar-marbles',
+        }
+    }
+
+# Public catalog API response cache (see sundar_marbles/cache.py)
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=600 if REDIS_URL else 60, cast=int)
+
+# Celery task queue (see sundar_marbles/celery.py)
+# Redis is used when REDIS_URL is set. Without Redis, CELERY_BROKER_URL=filesystem://
+# runs tasks through kombu's filesystem transport on a single host. With no broker
+# configured at all, tasks run inline in the calling process (also used by tests).
+# settings_production always queues them.
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=REDIS_URL or 'filesystem://')
+CELERY_TASK_ALWAYS_EAGER = config(
+    'CELERY_TASK_ALWAYS_EAGER',
+    default=not (REDIS_URL or config('CELERY_BROKER_URL', default='')),
+    cast=bool,
+)
+if CELERY_BROKER_URL.startswith('filesystem://'):
+    CELERY_BROKER_DIR = BASE_DIR / 'celery_broker'
+    CELERY_BROKER_TRANSPORT_OPTIONS = {
+        'data_folder_in': str(CELERY_BROKER_DIR / 'queue'),
+        'data_folder_out': str(CELERY_BROKER_DIR / 'queue'),
+        'processed_folder': str(CELERY_BROKER_DIR / 'processed'),
+        'control_folder': str(CELERY_BROKER_DIR / 'control'),
+        'store_processed': False,
+    }
+    if not CELERY_TASK_ALWAYS_EAGER:
+        for folder in ('queue', 'processed', 'control'):
+            os.makedirs(CELERY_BROKER_DIR / folder, exist_ok=True)
+CELERY_IMPORTS = ('sundar_marbles.tasks',)
+CELERY_TASK_IGNORE_RESULT = True
+# Re-deliver tasks whose worker died mid-run instead of losing them
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+
+# Route catalog list/detail URLs to the async views (see sundar_marbles/async_views.py).
+# Pair with an ASGI worker: gunicorn sundar_marbles.asgi:application -k uvicorn.workers.UvicornWorker
+ASYNC_CATALOG_VIEWS = config('ASYNC_CATALOG_VIEWS', default=False, cast=bool)
+
+# Server-Timing header and JSON timing log line for a share of requests (see sundar_marbles/timing.py)
+REQUEST_TIMING_SAMPLE_RATE = config('REQUEST_TIMING_SAMPLE_RATE', default=1.0, cast=float)
+REQUEST_TIMING_HEADER = config('REQUEST_TIMING_HEADER', default=True, cast=bool)
+
+# N+1 detection and per-view query budgets for API requests (see sundar_marbles/queryguard.py)
+QUERY_GUARD = config('QUERY_GUARD', default='raise' if DEBUG else 'log')
+QUERY_GUARD_SAMPLE_RATE = config('QUERY_GUARD_SAMPLE_RATE', default=1.0, cast=float)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=3, cast=int)
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -245,7 +329,7 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'sundar_marbles.pagination.CatalogPagination',
     'PAGE_SIZE': 8  # Changed from 20 to 8 for better initial loading performance
 }
 
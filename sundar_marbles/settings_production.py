@@ -8,6 +8,8 @@ import dj_database_url
 from decouple import config
 from pathlib import Path
 
+from sundar_marbles.db_pool import keepalive_options, pool_options
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'sundar_marbles.timing.RequestTimingMiddleware',
+    'sundar_marbles.queryguard.QueryGuardMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -79,6 +83,24 @@ DATABASES = {
     'default': dj_database_url.parse(config('DATABASE_URL'))
 }
 
+# Connection pooling (see sundar_marbles/db_pool.py). Every gunicorn worker
+# keeps its connections to Neon open in a psycopg pool sized to the requests
+# it serves at once, instead of a new TLS connection per request.
+# DATABASE_POOL=False goes back to connecting per request.
+DATABASE_POOL = config('DATABASE_POOL', default=True, cast=bool)
+GUNICORN_THREADS = config('GUNICORN_THREADS', default=1, cast=int)
+# Seconds between checks of idle pooled connections; 0 turns them off. The
+# check is a query, so it keeps an otherwise idle Neon compute awake.
+DATABASE_POOL_CHECK_INTERVAL = config('DATABASE_POOL_CHECK_INTERVAL', default=300, cast=float)
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default'].setdefault('OPTIONS', {}).update(keepalive_options())
+    if DATABASE_POOL:
+        DATABASES['default']['OPTIONS']['pool'] = pool_options(
+            threads=GUNICORN_THREADS,
+            asgi=config('ASYNC_CATALOG_VIEWS', default=False, cast=bool),
+            max_size=config('DATABASE_POOL_MAX_SIZE', default=0, cast=int) or None,
+        )
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -194,9 +216,98 @@ except Exception as e:
     MEDIA_ROOT = BASE_DIR / 'media'
     print(f"[FALLBACK] Falling back to local media storage: {MEDIA_URL}")
 
+# Content-addressed media (sundar_marbles/storage.py): uploads are stored as
+# <upload_to>/<sha256><ext>, identical bytes are never uploaded twice and a name
+# never changes content, so blob URLs can be cached forever
+CONTENT_ADDRESSED_MEDIA = config('CONTENT_ADDRESSED_MEDIA', default=True, cast=bool)
+if CONTENT_ADDRESSED_MEDIA:
+    STORAGES["default"] = {
+        "BACKEND": "sundar_marbles.storage.ContentAddressedStorage",
+        "OPTIONS": {"backend": STORAGES["default"]["BACKEND"]},
+    }
+    AZURE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+    # Hashed names never need overwriting, and AzureStorage.exists() always
+    # answers False while overwriting is on
+    AZURE_OVERWRITE_FILES = False
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache configuration
+# Redis when REDIS_URL is set, otherwise a per-process locmem cache. The locmem
+# cache is not shared between gunicorn workers, so invalidation only reaches the
+# worker that handled the save; keep its timeout short.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'sundar-marbles',
+        }
+    }
+
+# Public catalog API response cache (see sundar_marbles/cache.py)
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=600 if REDIS_URL else 60, cast=int)
+
+# Celery task queue (see sundar_marbles/celery.py)
+# Redis is used when REDIS_URL is set. Without Redis, tasks go through kombu's
+# filesystem transport to the worker startup.sh runs on the same host, so SMTP
+# and image work never hold up a request. CELERY_TASK_ALWAYS_EAGER=True runs
+# them inline instead, for debugging only.
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=REDIS_URL or 'filesystem://')
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+if CELERY_BROKER_URL.startswith('filesystem://'):
+    CELERY_BROKER_DIR = BASE_DIR / 'celery_broker'
+    CELERY_BROKER_TRANSPORT_OPTIONS = {
+        'data_folder_in': str(CELERY_BROKER_DIR / 'queue'),
+        'data_folder_out': str(CELERY_BROKER_DIR / 'queue'),
+        'processed_folder': str(CELERY_BROKER_DIR / 'processed'),
+        'control_folder': str(CELERY_BROKER_DIR / 'control'),
+        'store_processed': False,
+    }
+    if not CELERY_TASK_ALWAYS_EAGER:
+        for folder in ('queue', 'processed', 'control'):
+            os.makedirs(CELERY_BROKER_DIR / folder, exist_ok=True)
+CELERY_IMPORTS = ('sundar_marbles.tasks',)
+CELERY_TASK_IGNORE_RESULT = True
+# Re-deliver tasks whose worker died mid-run instead of losing them
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+
+# Route catalog list/detail URLs to the async views (see sundar_marbles/async_views.py).
+# Pair with an ASGI worker: gunicorn sundar_marbles.asgi:application -k uvicorn.workers.UvicornWorker
+ASYNC_CATALOG_VIEWS = config('ASYNC_CATALOG_VIEWS', default=False, cast=bool)
+
+# Server-Timing header and JSON timing log line for a share of requests (see sundar_marbles/timing.py)
+REQUEST_TIMING_SAMPLE_RATE = config('REQUEST_TIMING_SAMPLE_RATE', default=0.1, cast=float)
+REQUEST_TIMING_HEADER = config('REQUEST_TIMING_HEADER', default=True, cast=bool)
+
+# N+1 detection and per-view query budgets for API requests (see sundar_marbles/queryguard.py)
+QUERY_GUARD = config('QUERY_GUARD', default='log')
+QUERY_GUARD_SAMPLE_RATE = config('QUERY_GUARD_SAMPLE_RATE', default=0.1, cast=float)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=3, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'sundar_marbles': {'handlers': ['console'], 'level': config('APP_LOG_LEVEL', default='INFO')},
+    },
+}
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -205,7 +316,7 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'sundar_marbles.pagination.CatalogPagination',
     'PAGE_SIZE': 8  # Changed from 20 to 8 for better initial loading performance
 }
 
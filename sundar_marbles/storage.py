@@ -0,0 +1,161 @@
+"""
+Content-addressed media storage.
+
+``ContentAddressedStorage`` wraps the configured media backend (Azure Blob
+Storage or the local filesystem) and stores every saved file as
+``<upload_to>/<sha256><ext>``:
+
+* identical bytes are uploaded once per directory; saving them again costs
+  an existence check instead of a transfer,
+* a name always refers to the same content, so files are never clobbered and
+  their URLs can be cached forever (``Cache-Control: immutable``).
+
+Stored blobs are indexed in the ``products.MediaBlob`` table (name, hash,
+size). The backend, not the index, decides whether a blob exists: blobs can
+disappear outside the app (lifecycle rules, manual cleanup, a restored
+database), and a missing one is uploaded again. Since rows with identical
+images share one name, ``delete()`` leaves a blob alone while any file field
+or derivatives map still refers to it. Names saved before the wrapper was
+enabled keep working; reads are passed straight to the backend.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from django.apps import apps
+from django.core.files.storage import Storage
+from django.db.models import FileField, JSONField, Q, TextField
+from django.db.models.functions import Cast
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+from .timing import timed
+
+DEFAULT_BACKEND = 'django.core.files.storage.FileSystemStorage'
+CONTENT_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{64}(?:\.\w+)?$')
+
+
+def content_digest(content):
+    """SHA-256 hex digest of a Django ``File``, leaving it rewound"""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a local file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_name(name, digest):
+    """``products/slab.JPG`` + digest -> ``products/<digest>.jpg``"""
+    directory = os.path.dirname(name)
+    extension = os.path.splitext(name)[1].lower()
+    return f"{directory}/{digest}{extension}" if directory else f"{digest}{extension}"
+
+
+def is_content_addressed(name):
+    """True for names written by ``ContentAddressedStorage``, whose content never changes"""
+    return bool(CONTENT_NAME_RE.search(name))
+
+
+def is_referenced(name):
+    """True while a file field or ``*_derivatives`` map of any row still holds ``name``"""
+    for model in apps.get_models():
+        queryset, condition = model._default_manager.all(), Q()
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField):
+                condition |= Q(**{field.name: name})
+            elif isinstance(field, JSONField) and field.name.endswith('_derivatives'):
+                alias = f'{field.name}_text'
+                queryset = queryset.alias(**{alias: Cast(field.name, TextField())})
+                condition |= Q(**{f'{alias}__contains': json.dumps(name)})
+        if condition and queryset.filter(condition).exists():
+            return True
+    return False
+
+
+def blob_backend(storage):
+    """The storage that holds the bytes, for uploads made outside ``save()``"""
+    return storage.backend if isinstance(storage, ContentAddressedStorage) else storage
+
+
+@deconstructible(path='sundar_marbles.storage.ContentAddressedStorage')
+class ContentAddressedStorage(Storage):
+    """Name files by content hash and skip uploads of bytes already stored"""
+
+    def __init__(self, backend=DEFAULT_BACKEND, options=None):
+        self.backend_path = backend
+        self.backend = import_string(backend)(**(options or {}))
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content; collisions are identical files
+        return name
+
+    def _save(self, name, content):
+        digest = content_digest(content)
+        name = content_name(name, digest)
+        with timed('storage'):
+            if not self.backend.exists(name):
+                name = self.backend.save(name, content)
+        self.record(name, digest, content.size)
+        return name
+
+    def record(self, name, digest, size):
+        """Index a blob written straight to the backend (e.g. by a parallel upload)"""
+        from products.models import MediaBlob
+
+        MediaBlob.objects.get_or_create(name=name, defaults={'sha256': digest, 'size': size})
+
+    def delete(self, name):
+        from products.models import MediaBlob
+
+        if is_referenced(name):
+            # Rows with identical images share the hashed name
+            return
+        MediaBlob.objects.filter(name=name).delete()
+        with timed('storage'):
+            self.backend.delete(name)
+
+    # Everything else is the backend's business; calls that can reach Azure are timed
+
+    def _open(self, name, mode='rb'):
+        with timed('storage'):
+            return self.backend.open(name, mode)
+
+    def exists(self, name):
+        with timed('storage'):
+            return self.backend.exists(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def size(self, name):
+        with timed('storage'):
+            return self.backend.size(name)
+
+    def url(self, name):
+        with timed('storage'):
+            return self.backend.url(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def get_accessed_time(self, name):
+        return self.backend.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.backend.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
@@ -0,0 +1,38 @@
+"""
+Background tasks shared by the catalog apps.
+"""
+
+import logging
+
+from celery import shared_task
+from django.apps import apps
+from PIL import UnidentifiedImageError
+
+from .cache import invalidate_api_cache
+from .derivatives import refresh_derivatives
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    autoretry_for=(OSError,),
+    retry_backoff=True,
+    retry_backoff_max=300,
+    retry_jitter=True,
+    max_retries=5,
+)
+def generate_image_derivatives(model_label, pk):
+    """Render responsive renditions for one image row, e.g. ``('products.Product', 3)``"""
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    try:
+        changed = refresh_derivatives(instance)
+    except UnidentifiedImageError as exc:
+        # Not an image Pillow can read; retrying will not help
+        logger.warning("Could not generate derivatives for %s %s: %s", model_label, pk, exc)
+        return
+    if changed:
+        invalidate_api_cache()
+
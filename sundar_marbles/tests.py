@@ -0,0 +1,329 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import ResolverMatch, reverse
+
+from contact.models import ContactInfo
+from gallery.models import GalleryCategory, GalleryImage, GalleryImageTag, GalleryTag
+from products.models import Category, MediaBlob, Product
+from products.views import ProductListView
+from .cache import get_api_cache
+from .db_pool import close_pools, pool_options, prewarm_pools, start_health_checks
+from .endpoints import public_endpoints
+from .queryguard import RECENT_REPORTS, QueryGuardError, QueryGuardMiddleware, fingerprint, has_problems
+from .uploads import FileSystemBlockTarget, content_named, upload_files
+
+
+class CatalogBootstrapTests(TestCase):
+    """api/bootstrap/ bundles the homepage requests into one cached response"""
+
+    def setUp(self):
+        get_api_cache().clear()
+        self.url = reverse('bootstrap')
+        category = Category.objects.create(name='Marble')
+        for index in range(10):
+            Product.objects.create(
+                name=f'Product {index}', category=category, image='products/test.jpg',
+                price=Decimal('1000.00'), is_featured=True,
+            )
+        gallery_category = GalleryCategory.objects.create(name='Floors')
+        tag = GalleryTag.objects.create(name='Polished')
+        for index in range(3):
+            image = GalleryImage.objects.create(
+                title=f'Floor {index}', category=gallery_category,
+                image='gallery/floor.jpg', is_featured=True,
+            )
+            GalleryImageTag.objects.create(image=image, tag=tag)
+        self.contact = ContactInfo.objects.create(
+            address='Main Road', city='Lahore', primary_phone='123', email='info@example.com',
+        )
+
+    def test_matches_individual_endpoints(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['categories'], self.client.get(reverse('products:categories-with-count')).json())
+        self.assertEqual(
+            data['gallery_categories'], self.client.get(reverse('gallery:categories-with-count')).json()
+        )
+        self.assertEqual(data['featured_products'], self.client.get(reverse('products:featured-products')).json())
+        self.assertEqual(
+            data['featured_gallery_images'], self.client.get(reverse('gallery:featured-images')).json()
+        )
+        self.assertEqual(data['contact_info'], self.client.get(reverse('contact:contact-info')).json())
+
+    def test_uses_fixed_queries_and_caches(self):
+        # Products overflow one page: rows, count, additional images.
+        # Gallery images: rows, tags. Plus two category lists and contact info.
+        with self.assertNumQueries(8):
+            self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_contact_change_invalidates(self):
+        self.client.get(self.url)
+        self.contact.city = 'Karachi'
+        self.contact.save()
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['contact_info']['results'][0]['city'], 'Karachi')
+
+
+class MediaServingTests(TestCase):
+    """Local media is served with validators, byte ranges and long-lived caching"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.content = bytes(range(256)) * 4
+        digest = hashlib.sha256(self.content).hexdigest()
+        os.makedirs(os.path.join(self.media_root, 'products'))
+        for name in (f'{digest}.jpg', 'legacy.jpg'):
+            with open(os.path.join(self.media_root, 'products', name), 'wb') as media:
+                media.write(self.content)
+        self.url = f'/media/products/{digest}.jpg'
+
+    def get(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_content_addressed_files_are_immutable(self):
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.get('/media/products/legacy.jpg')['Cache-Control'], 'public, max-age=3600')
+
+    def test_conditional_requests(self):
+        response = self.get(self.url)
+        self.assertEqual(self.get(self.url, if_none_match=response['ETag']).status_code, 304)
+        self.assertEqual(self.get(self.url, if_modified_since=response['Last-Modified']).status_code, 304)
+
+    def test_byte_ranges(self):
+        response = self.get(self.url, range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+        self.assertEqual((response['Content-Length'], response['Content-Range']), ('10', 'bytes 10-19/1024'))
+
+        response = self.get(self.url, range='bytes=-4')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-4:])
+
+        response = self.get(self.url, range='bytes=2000-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, 'bytes */1024'))
+
+        # A stale If-Range gets the whole, current file
+        response = self.get(self.url, range='bytes=0-9', if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_files_and_traversal_are_404(self):
+        self.assertEqual(self.get('/media/products/missing.jpg').status_code, 404)
+        self.assertEqual(self.get('/media/products/').status_code, 404)
+        self.assertEqual(self.get('/media/../manage.py').status_code, 404)
+
+
+class ParallelUploadTests(TestCase):
+    """upload_files stages blocks concurrently, retries failures and skips stored names"""
+
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        self.media_root = tempfile.mkdtemp()
+        for path in (self.source_dir, self.media_root):
+            self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.paths = []
+        for index in range(5):
+            path = os.path.join(self.source_dir, f'slab_{index}.jpg')
+            with open(path, 'wb') as source:
+                source.write(os.urandom(2500 + index))
+            self.paths.append(path)
+        self.files = content_named(self.paths, 'products')
+
+    def test_uploads_blocks_and_skips_existing_names(self):
+        storage = FileSystemStorage(location=self.media_root)
+        report = upload_files(self.files, storage=storage, workers=3, block_size=1024)
+        self.assertEqual((report['uploaded'], report['skipped'], report['failed']), (5, 0, {}))
+        self.assertEqual(report['bytes'], sum(os.path.getsize(path) for path in self.paths))
+        for path, name in self.files:
+            with open(path, 'rb') as source, storage.open(name) as stored:
+                self.assertEqual(stored.read(), source.read())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, '.blocks', 'products', os.path.basename(name))))
+
+        report = upload_files(self.files, storage=storage, block_size=1024)
+        self.assertEqual((report['uploaded'], report['skipped'], report['bytes']), (0, 5, 0))
+
+    def test_failed_blocks_are_retried(self):
+        stage_block = FileSystemBlockTarget.stage_block
+        failures = []
+
+        def flaky(target, name, block_id, data):
+            if not failures:
+                failures.append(name)
+                raise ConnectionResetError('connection reset')
+            stage_block(target, name, block_id, data)
+
+        with mock.patch.object(FileSystemBlockTarget, 'stage_block', flaky), mock.patch('sundar_marbles.uploads.time.sleep'):
+            report = upload_files(self.files, block_size=1024, retries=1)
+        self.assertEqual((report['uploaded'], report['failed']), (5, {}))
+        self.assertEqual(len(failures), 1)
+
+        with mock.patch.object(FileSystemBlockTarget, 'stage_block', side_effect=OSError('down')), \
+                mock.patch('sundar_marbles.uploads.time.sleep'):
+            report = upload_files(content_named([self.paths[0]], 'gallery'), block_size=1024, retries=1)
+        self.assertEqual(list(report['failed']), [content_named([self.paths[0]], 'gallery')[0][1]])
+
+    def test_content_addressed_uploads_are_indexed(self):
+        upload_files(self.files, block_size=1024)
+        self.assertEqual(
+            set(MediaBlob.objects.values_list('name', flat=True)),
+            {name for _, name in self.files},
+        )
+
+
+class RequestTimingTests(TestCase):
+    """Sampled requests report db/serialize/storage/total time in Server-Timing and a JSON log line"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Marble')
+        for index in range(3):
+            Product.objects.create(
+                name=f'Product {index}', category=category, image='products/test.jpg', price=Decimal('1000.00'),
+            )
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0)
+    def test_sampled_request_is_broken_down(self):
+        with CaptureQueriesContext(connection) as queries, self.assertLogs('sundar_marbles.timing', 'INFO') as logs:
+            response = self.client.get(reverse('products:product-list'))
+        metrics = dict(entry.split(';', 1) for entry in response['Server-Timing'].split(', '))
+        self.assertEqual(list(metrics), ['db', 'serialize', 'storage', 'total'])
+        self.assertIn(f'desc="{len(queries)} queries"', metrics['db'])
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(
+            (line['path'], line['view'], line['status'], line['db_queries']),
+            ('/api/products/', 'products:product-list', 200, len(queries)),
+        )
+        self.assertGreater(line['serialize_ms'], 0)
+        # The image and image_url URLs of each product
+        self.assertEqual(line['storage_calls'], 6)
+        self.assertGreaterEqual(line['total_ms'], line['db_ms'])
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        with self.assertNoLogs('sundar_marbles.timing'):
+            response = self.client.get(reverse('products:product-list'))
+        self.assertNotIn('Server-Timing', response)
+
+
+class QueryGuardTests(TestCase):
+    """API requests are checked for repeated fingerprints (N+1) and their view's query budget"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Marble')
+        for index in range(5):
+            Product.objects.create(
+                name=f'Product {index}', category=category, image='products/test.jpg', price=Decimal('1000.00'),
+            )
+        gallery_category = GalleryCategory.objects.create(name='Floors')
+        GalleryImage.objects.create(title='Floor', category=gallery_category, image='gallery/floor.jpg')
+        ContactInfo.objects.create(address='Main Road', city='Lahore', primary_phone='123', email='info@example.com')
+
+    def setUp(self):
+        get_api_cache().clear()
+
+    def test_fingerprints_ignore_values(self):
+        self.assertEqual(
+            fingerprint('SELECT "t"."id" FROM "t" WHERE ("t"."slug" = \'a\'\'b\' AND "t"."id" IN (1, 2,3)) LIMIT 21'),
+            'SELECT "t"."id" FROM "t" WHERE ("t"."slug" = ? AND "t"."id" IN (...)) LIMIT ?',
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM "products_product" WHERE "id" = %s'),
+            fingerprint('SELECT *\n  FROM "products_product" WHERE "id" = ?'),
+        )
+
+    def unprefetched(self):
+        # One category and one additional-images query per product
+        return mock.patch.object(ProductListView, 'queryset', Product.objects.filter(is_active=True))
+
+    def get_product_list(self):
+        """GET the sync product list through the guard, whichever view the URLconf routes to"""
+        request = RequestFactory().get(reverse('products:product-list'))
+        view = ProductListView.as_view()
+        request.resolver_match = ResolverMatch(view, (), {}, 'product-list', ['products'], ['products'])
+        return QueryGuardMiddleware(view)(request)
+
+    @override_settings(QUERY_GUARD='raise')
+    def test_n_plus_one_and_budget_raise(self):
+        with self.unprefetched(), self.assertRaisesMessage(QueryGuardError, 'N+1: 5 x SELECT'):
+            self.get_product_list()
+
+        get_api_cache().clear()
+        with mock.patch.object(ProductListView, 'query_budget', 1), \
+                self.assertRaisesMessage(QueryGuardError, 'queries, budget 1'):
+            self.get_product_list()
+
+    @override_settings(QUERY_GUARD='log', QUERY_GUARD_SAMPLE_RATE=1.0)
+    def test_log_mode_reports(self):
+        RECENT_REPORTS.clear()
+        with self.unprefetched(), self.assertLogs('sundar_marbles.queryguard', 'WARNING') as logs:
+            response = self.get_product_list()
+        self.assertEqual(response.status_code, 200)
+        report = json.loads(logs.records[0].getMessage())
+        self.assertEqual((report['view'], report['budget'], report['over_budget']), ('products:product-list', 5, True))
+        self.assertEqual([repeated['count'] for repeated in report['repeated']], [5, 5])
+        self.assertEqual(list(RECENT_REPORTS), [report])
+
+    def test_diagnostics_profile_public_endpoints(self):
+        url = reverse('debug_database')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        data = self.client.get(url).json()
+        self.assertEqual((data['database']['connected'], data['errors']), (True, []))
+        self.assertEqual(len(data['endpoints']), len(public_endpoints()))
+        for endpoint in data['endpoints']:
+            with self.subTest(endpoint=endpoint['label']):
+                self.assertEqual(endpoint['status'], 200)
+                self.assertIsNotNone(endpoint['budget'])
+                self.assertFalse(has_problems(endpoint))
+
+
+class DatabasePoolTests(TestCase):
+    """Pools hold as many connections as a worker serves requests at once"""
+
+    def test_pool_sized_to_worker_model(self):
+        sizes = {
+            'sync': pool_options(),
+            'gthread': pool_options(threads=4),
+            'uvicorn': pool_options(asgi=True),
+            'override': pool_options(threads=4, max_size=6),
+        }
+        self.assertEqual(
+            {worker: (options['min_size'], options['max_size']) for worker, options in sizes.items()},
+            {'sync': (1, 1), 'gthread': (4, 4), 'uvicorn': (2, 8), 'override': (6, 6)},
+        )
+
+    def test_worker_hooks_skip_databases_without_pool(self):
+        prewarm_pools()
+        self.assertIsNone(start_health_checks(30))
+        close_pools()
+
@@ -0,0 +1,131 @@
+"""
+Per-request performance instrumentation.
+
+``RequestTimingMiddleware`` breaks a sampled share of requests down into
+
+    db         time in database calls and the number of queries, via ``connection.execute_wrapper``
+    serialize  time in DRF serializers (``TimedSerializerMixin``)
+    storage    time in media storage calls such as URL building (``ContentAddressedStorage``)
+    total      time from the middleware to the response
+
+and reports them as a ``Server-Timing`` header, which browsers show in the
+network panel, and as one JSON log line on the ``sundar_marbles.timing``
+logger:
+
+    {"method": "GET", "path": "/api/gallery/images/", "view": "gallery:image-list", "status": 200,
+     "total_ms": 84.1, "db_ms": 61.7, "db_queries": 3, "serialize_ms": 15.2, "storage_ms": 4.9, ...}
+
+Database and storage calls made while serializing are part of ``serialize``
+too. A streamed body is produced after the response leaves the middleware and
+is not included.
+
+Settings:
+
+    REQUEST_TIMING_SAMPLE_RATE  share of requests instrumented, 0 to 1; the others
+                                cost one random() call
+    REQUEST_TIMING_HEADER       send Server-Timing on sampled responses
+"""
+
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('db', 'serialize', 'storage')
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Accumulated seconds and call counts per metric for one request"""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.depth = defaultdict(int)
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to metric ``name`` of the current request, when it is sampled"""
+    timings = _current.get()
+    if timings is None or timings.depth[name]:
+        # Not sampled, or already inside a block for this metric (nested serializers)
+        yield
+        return
+    timings.depth[name] += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.depth[name] -= 1
+        timings.seconds[name] += time.perf_counter() - started
+        timings.calls[name] += 1
+
+
+def record_query(execute, sql, params, many, context):
+    with timed('db'):
+        return execute(sql, params, many, context)
+
+
+class TimedSerializerMixin:
+    """Count the serializer's ``to_representation`` towards the request's serialize time"""
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
+
+
+def server_timing(timings, total):
+    entries = [
+        f'db;dur={timings.seconds["db"] * 1000:.1f};desc="{timings.calls["db"]} queries"',
+        f'serialize;dur={timings.seconds["serialize"] * 1000:.1f}',
+        f'storage;dur={timings.seconds["storage"] * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ]
+    return ', '.join(entries)
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = getattr(settings, 'REQUEST_TIMING_SAMPLE_RATE', 0)
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(record_query):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        if getattr(settings, 'REQUEST_TIMING_HEADER', True):
+            response['Server-Timing'] = server_timing(timings, total)
+        match = request.resolver_match
+        line = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+        }
+        for metric in METRICS:
+            line[f'{metric}_ms'] = round(timings.seconds[metric] * 1000, 1)
+        line['db_queries'] = timings.calls['db']
+        line['storage_calls'] = timings.calls['storage']
+        logger.info(json.dumps(line))
+        return response
@@ -0,0 +1,202 @@
+"""
+Parallel uploads of local files to media storage.
+
+``upload_files`` pushes many files at once from a thread pool. Each file goes
+up as a block blob: it is read and staged ``block_size`` bytes at a time, then
+committed with its block list, so a large image is never held in memory whole
+and a failed chunk is retried (with exponential backoff) instead of restarting
+the file. Names that already exist are skipped; with content-addressed names
+(storage.py) an existing name means identical bytes, and finished uploads are
+recorded in the hash index.
+
+Block targets:
+
+* ``AzureBlockTarget`` stages blocks on the container behind django-storages'
+  ``AzureStorage``,
+* ``FileSystemBlockTarget`` stages them as files next to a
+  ``FileSystemStorage`` and concatenates them on commit. It is the local
+  stand-in for Azure in development and tests.
+"""
+
+import base64
+import mimetypes
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.storage import FileSystemStorage, default_storage
+
+from .media import IMMUTABLE_CACHE_CONTROL
+from .storage import ContentAddressedStorage, blob_backend, content_name, file_digest, is_content_addressed
+
+try:
+    from azure.core.exceptions import AzureError
+except ImportError:  # azure-storage-blob is only needed with Azure credentials
+    AzureError = OSError
+
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+RETRYABLE_ERRORS = (AzureError, OSError)
+
+
+class AzureBlockTarget:
+    """Block uploads to the container of a django-storages ``AzureStorage``"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def blob(self, name):
+        return self.storage.client.get_blob_client(self.storage._get_valid_path(name))
+
+    def exists(self, name):
+        # AzureStorage.exists() answers False whenever AZURE_OVERWRITE_FILES is on
+        return self.blob(name).exists(timeout=self.storage.timeout)
+
+    def stage_block(self, name, block_id, data):
+        self.blob(name).stage_block(block_id, data, timeout=self.storage.timeout)
+
+    def commit_block_list(self, name, block_ids, content_type, cache_control):
+        from azure.storage.blob import BlobBlock, ContentSettings
+
+        self.blob(name).commit_block_list(
+            [BlobBlock(block_id=block_id) for block_id in block_ids],
+            content_settings=ContentSettings(content_type=content_type, cache_control=cache_control),
+            timeout=self.storage.timeout,
+        )
+
+
+class FileSystemBlockTarget:
+    """Block uploads to a ``FileSystemStorage``: blocks are staged as files, commit concatenates them"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def staging_dir(self, name):
+        return self.storage.path(os.path.join('.blocks', name))
+
+    def exists(self, name):
+        return self.storage.exists(name)
+
+    def stage_block(self, name, block_id, data):
+        directory = self.staging_dir(name)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, block_id), 'wb') as block:
+            block.write(data)
+
+    def commit_block_list(self, name, block_ids, content_type, cache_control):
+        directory = self.staging_dir(name)
+        path = self.storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f'{path}.part', 'wb') as blob:
+            for block_id in block_ids:
+                with open(os.path.join(directory, block_id), 'rb') as block:
+                    shutil.copyfileobj(block, blob)
+        os.replace(f'{path}.part', path)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def block_target(storage=None):
+    """The block target for ``storage`` (default: the media storage)"""
+    storage = blob_backend(storage if storage is not None else default_storage)
+    if isinstance(storage, FileSystemStorage):
+        return FileSystemBlockTarget(storage)
+    if hasattr(storage, 'client') and hasattr(storage, 'azure_container'):
+        return AzureBlockTarget(storage)
+    raise ValueError(f'Block uploads are not supported for {type(storage).__name__}')
+
+
+def content_named(paths, upload_dir, workers=8):
+    """``[(path, '<upload_dir>/<sha256><ext>')]`` for local files, hashed concurrently"""
+    paths = list(paths)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = list(pool.map(file_digest, paths))
+    return [
+        (path, content_name(f'{upload_dir}/{os.path.basename(path)}', digest))
+        for path, digest in zip(paths, digests)
+    ]
+
+
+def with_retries(operation, retries, backoff=0.5):
+    for attempt in range(retries + 1):
+        try:
+            return operation()
+        except RETRYABLE_ERRORS:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def upload_file(target, path, name, block_size=DEFAULT_BLOCK_SIZE, retries=3, overwrite=False):
+    """Upload one file as staged blocks; returns the number of bytes sent, None when skipped"""
+    if not overwrite and with_retries(lambda: target.exists(name), retries):
+        return None
+
+    block_ids, sent = [], 0
+    with open(path, 'rb') as source:
+        for index, data in enumerate(iter(lambda: source.read(block_size), b'')):
+            # Azure needs block ids of equal length within a blob
+            block_id = base64.b64encode(f'{index:06d}'.encode()).decode()
+            with_retries(lambda: target.stage_block(name, block_id, data), retries)
+            block_ids.append(block_id)
+            sent += len(data)
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    cache_control = IMMUTABLE_CACHE_CONTROL if is_content_addressed(name) else None
+    with_retries(lambda: target.commit_block_list(name, block_ids, content_type, cache_control), retries)
+    return sent
+
+
+def upload_files(files, storage=None, workers=8, block_size=DEFAULT_BLOCK_SIZE, retries=3,
+                 overwrite=False, progress=None):
+    """
+    Upload ``(local path, storage name)`` pairs concurrently.
+
+    ``progress(name, outcome)`` is called from the worker threads with
+    'uploaded', 'skipped' or the exception that made the file fail. Returns a
+    report dict: uploaded/skipped counts, ``failed`` (name -> error), bytes,
+    seconds and mib_per_second.
+    """
+    target = block_target(storage)
+    storage = storage if storage is not None else default_storage
+    files = list(files)
+    report = {'uploaded': 0, 'skipped': 0, 'failed': {}, 'bytes': 0}
+
+    def upload(item):
+        path, name = item
+        sent = 0
+        try:
+            sent = upload_file(target, path, name, block_size, retries, overwrite)
+        except Exception as e:
+            outcome = e
+        else:
+            outcome = 'skipped' if sent is None else 'uploaded'
+        if progress:
+            progress(name, outcome)
+        return name, outcome, sent or 0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, outcome, sent in pool.map(upload, files):
+            if isinstance(outcome, Exception):
+                report['failed'][name] = str(outcome) or type(outcome).__name__
+            else:
+                report[outcome] += 1
+                report['bytes'] += sent
+    report['seconds'] = time.perf_counter() - started
+    report['mib_per_second'] = report['bytes'] / report['seconds'] / 2**20 if report['seconds'] else 0
+
+    if isinstance(storage, ContentAddressedStorage):
+        # On this thread's database connection, not the workers'
+        for path, name in files:
+            if name not in report['failed'] and is_content_addressed(name):
+                digest = os.path.splitext(os.path.basename(name))[0]
+                storage.record(name, digest, os.path.getsize(path))
+    return report
+
+
+def describe_report(report):
+    """One line summary for command output"""
+    return (
+        f"{report['uploaded']} uploaded, {report['skipped']} already stored, {len(report['failed'])} failed; "
+        f"{report['bytes'] / 2**20:.1f} MiB in {report['seconds']:.1f}s ({report['mib_per_second']:.1f} MiB/s)"
+    )
@@ -16,12 +16,13 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
+from .media import media_urlpatterns
+from .views import catalog_bootstrap
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/products/', include('products.urls')),
+    path('api/bootstrap/', catalog_bootstrap, name='bootstrap'),
 ]
 
 # Only include other app URLs if they exist
@@ -39,20 +40,16 @@ except ImportError:
 
 # Only include debug views if they exist
 try:
-    from .debug_views import debug_database, force_create_superuser
+    from .debug_views import database_diagnostics, force_create_superuser
     urlpatterns.extend([
-        path('debug/database/', debug_database, name='debug_database'),
+        path('debug/database/', database_diagnostics, name='debug_database'),
         path('debug/create-superuser/', force_create_superuser, name='force_create_superuser'),
     ])
 except ImportError:
     pass
 
-# Serve media files in development and production
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-else:
-    # In production, serve media files through Django (Azure doesn't support static file serving by default)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Serve local media files in development and production (Azure media is served by Azure)
+urlpatterns += media_urlpatterns()
 
 # Admin site customization
 admin.site.site_header = "Sundar Marbles Administration"
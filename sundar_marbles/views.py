@@ -0,0 +1,76 @@
+"""
+Site-wide API views that combine data from several apps.
+"""
+
+from django.urls import reverse
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from contact.models import ContactInfo
+from contact.serializers import ContactInfoSerializer
+from gallery.models import GalleryImage
+from gallery.serializers import GalleryImageSerializer
+from gallery.views import categories_with_image_count, images_for_serialization
+from products.models import Product
+from products.serializers import ProductSerializer
+from products.views import categories_with_product_count, products_for_serialization
+from .cache import cache_api_response
+from .queryguard import query_budget
+
+
+def first_page(request, queryset, serializer_class, url_name):
+    """The first page of ``url_name`` in the same shape CatalogPagination returns"""
+    page_size = api_settings.PAGE_SIZE
+    rows = list(queryset[:page_size + 1])
+    count = len(rows)
+    next_url = None
+    if count > page_size:
+        # Only a full first page needs the real total
+        rows = rows[:page_size]
+        count = queryset.count()
+        next_url = replace_query_param(request.build_absolute_uri(reverse(url_name)), 'page', 2)
+    return {
+        'count': count,
+        'next': next_url,
+        'previous': None,
+        'results': serializer_class(rows, many=True, context={'request': request}).data,
+    }
+
+
+@query_budget(10)
+@cache_api_response
+@api_view(['GET'])
+def catalog_bootstrap(request):
+    """Everything the homepage fetches on first load, in one response.
+
+    Each key holds exactly what the matching endpoint returns. Built with
+    seven queries, plus one COUNT per list longer than a page, and cached as
+    a single rendered response that any catalog or contact change invalidates.
+    """
+    featured_products = products_for_serialization(
+        Product.objects.filter(is_active=True, is_featured=True)
+    )
+    featured_images = images_for_serialization(
+        GalleryImage.objects.filter(is_active=True, is_featured=True)
+    )
+    contact_info = ContactInfo.objects.filter(is_active=True).order_by('id')
+
+    return Response({
+        'categories': list(
+            categories_with_product_count().values('id', 'name', 'slug', 'product_count')
+        ),
+        'featured_products': first_page(
+            request, featured_products, ProductSerializer, 'products:featured-products'
+        ),
+        'gallery_categories': list(
+            categories_with_image_count().values('id', 'name', 'slug', 'image_count')
+        ),
+        'featured_gallery_images': first_page(
+            request, featured_images, GalleryImageSerializer, 'gallery:featured-images'
+        ),
+        'contact_info': first_page(
+            request, contact_info, ContactInfoSerializer, 'contact:contact-info'
+        ),
+    })